@@ -0,0 +1,232 @@
+# agents/diet_batch.py
+"""Headless diet plan generation for a roster of profiles.
+
+Streams profiles from CSV or JSONL and computes BMR/TDEE/targets with the
+diet planner's helpers. LLM requests run on up to ``--concurrency``
+threads, and the macro charts for each day are drawn in a separate
+process pool so matplotlib never competes with the request threads for
+the GIL. Each finished profile is appended to ``<out>/plans.jsonl`` with
+its PNGs beside it; rerunning into the same directory skips profiles that
+already succeeded.
+
+CLI: python -m agents.diet_batch roster.csv --out plans/ --concurrency 8
+
+Input columns (case-insensitive): id, age, gender, height_cm, weight_kg,
+activity_level, goal, dietary_preference. Rows without an ``id`` are keyed
+by position.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Dict, Optional
+
+from agents.diet_planner_agent import build_diet_prompt, day_macros, diet_targets
+from llms.provider import get_llm
+from utils.batch import (
+    RateLimiter,
+    completed_keys,
+    iter_rows,
+    pick,
+    terminate_last_line,
+)
+from utils.charts import save_macros_chart
+from utils.nutrition import calculate_macro_targets
+from utils.structured_output import MEAL_PLAN_SCHEMA, generate_structured
+
+PLANS_FILE = "plans.jsonl"
+
+# Accepted spellings of each input column, and the form's default.
+COLUMNS = {
+    "age": (("age",), None),
+    "gender": (("gender", "sex"), "Other"),
+    "height": (("height_cm", "height"), None),
+    "weight": (("weight_kg", "weight"), None),
+    "activity": (("activity_level", "activity"), "Sedentary"),
+    "goal": (("goal", "fitness_goal"), "Maintain Weight"),
+    "preference": (("dietary_preference", "diet", "preference"), "Vegetarian"),
+}
+
+
+def row_to_profile(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Form-equivalent profile; raises ValueError on missing/bad numbers."""
+    profile = {}
+    for name, (columns, default) in COLUMNS.items():
+        value = pick(row, columns) or default
+        if value is None:
+            raise ValueError(f"missing {columns[0]}")
+        profile[name] = value
+    profile["age"] = int(float(profile["age"]))
+    profile["height"] = float(profile["height"])
+    profile["weight"] = float(profile["weight"])
+    return profile
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", text).strip("-").lower() or "x"
+
+
+def _chart_pool(workers: int) -> ProcessPoolExecutor:
+    # Forking while request threads are running can copy held locks into the
+    # child; forkserver children start from a clean single-threaded parent.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def plan_profile(
+    key: str,
+    row: Dict[str, Any],
+    out_dir: str,
+    charts: ProcessPoolExecutor,
+    limiter: RateLimiter,
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        p = row_to_profile(row)
+        bmr, tdee, target = diet_targets(
+            p["age"], p["gender"], p["height"], p["weight"], p["activity"], p["goal"]
+        )
+        prompt = build_diet_prompt(
+            p["age"],
+            p["gender"],
+            p["height"],
+            p["weight"],
+            p["activity"],
+            p["goal"],
+            p["preference"],
+        )
+        limiter.wait()
+        llm_started = time.perf_counter()
+        plan = generate_structured(get_llm(), prompt, MEAL_PLAN_SCHEMA, agent="diet")
+        llm_seconds = time.perf_counter() - llm_started
+
+        jobs = []
+        for i, day in enumerate(plan["daily_plan"], start=1):
+            path = os.path.join(out_dir, f"{_slug(key)}-day{i}.png")
+            title = f"{key} - {day.get('day', f'Day {i}')}"
+            jobs.append(charts.submit(save_macros_chart, day_macros(day), path, title))
+        chart_paths = [os.path.basename(job.result()) for job in jobs]
+    except Exception as e:
+        return {"id": key, "error": f"{type(e).__name__}: {e}"}
+    return {
+        "id": key,
+        "targets": {
+            "bmr": round(bmr),
+            "tdee": round(tdee),
+            "target_calories": round(target),
+            **{
+                name: round(grams)
+                for name, grams in calculate_macro_targets(
+                    target, p["goal"], p["weight"]
+                ).items()
+            },
+        },
+        "plan": plan,
+        "charts": chart_paths,
+        "llm_s": round(llm_seconds, 3),
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def run_batch(
+    in_path: str,
+    out_dir: str,
+    concurrency: int = 4,
+    chart_workers: Optional[int] = None,
+    rate: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Plan every profile in ``in_path`` into ``out_dir``; returns a report."""
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, PLANS_FILE)
+    done = completed_keys(out_path)
+    limiter = RateLimiter(rate)
+    report = {"processed": 0, "failed": 0, "skipped": 0, "charts": 0}
+    llm_seconds = 0.0
+    started = time.perf_counter()
+    window = max(1, concurrency) * 2
+    terminate_last_line(out_path)
+    with open(out_path, "a", encoding="utf-8") as out, _chart_pool(
+        chart_workers or os.cpu_count() or 1
+    ) as charts, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+
+        def drain(pending, block_until):
+            nonlocal llm_seconds
+            while len(pending) > block_until:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pending.discard(future)
+                    record = future.result()
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    if "error" in record:
+                        report["failed"] += 1
+                    else:
+                        report["processed"] += 1
+                        report["charts"] += len(record["charts"])
+                        llm_seconds += record["llm_s"]
+
+        pending = set()
+        submitted = 0
+        for key, row in iter_rows(in_path):
+            if key in done:
+                report["skipped"] += 1
+                continue
+            if limit is not None and submitted >= limit:
+                break
+            pending.add(pool.submit(plan_profile, key, row, out_dir, charts, limiter))
+            submitted += 1
+            drain(pending, window - 1)
+        drain(pending, 0)
+
+    elapsed = time.perf_counter() - started
+    finished = report["processed"] + report["failed"]
+    per_second = 1 / elapsed if elapsed else 0.0
+    report["seconds"] = round(elapsed, 2)
+    report["profiles_per_second"] = round(finished * per_second, 2)
+    report["charts_per_second"] = round(report["charts"] * per_second, 2)
+    # Sum of per-request LLM time over wall time: the effective overlap.
+    report["llm_parallelism"] = round(llm_seconds * per_second, 2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate diet plans and macro charts for a roster of profiles."
+    )
+    parser.add_argument("input", help="CSV or JSONL file of profiles")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM threads")
+    parser.add_argument(
+        "--chart-workers", type=int, default=None, help="chart processes (CPU count)"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=None, help="max LLM requests started per second"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="stop after N rows")
+    args = parser.parse_args(argv)
+    report = run_batch(
+        args.input,
+        args.out,
+        args.concurrency,
+        args.chart_workers,
+        args.rate,
+        args.limit,
+    )
+    print(json.dumps(report, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
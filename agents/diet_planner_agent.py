@@ -1,8 +1,8 @@
 import streamlit as st
 import os
-import json
-import matplotlib.pyplot as plt
 import re
+import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 #from langchain_groq import ChatGroq
 
@@ -13,38 +13,23 @@ load_dotenv()
 
 # Initialize the Groq LLM
 #llm = ChatGroq(model="llama-3.1-8b-instant", temperature=0.7, max_retries=2)
-from langchain_google_genai import ChatGoogleGenerativeAI
-
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-pro")
-
-
-def calculate_bmr(age, gender, height, weight):
-    if gender.lower() == "male":
-        return 10 * weight + 6.25 * height - 5 * age + 5
-    else:
-        return 10 * weight + 6.25 * height - 5 * age - 161
-
-
-def calculate_tdee(bmr, activity_level):
-    multipliers = {
-        "Sedentary": 1.2,
-        "Light": 1.375,
-        "Moderate": 1.55,
-        "Active": 1.725,
-        "Very Active": 1.9,
-    }
-    return bmr * multipliers.get(activity_level, 1.2)
-
-
-def adjust_calories_for_goal(tdee, goal):
-    if goal == "Lose Weight":
-        return tdee - 500
-    elif goal == "Gain Weight":
-        return tdee + 500
-    elif goal == "Build Strength / Muscle":
-        return tdee + 250
-    else:
-        return tdee
+from llms.cache import cached_stream, store_response
+from llms.provider import get_llm
+from utils.charts import CHART_RENDERER, render_macros_png, render_macros_svg
+from utils.grocery import merge_grocery_lists
+from utils.meal_plan import plan_days
+from utils.nutrition import (
+    adjust_calories_for_goal,
+    calculate_bmr,
+    calculate_tdee,
+)
+from utils.streaming_json import StreamingJSONParser, StreamingJSONError
+from utils.structured_output import (
+    MEAL_PLAN_SCHEMA,
+    StructuredOutputError,
+    generate_structured,
+    validate,
+)
 
 
 def get_goal_specific_guidelines(goal):
@@ -72,49 +57,47 @@ def get_goal_specific_guidelines(goal):
     return guidelines.get(goal, "")
 
 
-def plot_macros_chart(macros):
-    labels = list(macros.keys())
-    values = list(macros.values())
-    fig, ax = plt.subplots()
-    ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
-    ax.axis("equal")
-    st.pyplot(fig)
+MAX_PLAN_DAYS = 7
 
 
-def run_diet_planner_agent():
-    st.subheader("🥗 Personalized Diet Planner")
+def diet_targets(age, gender, height, weight, activity, goal):
+    """``(bmr, tdee, target_calories)`` for one profile."""
+    bmr = calculate_bmr(age, gender, height, weight)
+    tdee = calculate_tdee(bmr, activity)
+    return bmr, tdee, adjust_calories_for_goal(tdee, goal)
 
-    with st.form("diet_form"):
-        age = st.number_input("Age", 5, 100)
-        gender = st.selectbox("Gender", ["Male", "Female", "Other"])
-        height = st.number_input("Height (cm)")
-        weight = st.number_input("Weight (kg)")
-        activity = st.selectbox(
-            "Activity Level",
-            ["Sedentary", "Light", "Moderate", "Active", "Very Active"],
-        )
-        goal = st.selectbox(
-            "What is your goal?",
-            [
-                "Lose Weight",
-                "Maintain Weight",
-                "Gain Weight",
-                "Build Strength / Muscle",
-            ],
-        )
-        dietary_preference = st.selectbox(
-            "Dietary Preference",
-            ["Vegetarian", "Semi-Vegetarian", "Non-Vegetarian"],
-        )
-        submitted = st.form_submit_button("Generate Diet Plan")
 
-    if submitted:
-        bmr = calculate_bmr(age, gender, height, weight)
-        tdee = calculate_tdee(bmr, activity)
-        target_calories = adjust_calories_for_goal(tdee, goal)
-        goal_guidelines = get_goal_specific_guidelines(goal)
+def build_diet_prompt(
+    age,
+    gender,
+    height,
+    weight,
+    activity,
+    goal,
+    dietary_preference,
+    day=1,
+    days=1,
+    avoid=(),
+):
+    """The meal-plan prompt; with ``days > 1`` it asks for day ``day`` only.
 
-        prompt = f"""
+    The single-day prompt is unchanged, so cached responses still match.
+    """
+    bmr, tdee, target_calories = diet_targets(
+        age, gender, height, weight, activity, goal
+    )
+    goal_guidelines = get_goal_specific_guidelines(goal)
+    notes = ""
+    if days > 1:
+        notes = f"""
+This is day {day} of a {days}-day plan; the other days are planned separately.
+Give every meal a "main_ingredient" field naming the one ingredient the dish is
+built on (e.g. "paneer", "oats"), so repeats across days can be spotted.
+List grocery items with quantities for this day only (e.g. "200 g paneer")."""
+    if avoid:
+        notes += f"""
+Do not repeat these dishes from other days: {"; ".join(avoid)}."""
+    return f"""
 You are a certified dietician. ONLY return valid JSON.
 Do NOT include any extra text before or after the JSON.
 
@@ -131,13 +114,13 @@ User profile:
 - Dietary Preference: {dietary_preference}
 
 Goal-specific dietary guidelines:
-{goal_guidelines}
+{goal_guidelines}{notes}
 
 Return exactly this JSON structure (no commentary, no markdown):
 {{
     "daily_plan": [
         {{
-            "day": "Day 1",
+            "day": "Day {day}",
             "meals": [
                 {{"meal": "Breakfast", "description": "...", "calories": 350}},
                 {{"meal": "Snack 1", "description": "...", "calories": 150}},
@@ -153,48 +136,173 @@ Return exactly this JSON structure (no commentary, no markdown):
 }}
 """
 
-        try:
-            ai_response = llm.invoke(prompt)
-            # Extract ai_response content text if it has a .content attribute
-            if hasattr(ai_response, "content"):
-                raw_result = ai_response.content
-            else:
-                raw_result = str(ai_response)
-
-            # Try to extract JSON if extra text is present
-            json_match = re.search(r"\{.*\}", raw_result, re.DOTALL)
-            if json_match:
-                raw_result = json_match.group(0)
-
-            try:
-                data = json.loads(raw_result)
-            except json.JSONDecodeError:
-                st.error("AI did not return valid JSON, even after cleanup.")
-                st.code(raw_result, language="json")
-                return
 
-            st.success(f"Your 1-Day Meal Plan for {goal}")
-            for day in data.get("daily_plan", []):
-                st.markdown(
-                    f"### {day.get('day', 'Day')}\nTotal: {day.get('total_calories', 0)} kcal"
-                )
-                for meal in day.get("meals", []):
+def generate_meal_plan(
+    age, gender, height, weight, activity, goal, dietary_preference, days=7
+):
+    """An N-day plan from one concurrent LLM request per day.
+
+    Days that repeat a dish of an earlier day (same meal and main
+    ingredient, see ``utils.meal_plan.dish_key``) are requested again
+    without the kept days' dishes. Grocery lists are merged into one.
+    Returns data in MEAL_PLAN_SCHEMA shape.
+    """
+    profile = (age, gender, height, weight, activity, goal, dietary_preference)
+    llm = get_llm()
+
+    def plan_day(day, avoid=()):
+        prompt = build_diet_prompt(*profile, day=day, days=days, avoid=avoid)
+        data = generate_structured(llm, prompt, MEAL_PLAN_SCHEMA, agent="diet")
+        if not data["daily_plan"]:
+            raise StructuredOutputError(f"no plan for day {day}", raw=json.dumps(data))
+        day_plan = data["daily_plan"][0]
+        day_plan["day"] = f"Day {day}"
+        return day_plan, data["grocery_list"]
+
+    with ThreadPoolExecutor(max_workers=days) as pool:
+        results = plan_days(plan_day, days, pool)
+
+    return {
+        "daily_plan": [day_plan for day_plan, _ in results],
+        "grocery_list": merge_grocery_lists(items for _, items in results),
+    }
+
+
+def plot_macros_chart(macros):
+    # Cached by rounded grams; no figure is left open per call.
+    if CHART_RENDERER == "png":
+        st.image(render_macros_png(macros))
+    else:
+        st.markdown(render_macros_svg(macros), unsafe_allow_html=True)
+
+
+# Parts of the plan rendered as soon as they are complete in the stream
+PLAN_STREAM_PATTERNS = [
+    ("daily_plan", "*", "day"),
+    ("daily_plan", "*", "meals", "*"),
+    ("daily_plan", "*"),
+    ("grocery_list", "*"),
+]
+
+
+def render_plan_stream(chunks):
+    """Render each day, meal and grocery item as soon as it closes in the
+    streamed JSON, instead of waiting for the whole response.
+
+    Returns ``(data, raw_text)``; ``data`` is None if the stream was
+    malformed or truncated.
+    """
+    parser = StreamingJSONParser(PLAN_STREAM_PATTERNS)
+    headed = set()
+    grocery_started = False
+    try:
+        for chunk in chunks:
+            for path, value in parser.feed(chunk):
+                if path[0] == "grocery_list":
+                    if not grocery_started:
+                        st.subheader("🛒 Grocery List")
+                        grocery_started = True
+                    st.markdown(f"- {value}")
+                elif len(path) == 3:
+                    headed.add(path[1])
+                    st.markdown(f"### {value}")
+                elif len(path) == 4:
                     st.markdown(
-                        f"**{meal.get('meal', '')}**: {meal.get('description', '')} ({meal.get('calories', 0)} kcal)"
+                        f"**{value.get('meal', '')}**: {value.get('description', '')} ({value.get('calories', 0)} kcal)"
                     )
+                else:
+                    render_day_summary(value, show_header=path[1] not in headed)
+        return parser.close(), parser.text
+    except StreamingJSONError:
+        return None, parser.text
+
+
+def day_macros(day):
+    macros = day.get("macros", {})
+    return {
+        "Protein": macros.get("protein_g", 0),
+        "Carbs": macros.get("carbs_g", 0),
+        "Fats": macros.get("fats_g", 0),
+    }
+
 
-                st.subheader(f"Macronutrient Breakdown - {day.get('day', 'Day')}")
-                macros = {
-                    "Protein": day.get("macros", {}).get("protein_g", 0),
-                    "Carbs": day.get("macros", {}).get("carbs_g", 0),
-                    "Fats": day.get("macros", {}).get("fats_g", 0),
-                }
-                plot_macros_chart(macros)
+def render_day_summary(day, show_header=False):
+    if show_header:
+        st.markdown(f"### {day.get('day', 'Day')}")
+    st.markdown(f"Total: {day.get('total_calories', 0)} kcal")
 
-            st.subheader("🛒 Grocery List")
-            for item in data.get("grocery_list", []):
-                st.markdown(f"- {item}")
+    st.subheader(f"Macronutrient Breakdown - {day.get('day', 'Day')}")
+    plot_macros_chart(day_macros(day))
+
+
+def show_single_day_plan(prompt):
+    """Stream a one-day plan as it arrives; returns the plan.
+
+    The stream is drawn into a placeholder, so if it turns out malformed the
+    partial plan is replaced by the repaired one instead of shown twice.
+    """
+    llm = get_llm()
+    # Served from the response cache when the "diet" agent opts in
+    stream = cached_stream(llm, prompt, agent="diet")
+    area = st.empty()
+    with area.container():
+        data, raw = render_plan_stream(stream)
+    if data is None or validate(data, MEAL_PLAN_SCHEMA):
+        area.empty()
+        st.warning("The plan came back incomplete; asking the AI to fix it...")
+        data = generate_structured(llm, prompt, MEAL_PLAN_SCHEMA, agent="diet", raw=raw)
+        with area.container():
+            render_plan_stream([json.dumps(data)])
+    elif stream.fresh:
+        # Only a complete, valid plan is cached, and a cache hit is not
+        # written back (that would reset its age and defeat the TTL).
+        store_response(llm, prompt, raw, agent="diet")
+    return data
+
+
+def run_diet_planner_agent():
+    st.subheader("🥗 Personalized Diet Planner")
+
+    with st.form("diet_form"):
+        age = st.number_input("Age", 5, 100)
+        gender = st.selectbox("Gender", ["Male", "Female", "Other"])
+        height = st.number_input("Height (cm)")
+        weight = st.number_input("Weight (kg)")
+        activity = st.selectbox(
+            "Activity Level",
+            ["Sedentary", "Light", "Moderate", "Active", "Very Active"],
+        )
+        goal = st.selectbox(
+            "What is your goal?",
+            [
+                "Lose Weight",
+                "Maintain Weight",
+                "Gain Weight",
+                "Build Strength / Muscle",
+            ],
+        )
+        dietary_preference = st.selectbox(
+            "Dietary Preference",
+            ["Vegetarian", "Semi-Vegetarian", "Non-Vegetarian"],
+        )
+        days = st.number_input("Days to plan", 1, MAX_PLAN_DAYS, 1)
+        submitted = st.form_submit_button("Generate Diet Plan")
 
+    if submitted:
+        profile = (age, gender, height, weight, activity, goal, dietary_preference)
+        try:
+            st.success(f"Your {days}-Day Meal Plan for {goal}")
+            if days > 1:
+                # Days are generated concurrently, so there is no single
+                # stream to render from.
+                with st.spinner(f"Planning {days} days..."):
+                    data = generate_meal_plan(*profile, days=days)
+                render_plan_stream([json.dumps(data)])
+                return
+            show_single_day_plan(build_diet_prompt(*profile))
+        except StructuredOutputError as e:
+            st.error("AI did not return a valid diet plan, even after a repair attempt.")
+            st.code(e.raw, language="json")
         except Exception as e:
             st.error(f"Error generating diet plan: {e}")
 
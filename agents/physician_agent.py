@@ -1,117 +1,273 @@
 import os
+import re
 import json
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, TypedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, TypedDict
 
 import streamlit as st
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
 
+from llms.cache import cached_invoke, llm_params
+from llms.provider import get_llm
+from llms.semantic_cache import get_semantic_cache, semantic_cache_enabled
+from utils.availability import book_appointment
+from utils.clinics import get_clinic_directory, normalize_city, specialty_key
+from utils.structured_output import (
+    ANALYSIS_SCHEMA,
+    StructuredOutputError,
+    generate_structured,
+)
+
 os.environ["Physician Agent"] = "Physician Agent"
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-pro")
 
+PROMPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "prompts",
+    "physician_prompt.txt",
+)
+GENERAL_SPECIALIST = "General Physician"
+CLINIC_RESULTS = 5
+CLINIC_RADIUS_KM = 150
+# "summary" adds a short LLM note on the directory results; "off" skips it.
+CLINIC_LLM_MODE = os.getenv("WELLNESS_CLINIC_LLM", "off")
 
-def parse_llm_json(result_str: str) -> Dict[str, Any]:
-    """Robust JSON parsing with fallback."""
-    try:
-        return json.loads(result_str)
-    except Exception:
-        pass
-    try:
-        start = result_str.find("{")
-        end = result_str.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return json.loads(result_str[start : end + 1])
-    except Exception:
-        pass
-    return {
-        "clinics": [],
-        "note": "Could not parse clinics info.",
-    }
 
+@lru_cache(maxsize=1)
+def load_physician_prompt() -> str:
+    with open(PROMPT_PATH, "r", encoding="utf-8") as f:
+        return f.read().strip()
 
-def build_prompt(triage_summary: str, location: str, specialist: str) -> str:
-    return f"""
-You are a helpful virtual general physician. Based on the patient triage summary and location, please provide a list of clinics nearby specialized in {specialist}.
 
-Triage summary:
-{triage_summary}
+def build_analysis_prompt(triage_summary: str) -> str:
+    return f"""{load_physician_prompt()}
 
-Location:
-{location}
+Patient's answers:
+{triage_summary}
 
 Respond ONLY in JSON with the following format:
 {{
-  "clinics": [
-    {{
-      "name": "Clinic Name",
-      "address": "Address",
-      "phone": "Phone number (if available)",
-      "website": "Website URL (if available)"
-    }},
-    ...
-  ]
+  "diagnosis": "Probable diagnosis",
+  "specialist": "Type of doctor to see, e.g. General Physician, Cardiologist",
+  "treatments": ["Suggested medication or treatment", ...],
+  "self_care": ["Rest or dietary recommendation", ...],
+  "visit_clinic": true,
+  "advice": "One or two sentences on whether and how soon to visit a clinic"
 }}
+"""
 
-If no exact clinic info is available, list general well-known clinics or hospitals in the area.
-Keep response brief and relevant.
+
+def build_clinic_note_prompt(analysis: Dict[str, Any], clinics: List[Dict[str, Any]]):
+    listing = "\n".join(
+        f"- {c['name']} ({c.get('distance_km', '?')} km; "
+        f"{', '.join(c.get('specialties', []))})"
+        for c in clinics
+    )
+    return f"""
+A patient has a probable diagnosis of "{analysis.get('diagnosis', 'unknown')}" and was advised to see a {analysis.get('specialist', GENERAL_SPECIALIST)}.
+
+These clinics are nearby:
+{listing}
+
+In two or three sentences, say which of these clinics to try first and why. Only mention clinics from the list.
 """
 
 
 class AgentState(TypedDict, total=False):
     triage_summary: str
+    # Raw form answers (see triage_fields); the semantic cache key uses them.
+    triage: Dict[str, str]
     location: str
     specialist: str
+    analysis: Dict[str, Any]
     analysis_raw: str
-    clinics_raw: str
-    clinics: List[Dict[str, str]]
+    coords: Optional[Tuple[float, float]]
+    nearby_clinics: List[Dict[str, Any]]
+    clinics: List[Dict[str, Any]]
+    clinic_note: str
 
 
-def node_physician_analysis(state: AgentState) -> AgentState:
-    # For demonstration, simulate physician analysis returning specialist:
-    # You can expand with your existing LLM logic if needed
-    state["specialist"] = "General Physician"  # default fallback
-    # Could also call llm for condition guess here
-    return state
-
-
-def node_clinic_search(state: AgentState) -> AgentState:
-    prompt = build_prompt(
-        state["triage_summary"],
-        state["location"],
-        state.get("specialist", "General Physician"),
+def triage_fields(symptoms, duration, chronic, medications, severity) -> Dict[str, str]:
+    return {
+        "symptoms": str(symptoms or ""),
+        "duration": str(duration or ""),
+        "chronic": str(chronic or ""),
+        "medications": str(medications or ""),
+        "severity": str(severity or ""),
+    }
+
+
+def build_triage_summary(symptoms, duration, chronic, medications, severity) -> str:
+    return "\n".join(
+        [
+            f"Symptoms: {symptoms}",
+            f"Duration: {duration}",
+            f"Chronic conditions: {chronic}",
+            f"Medications: {medications}",
+            f"Severity(1-10): {severity}",
+        ]
+    )
+
+
+# ---- Semantic cache keys ----
+_NUMBER_WORDS = {
+    "a": 1,
+    "an": 1,
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "ten": 10,
+    "few": 3,
+    "couple": 2,
+}
+_UNIT_DAYS = {"hour": 1 / 24, "hr": 1 / 24, "day": 1, "week": 7, "wk": 7}
+_UNIT_DAYS.update({"month": 30, "year": 365, "yr": 365})
+# Upper bound in days -> label
+_DURATION_BUCKETS = ((1, "<1d"), (3, "1-3d"), (7, "4-7d"), (30, "1-4w"), (180, "1-6m"))
+
+
+def duration_bucket(duration: str) -> str:
+    """Coarse duration class, so acute and long-standing complaints never share
+    a cached answer."""
+    m = re.search(
+        r"(\d+(?:\.\d+)?|a|an|one|two|three|four|five|six|seven|ten|few|couple)"
+        r"\s*(?:of\s+)?(hour|hr|day|week|wk|month|year|yr)",
+        duration.lower(),
+    )
+    if not m:
+        return "unknown"
+    count = _NUMBER_WORDS.get(m.group(1)) or float(m.group(1))
+    days = count * _UNIT_DAYS[m.group(2)]
+    for limit, label in _DURATION_BUCKETS:
+        if days <= limit:
+            return label
+    return ">6m"
+
+
+def triage_cache_key(
+    llm, triage: Dict[str, str], kind: str = "physician-analysis", *exact: str
+) -> Tuple[str, str]:
+    """(similarity text, exact partition) for the semantic cache.
+
+    ``triage`` holds the raw form answers (``triage_fields``), so
+    multi-line answers are keyed in full. Free-text answers are matched by
+    similarity; the model, severity, duration class and any ``exact`` parts
+    must match exactly.
+    """
+    text = " | ".join(triage.get(k, "") for k in ("symptoms", "chronic", "medications"))
+    partition = "|".join(
+        [
+            kind,
+            str(llm_params(llm).get("model")),
+            f"severity={triage.get('severity', '')}",
+            f"duration={duration_bucket(triage.get('duration', ''))}",
+            *exact,
+        ]
     )
-    ai_msg = llm.invoke(prompt)
-    content = getattr(ai_msg, "content", str(ai_msg))
-    state["clinics_raw"] = content
-    state["clinics"] = parse_llm_json(content).get("clinics", [])
-    return state
+    return text, partition
+
+
+def _analysis_update(data: Dict[str, Any]) -> AgentState:
+    return {
+        "analysis": data,
+        "analysis_raw": json.dumps(data, ensure_ascii=False),
+        "specialist": data.get("specialist") or GENERAL_SPECIALIST,
+    }
+
+
+# The analysis and the clinic prefetch run in parallel branches, so each
+# node returns only the keys it owns.
+def node_physician_analysis(state: AgentState) -> AgentState:
+    llm = get_llm()
+    use_semantic = semantic_cache_enabled() and "triage" in state
+    if use_semantic:
+        text, partition = triage_cache_key(llm, state["triage"])
+        cached = get_semantic_cache().get(text, partition)
+        if cached is not None:
+            return _analysis_update(json.loads(cached))
+    prompt = build_analysis_prompt(state["triage_summary"])
+    try:
+        data = generate_structured(llm, prompt, ANALYSIS_SCHEMA, agent="physician")
+    except StructuredOutputError as e:
+        return {"analysis": {}, "analysis_raw": e.raw, "specialist": GENERAL_SPECIALIST}
+    if use_semantic:
+        get_semantic_cache().put(text, partition, json.dumps(data, ensure_ascii=False))
+    return _analysis_update(data)
+
+
+def node_clinic_prefetch(state: AgentState) -> AgentState:
+    # Clinics come from the offline directory (utils/clinics.py), not the LLM.
+    directory = get_clinic_directory()
+    coords = directory.geocode(state.get("location", ""))
+    if coords is None:
+        return {"coords": None, "nearby_clinics": []}
+    nearby = directory.nearest(coords, k=CLINIC_RESULTS, max_km=CLINIC_RADIUS_KM)
+    return {"coords": coords, "nearby_clinics": nearby}
+
+
+def node_clinic_refine(state: AgentState) -> AgentState:
+    coords = state.get("coords")
+    clinics = state.get("nearby_clinics", [])
+    if coords is not None:
+        matched = get_clinic_directory().nearest(
+            coords,
+            state.get("specialist", GENERAL_SPECIALIST),
+            k=CLINIC_RESULTS,
+            max_km=CLINIC_RADIUS_KM,
+        )
+        clinics = matched or clinics
+    update: AgentState = {"clinics": clinics}
+    if CLINIC_LLM_MODE == "summary" and clinics and state.get("analysis"):
+        update["clinic_note"] = clinic_note(state, clinics)
+    return update
+
+
+def clinic_note(state: AgentState, clinics: List[Dict[str, Any]]) -> str:
+    llm = get_llm()
+    use_semantic = semantic_cache_enabled() and "triage" in state
+    if use_semantic:
+        # Same city and specialist means the same clinic list to comment on;
+        # geocoded, so "Delhi" and "Delhi, India" share entries.
+        location = state.get("coords") or normalize_city(state.get("location", ""))
+        text, partition = triage_cache_key(
+            llm,
+            state["triage"],
+            "physician-clinic-note",
+            f"location={location}",
+            f"specialist={specialty_key(state.get('specialist')) or ''}",
+        )
+        cached = get_semantic_cache().get(text, partition)
+        if cached is not None:
+            return cached
+    prompt = build_clinic_note_prompt(state["analysis"], clinics)
+    note = cached_invoke(llm, prompt, agent="physician")
+    if use_semantic:
+        get_semantic_cache().put(text, partition, note)
+    return note
 
 
 graph = StateGraph(AgentState)
 graph.add_node("physician_analysis", node_physician_analysis)
-graph.add_node("clinic_search", node_clinic_search)
+graph.add_node("clinic_prefetch", node_clinic_prefetch)
+graph.add_node("clinic_refine", node_clinic_refine)
 graph.add_edge(START, "physician_analysis")
-graph.add_edge("physician_analysis", "clinic_search")
-graph.add_edge("clinic_search", END)
+graph.add_edge(START, "clinic_prefetch")
+graph.add_edge(["physician_analysis", "clinic_prefetch"], "clinic_refine")
+graph.add_edge("clinic_refine", END)
 workflow = graph.compile()
 
 
-def save_booking(booking: Dict[str, Any], path: str = "bookings.json"):
-    data = []
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
-            data = []
-    data.append(booking)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_booking(booking: Dict[str, Any]) -> int:
+    # Raises SlotConflictError if the clinic is already booked at that time
+    return book_appointment(booking)
 
 
 def run_physician_agent():
@@ -148,44 +304,63 @@ def run_physician_agent():
         st.session_state.session = {}
 
     if submitted:
-        triage_summary = "\n".join(
-            [
-                f"Symptoms: {q_symptoms}",
-                f"Duration: {q_duration}",
-                f"Chronic conditions: {q_chronic}",
-                f"Medications: {q_meds}",
-                f"Severity(1-10): {q_severity}",
-            ]
-        )
+        answers = (q_symptoms, q_duration, q_chronic, q_meds, q_severity)
+        triage_summary = build_triage_summary(*answers)
 
         init_state: AgentState = {
             "triage_summary": triage_summary,
+            "triage": triage_fields(*answers),
             "location": city.strip(),
         }
 
         result_state = workflow.invoke(init_state)
 
         st.session_state.session["triage_summary"] = triage_summary
+        st.session_state.session["analysis"] = result_state.get("analysis", {})
+        st.session_state.session["specialist"] = result_state.get("specialist", "")
         st.session_state.session["clinics"] = result_state.get("clinics", [])
-        st.session_state.session["clinics_raw"] = result_state.get("clinics_raw", "")
+        st.session_state.session["clinic_note"] = result_state.get("clinic_note", "")
         st.session_state.session["location"] = city.strip()
 
+    analysis = st.session_state.session.get("analysis", {})
     clinics = st.session_state.session.get("clinics", [])
     location_display = st.session_state.session.get("location", "")
 
+    if analysis:
+        st.subheader("Physician's advice")
+        st.markdown(f"**Probable diagnosis:** {analysis.get('diagnosis', '')}")
+        if analysis.get("treatments"):
+            st.markdown("**Suggested treatment:**")
+            for item in analysis["treatments"]:
+                st.markdown(f"- {item}")
+        if analysis.get("self_care"):
+            st.markdown("**Rest & diet:**")
+            for item in analysis["self_care"]:
+                st.markdown(f"- {item}")
+        if analysis.get("advice"):
+            st.info(analysis["advice"])
+        st.caption(f"Suggested specialist: {analysis.get('specialist', '')}")
+    elif submitted:
+        st.warning("Could not generate advice right now. Please try again.")
+
     if clinics:
         st.subheader(f"Clinics near {location_display or 'you'}")
         for i, c in enumerate(clinics, start=1):
             with st.container():
                 st.markdown(f"**{i}. {c.get('name','Unknown Clinic')}**")
                 st.write(c.get("address", ""))
+                if c.get("distance_km") is not None:
+                    specialties = ", ".join(c.get("specialties", []))
+                    st.caption(f"{c['distance_km']} km away · {specialties}")
                 if c.get("phone"):
                     st.write(f"Phone: {c['phone']}")
                 if c.get("website"):
                     st.markdown(f"[Website]({c['website']})")
+        if st.session_state.session.get("clinic_note"):
+            st.info(st.session_state.session["clinic_note"])
     elif submitted:
         st.info(
-            "No clinic information found. Try a different location or check your input."
+            "No clinics in our directory near this location. Try a nearby major city."
         )
 
     st.markdown(
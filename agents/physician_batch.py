@@ -0,0 +1,149 @@
+# agents/physician_batch.py
+"""Headless bulk triage over the physician workflow.
+
+Streams intake questionnaires from CSV or JSONL, runs ``workflow.invoke``
+for up to ``--concurrency`` rows at a time and appends each result to a
+JSONL file as soon as it finishes. Rerunning with the same output file
+skips rows that already succeeded, so a crashed run resumes where it
+stopped; failed rows are retried.
+
+CLI: python -m agents.physician_batch intake.csv --out triage.jsonl --concurrency 8
+
+Input columns (case-insensitive): id, symptoms, duration, chronic_conditions,
+medications, severity, city. Rows without an ``id`` are keyed by position.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional
+
+from agents.physician_agent import build_triage_summary, triage_fields, workflow
+from utils.batch import (
+    RateLimiter,
+    completed_keys,
+    iter_rows,
+    pick,
+    terminate_last_line,
+)
+
+# Accepted spellings of each input column.
+COLUMNS = {
+    "symptoms": ("symptoms", "symptom", "complaint"),
+    "duration": ("duration",),
+    "chronic": ("chronic_conditions", "chronic conditions", "chronic", "conditions"),
+    "medications": ("medications", "medication", "meds"),
+    "severity": ("severity", "severity(1-10)"),
+    "location": ("city", "location", "area"),
+}
+
+
+def _field(row: Dict[str, Any], name: str) -> str:
+    return pick(row, COLUMNS[name])
+
+
+def row_to_state(row: Dict[str, Any]) -> Dict[str, Any]:
+    answers = [
+        _field(row, name)
+        for name in ("symptoms", "duration", "chronic", "medications", "severity")
+    ]
+    return {
+        "triage_summary": build_triage_summary(*answers),
+        "triage": triage_fields(*answers),
+        "location": _field(row, "location"),
+    }
+
+
+def triage_row(key: str, row: Dict[str, Any], limiter: RateLimiter) -> Dict[str, Any]:
+    limiter.wait()
+    started = time.perf_counter()
+    try:
+        state = workflow.invoke(row_to_state(row))
+    except Exception as e:
+        return {"id": key, "error": f"{type(e).__name__}: {e}"}
+    if not state.get("analysis"):
+        # Unusable model output; recorded as a failure so a rerun retries it.
+        raw = state.get("analysis_raw")
+        return {"id": key, "error": "no valid analysis", "raw": raw}
+    return {
+        "id": key,
+        "specialist": state.get("specialist"),
+        "analysis": state.get("analysis", {}),
+        "clinics": [
+            {"name": c.get("name"), "distance_km": c.get("distance_km")}
+            for c in state.get("clinics", [])
+        ],
+        "clinic_note": state.get("clinic_note", ""),
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def run_batch(
+    in_path: str,
+    out_path: str,
+    concurrency: int = 4,
+    rate: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Process ``in_path`` into ``out_path``; returns a summary report."""
+    done = completed_keys(out_path)
+    limiter = RateLimiter(rate)
+    report = {"processed": 0, "failed": 0, "skipped": 0}
+    started = time.perf_counter()
+    # Only a bounded window of rows is in flight, so memory stays flat on
+    # arbitrarily large inputs.
+    window = max(1, concurrency) * 2
+    terminate_last_line(out_path)
+    with open(out_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=max(1, concurrency)
+    ) as pool:
+
+        def drain(pending, block_until):
+            while len(pending) > block_until:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pending.discard(future)
+                    record = future.result()
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    report["failed" if "error" in record else "processed"] += 1
+
+        pending = set()
+        submitted = 0
+        for key, row in iter_rows(in_path):
+            if key in done:
+                report["skipped"] += 1
+                continue
+            if limit is not None and submitted >= limit:
+                break
+            pending.add(pool.submit(triage_row, key, row, limiter))
+            submitted += 1
+            drain(pending, window - 1)
+        drain(pending, 0)
+
+    elapsed = time.perf_counter() - started
+    finished = report["processed"] + report["failed"]
+    report["seconds"] = round(elapsed, 2)
+    report["rows_per_second"] = round(finished / elapsed, 2) if elapsed else 0.0
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the physician workflow over a CSV/JSONL of intake forms."
+    )
+    parser.add_argument("input", help="CSV or JSONL file of intake questionnaires")
+    parser.add_argument("--out", required=True, help="JSONL results (appended)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--rate", type=float, default=None, help="max rows started per second"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="stop after N rows")
+    args = parser.parse_args(argv)
+    report = run_batch(args.input, args.out, args.concurrency, args.rate, args.limit)
+    print(json.dumps(report, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
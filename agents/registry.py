@@ -0,0 +1,30 @@
+# agents/registry.py
+import importlib
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+
+# Each service maps to (module path, entry point). Modules are imported only
+# when their option is picked, so the app starts without building any LLM
+# client, LangGraph graph or SQLite connection.
+AGENTS: Dict[str, Tuple[str, str]] = {
+    "Feeling Sick?": ("agents.physician_agent", "run_physician_agent"),
+    "Diet Planner": ("agents.diet_planner_agent", "run_diet_planner_agent"),
+    "Mental Health Issue": ("agents.mental_health_agent", "run_mental_health_agent"),
+}
+
+
+def agent_options():
+    return list(AGENTS.keys())
+
+
+@lru_cache(maxsize=None)
+def get_agent(option: str) -> Callable[[], None]:
+    """Import the agent module for `option` on first use and return its runner."""
+    module_name, func_name = AGENTS[option]
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)
+
+
+def run_agent(option: str):
+    if option in AGENTS:
+        get_agent(option)()
@@ -1,7 +1,5 @@
 import streamlit as st
-from agents.physician_agent import run_physician_agent
-from agents.diet_planner_agent import run_diet_planner_agent
-from agents.mental_health_agent import run_mental_health_agent
+from agents.registry import agent_options, run_agent
 
 st.set_page_config(page_title="Wellness Clinic AI", layout="centered")
 
@@ -10,14 +8,8 @@ st.subheader("Choose a service below:")
 
 option = st.selectbox(
     "How can we help you today?",
-    ["Select", "Feeling Sick?", "Diet Planner", "Mental Health Issue"],
+    ["Select"] + agent_options(),
 )
 
-if option == "Feeling Sick?":
-    run_physician_agent()
-
-elif option == "Diet Planner":
-    run_diet_planner_agent()
-
-elif option == "Mental Health Issue":
-    run_mental_health_agent()
+# Agent modules are imported lazily, only once their service is picked.
+run_agent(option)
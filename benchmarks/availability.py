@@ -0,0 +1,118 @@
+# benchmarks/availability.py
+"""Slot availability checks: AvailabilityIndex vs scanning every booking.
+
+Generates random 30-minute bookings across many clinics and days, then
+times conflict checks, reservations and free-slot listings.
+
+Usage: python benchmarks/availability.py [--bookings 150000] [--clinics 300]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.availability import (  # noqa: E402
+    AvailabilityIndex,
+    SlotConflictError,
+    to_minutes,
+)
+
+SLOTS = [f"{h:02d}:{m:02d}" for h in range(9, 18) for m in (0, 30)]
+
+
+def make_bookings(count: int, clinics: int, days: int, rng: random.Random):
+    first = date(2025, 1, 1)
+    seen = set()
+    bookings = []
+    while len(bookings) < count:
+        key = (
+            f"Clinic {rng.randrange(clinics)}",
+            (first + timedelta(days=rng.randrange(days))).isoformat(),
+            rng.choice(SLOTS),
+        )
+        if key in seen:
+            continue
+        seen.add(key)
+        clinic, day, slot = key
+        bookings.append(
+            {"clinic_title": clinic, "appointment_date": day, "appointment_time": slot}
+        )
+    return bookings
+
+
+def scan_is_free(bookings, clinic, day, time, duration=30):
+    start = to_minutes(time)
+    end = start + duration
+    for b in bookings:
+        if b["clinic_title"] == clinic and b["appointment_date"] == day:
+            other = to_minutes(b["appointment_time"])
+            if other < end and start < other + duration:
+                return False
+    return True
+
+
+def timed(label, fn, n):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1e6 / n:10.2f} us/op  ({n:,} ops)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=150_000)
+    parser.add_argument("--clinics", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    bookings = make_bookings(args.bookings, args.clinics, args.days, rng)
+    probes = [
+        (b["clinic_title"], b["appointment_date"], rng.choice(SLOTS))
+        for b in rng.choices(bookings, k=args.queries)
+    ]
+
+    index = AvailabilityIndex()
+    timed("build index", lambda: index.load(bookings), len(bookings))
+
+    free = timed(
+        "is_free (index)",
+        lambda: sum(index.is_free(*p) for p in probes),
+        len(probes),
+    )
+    scan_n = min(200, len(probes))
+    scan_free = timed(
+        "is_free (scan all bookings)",
+        lambda: sum(scan_is_free(bookings, *p) for p in probes[:scan_n]),
+        scan_n,
+    )
+    assert scan_free == sum(index.is_free(*p) for p in probes[:scan_n])
+
+    def reserve_all():
+        conflicts = 0
+        for p in probes:
+            try:
+                index.reserve(*p)
+            except SlotConflictError:
+                conflicts += 1
+        return conflicts
+
+    conflicts = timed("reserve (with conflicts)", reserve_all, len(probes))
+    timed(
+        "free_slots (9:00-18:00)",
+        lambda: [index.free_slots(c, d) for c, d, _ in probes],
+        len(probes),
+    )
+    print(f"bookings indexed: {len(index):,}")
+    print(f"probes free: {free:,}/{len(probes):,}")
+    print(f"reservations rejected: {conflicts:,}")
+
+
+if __name__ == "__main__":
+    main()
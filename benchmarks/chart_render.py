@@ -0,0 +1,100 @@
+# benchmarks/chart_render.py
+"""Macro chart cost and memory: the old per-call pyplot figure vs utils/charts.
+
+The old path opened a pyplot figure per chart and never closed it. The
+new PNG path draws on a bare Figure and clears it, SVG skips matplotlib
+altogether, and both are LRU-cached by rounded grams. RSS is sampled
+after each phase; the cached phases render more distinct splits than the
+cache holds, so a bounded cache shows up as flat RSS.
+
+Usage: python benchmarks/chart_render.py [--charts 300]
+"""
+import argparse
+import io
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+from utils import charts  # noqa: E402
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak rather than current RSS where /proc is unavailable.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def legacy_chart(macros):
+    # What plot_macros_chart did, with st.pyplot's savefig in place of
+    # Streamlit.
+    labels = list(macros.keys())
+    values = list(macros.values())
+    fig, ax = plt.subplots()
+    ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+    ax.axis("equal")
+    fig.savefig(io.BytesIO(), format="png")
+
+
+def random_macros(rng):
+    return {
+        "Protein": rng.uniform(40, 200),
+        "Carbs": rng.uniform(80, 350),
+        "Fats": rng.uniform(20, 120),
+    }
+
+
+def phase(label, render, inputs):
+    start = time.perf_counter()
+    for macros in inputs:
+        render(macros)
+    per_chart = (time.perf_counter() - start) / len(inputs)
+    unit, scale = ("ms", 1e3) if per_chart >= 1e-3 else ("us", 1e6)
+    print(f"{label:<24} {per_chart * scale:9.1f} {unit}/chart   RSS {rss_mb():7.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--charts", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    distinct = [random_macros(rng) for _ in range(args.charts)]
+    repeated = [distinct[i % 20] for i in range(args.charts * 10)]
+    print(f"cache size {charts.CHART_CACHE_SIZE}, start RSS {rss_mb():.1f} MB")
+
+    charts.render_macros_png(distinct[0])  # import and font cache warm-up
+    charts.clear_chart_cache()
+    phase("png, distinct splits", charts.render_macros_png, distinct)
+    phase("png, distinct again", charts.render_macros_png, distinct)
+    for macros in repeated[:20]:
+        charts.render_macros_png(macros)
+    phase("png, 20 hot splits", charts.render_macros_png, repeated)
+    phase("svg, distinct splits", charts.render_macros_svg, distinct)
+    for macros in repeated[:20]:
+        charts.render_macros_svg(macros)
+    phase("svg, 20 hot splits", charts.render_macros_svg, repeated)
+    print("cache (hits, misses, size):", charts.chart_cache_info())
+
+    phase("legacy pyplot, no close", legacy_chart, distinct)
+    phase("legacy pyplot, again", legacy_chart, distinct)
+    print(f"figures left open by legacy path: {len(plt.get_fignums())}")
+
+
+if __name__ == "__main__":
+    main()
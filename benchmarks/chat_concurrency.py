@@ -0,0 +1,120 @@
+# benchmarks/chat_concurrency.py
+"""Run N chat threads in parallel against the checkpoint store.
+
+Compares the old setup (one shared sqlite3 connection behind SqliteSaver's
+global lock) with the WAL connection pool from utils/chatbot/storage.py.
+The model is faked with a short sleep so only persistence is measured.
+With --processes > 1, several app processes share the same DB file, as
+when Streamlit runs behind multiple workers.
+
+Usage: python benchmarks/chat_concurrency.py [--threads 16] [--turns 20] [--processes 4]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Annotated, TypedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage  # noqa: E402
+from langgraph.checkpoint.sqlite import SqliteSaver  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+from langgraph.graph.message import add_messages  # noqa: E402
+
+from utils.chatbot.storage import ConnectionPool, PooledSqliteSaver  # noqa: E402
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+
+
+def make_node(latency: float):
+    def chat_node(state: ChatState):
+        time.sleep(latency)
+        return {"messages": [AIMessage(content="Take a slow breath.", id=str(uuid.uuid4()))]}
+
+    return chat_node
+
+
+def build(checkpointer, latency):
+    graph = StateGraph(ChatState)
+    graph.add_node("chat_node", make_node(latency))
+    graph.add_edge(START, "chat_node")
+    graph.add_edge("chat_node", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run(app, threads: int, turns: int, offset: int = 0):
+    errors = []
+
+    def session(i):
+        config = {"configurable": {"thread_id": f"bench-{offset + i}"}}
+        for turn in range(turns):
+            try:
+                app.invoke(
+                    {"messages": [HumanMessage(content=f"turn {turn}", id=str(uuid.uuid4()))]},
+                    config=config,
+                )
+                # Reads interleave with writes, as when the sidebar reloads.
+                app.get_state(config)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(session, range(threads)))
+    return time.perf_counter() - start, errors
+
+
+def make_saver(kind: str, path: str):
+    if kind == "shared connection":
+        return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+    return PooledSqliteSaver(ConnectionPool(path))
+
+
+def worker(kind, path, threads, turns, latency, offset):
+    """One app process (e.g. a Streamlit worker) sharing the DB file."""
+    app = build(make_saver(kind, path), latency)
+    elapsed, errors = run(app, threads, turns, offset=offset)
+    return len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument(
+        "--processes", type=int, default=1, help="app processes sharing one DB file"
+    )
+    parser.add_argument("--dir", default=None, help="where to create the test DBs")
+    args = parser.parse_args()
+    tmp = tempfile.mkdtemp(dir=args.dir)
+
+    total = args.processes * args.threads * args.turns
+    print(f"{args.processes} process(es) x {args.threads} threads x {args.turns} turns\n")
+    print(f"{'store':<20}{'seconds':>9}{'turns/s':>10}{'errors':>8}")
+    for kind in ("shared connection", "WAL pool"):
+        path = os.path.join(tmp, kind.replace(" ", "_") + ".db")
+        # Create the schema up front so workers do not race on setup.
+        make_saver(kind, path).setup()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.processes) as procs:
+            futures = [
+                procs.submit(
+                    worker, kind, path, args.threads, args.turns, args.latency, i * args.threads
+                )
+                for i in range(args.processes)
+            ]
+            errors = sum(f.result() for f in futures)
+        elapsed = time.perf_counter() - start
+        print(f"{kind:<20}{elapsed:>9.2f}{total / elapsed:>10.0f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
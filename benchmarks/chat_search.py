@@ -0,0 +1,93 @@
+# benchmarks/chat_search.py
+"""Full-text search latency over a large synthetic chat history.
+
+Fills a fresh thread_messages table (with its FTS5 index and triggers)
+through utils.chatbot.history.MessageStore, then times search queries.
+
+Usage: python benchmarks/chat_search.py [--messages 1000000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.chatbot.history import MessageStore  # noqa: E402
+from utils.chatbot.storage import ConnectionPool  # noqa: E402
+
+WELLNESS = (
+    "anxious tired sleep work exam family breathing walk music stress panic "
+    "calm journal friend lonely headache meditation gratitude deadline run "
+    "therapy morning night overwhelmed hopeful sad happy angry focus rest"
+).split()
+SYLLABLES = "ka lo mi ne ru sa te vi do fa ge hu ji ko lu ma".split()
+
+
+def vocabulary(size: int = 20000):
+    """Zipf-distributed vocabulary; the wellness words sit in the top ranks."""
+    rng = random.Random(42)
+    filler = set()
+    while len(filler) < size:
+        filler.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(filler)
+    rng.shuffle(words)
+    for i, word in enumerate(WELLNESS):
+        words.insert(20 + i * 10, word)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def fill(store: MessageStore, messages: int, per_thread: int = 200, batch: int = 20000):
+    rng = random.Random(0)
+    words, weights = vocabulary()
+    conn = store.pool.connection()
+    rows = []
+    now = time.time()
+    for i in range(messages):
+        thread, seq = divmod(i, per_thread)
+        text = " ".join(rng.choices(words, weights, k=rng.randint(8, 30)))
+        rows.append((f"t{thread}", seq, None, "user" if seq % 2 == 0 else "assistant", text, now))
+        if len(rows) == batch:
+            conn.executemany("INSERT INTO thread_messages VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+            rows.clear()
+    if rows:
+        conn.executemany("INSERT INTO thread_messages VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args()
+
+    pool = ConnectionPool(os.path.join(tempfile.mkdtemp(dir=args.dir), "search.db"))
+    store = MessageStore(pool)
+    start = time.perf_counter()
+    fill(store, args.messages)
+    print(f"indexed {args.messages:,} messages in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(1)
+    queries = [
+        " ".join(rng.sample(WELLNESS, rng.randint(1, 3))) for _ in range(args.queries)
+    ] + ["medit", "panic breath"]
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        store.search(query, limit=20)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"queries: {len(timings)}")
+    print(f"median : {statistics.median(timings):.2f} ms")
+    print(f"p95    : {timings[int(len(timings) * 0.95) - 1]:.2f} ms")
+    print(f"max    : {timings[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
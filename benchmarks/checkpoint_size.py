@@ -0,0 +1,88 @@
+# benchmarks/checkpoint_size.py
+"""Checkpoint bytes and write time vs thread length.
+
+Runs the chat graph shape from utils/chatbot/backend.py against a fresh
+SQLite checkpointer with a fake model, comparing a node that returns the
+full history (old behaviour) with one that returns only the new message.
+
+Usage: python benchmarks/checkpoint_size.py [--turns 200] [--every 50]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+REPLY = "That sounds hard. Try a slow breath in for four counts. " * 3
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+
+
+def full_history_node(state: ChatState):
+    reply = AIMessage(content=REPLY, id=str(uuid.uuid4()))
+    return {"messages": state["messages"] + [reply]}
+
+
+def delta_node(state: ChatState):
+    return {"messages": [AIMessage(content=REPLY, id=str(uuid.uuid4()))]}
+
+
+def db_bytes(conn) -> int:
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+
+def run(node, turns: int, every: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    conn = sqlite3.connect(path, check_same_thread=False)
+    graph = StateGraph(ChatState)
+    graph.add_node("chat_node", node)
+    graph.add_edge(START, "chat_node")
+    graph.add_edge("chat_node", END)
+    app = graph.compile(checkpointer=SqliteSaver(conn))
+    config = {"configurable": {"thread_id": "bench"}}
+
+    rows = []
+    window = 0.0
+    for turn in range(1, turns + 1):
+        message = HumanMessage(content=f"turn {turn}: feeling anxious", id=str(uuid.uuid4()))
+        start = time.perf_counter()
+        app.invoke({"messages": [message]}, config=config)
+        window += time.perf_counter() - start
+        if turn % every == 0:
+            rows.append((turn, db_bytes(conn), window / every * 1000))
+            window = 0.0
+    messages = app.get_state(config).values["messages"]
+    assert len(messages) == 2 * turns, "duplicate or missing messages"
+    conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--every", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {
+        "full history": run(full_history_node, args.turns, args.every),
+        "delta only": run(delta_node, args.turns, args.every),
+    }
+    print(f"{'mode':<14}{'turns':>7}{'db KiB':>10}{'ms/turn':>10}")
+    for mode, rows in results.items():
+        for turn, size, ms in rows:
+            print(f"{mode:<14}{turn:>7}{size / 1024:>10.0f}{ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
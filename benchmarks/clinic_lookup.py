@@ -0,0 +1,86 @@
+# benchmarks/clinic_lookup.py
+"""Nearest-clinic lookup: per-speciality k-d trees vs a full scan.
+
+Builds a ClinicDirectory over randomly placed synthetic clinics, checks
+that the k-d tree returns the same clinics as sorting every clinic by
+distance, and times both.
+
+Usage: python benchmarks/clinic_lookup.py [--clinics 100000] [--k 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.clinics import (  # noqa: E402
+    SPECIALTY_ALIASES,
+    ClinicDirectory,
+    haversine_km,
+    specialty_key,
+)
+
+SPECIALTIES = list(SPECIALTY_ALIASES)
+
+
+def make_clinics(count: int, rng: random.Random):
+    # Roughly the bounding box of India
+    return [
+        {
+            "name": f"Clinic {i}",
+            "lat": rng.uniform(8.0, 33.0),
+            "lon": rng.uniform(69.0, 89.0),
+            "specialties": rng.sample(SPECIALTIES, rng.randint(1, 4)),
+        }
+        for i in range(count)
+    ]
+
+
+def scan_nearest(clinics, coords, specialist, k):
+    key = specialty_key(specialist)
+    pool = [c for c in clinics if key is None or key in c["specialties"]]
+    pool.sort(key=lambda c: haversine_km(coords, (c["lat"], c["lon"])))
+    return pool[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clinics", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    clinics = make_clinics(args.clinics, rng)
+    start = time.perf_counter()
+    directory = ClinicDirectory(clinics)
+    print(f"build: {time.perf_counter() - start:.2f}s for {len(clinics):,} clinics")
+
+    queries = [
+        (
+            (rng.uniform(8.0, 33.0), rng.uniform(69.0, 89.0)),
+            rng.choice(["Cardiologist", "ENT Specialist", "Psychiatrist", None]),
+        )
+        for _ in range(args.queries)
+    ]
+    start = time.perf_counter()
+    for coords, specialist in queries:
+        directory.nearest(coords, specialist, k=args.k)
+    tree_us = (time.perf_counter() - start) * 1e6 / len(queries)
+
+    sample = queries[:20]
+    start = time.perf_counter()
+    expected = [scan_nearest(clinics, c, s, args.k) for c, s in sample]
+    scan_us = (time.perf_counter() - start) * 1e6 / len(sample)
+    for (coords, specialist), want in zip(sample, expected):
+        got = directory.nearest(coords, specialist, k=args.k)
+        assert [c["name"] for c in got] == [c["name"] for c in want]
+
+    print(f"k-d tree : {tree_us:10.1f} us/query ({len(queries):,} queries)")
+    print(f"full scan: {scan_us:10.1f} us/query ({len(sample)} queries, same results)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/diet_batch.py
+"""Batch diet planning throughput vs concurrency.
+
+Runs agents/diet_batch.run_batch over a synthetic roster with a fake model
+that sleeps for a fixed time per call (standing in for provider latency)
+and returns a valid one-day plan, at several concurrency levels. Charts
+are rendered for real in the process pool.
+
+Usage: python benchmarks/diet_batch.py [--profiles 48] [--delay 0.3]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+from agents.diet_batch import run_batch  # noqa: E402
+from llms.provider import set_llm  # noqa: E402
+from utils.charts import save_macros_chart  # noqa: E402
+
+PLAN = {
+    "daily_plan": [
+        {
+            "day": "Day 1",
+            "meals": [
+                {"meal": "Breakfast", "description": "Oats with milk", "calories": 350},
+                {"meal": "Lunch", "description": "Dal, rice, salad", "calories": 600},
+                {"meal": "Dinner", "description": "Paneer and roti", "calories": 550},
+            ],
+            "total_calories": 1500,
+            "macros": {"protein_g": 90, "carbs_g": 180, "fats_g": 45},
+        }
+    ],
+    "grocery_list": ["oats", "milk", "dal", "rice", "paneer"],
+}
+ACTIVITY = ["Sedentary", "Light", "Moderate", "Active", "Very Active"]
+GOALS = ["Lose Weight", "Maintain Weight", "Gain Weight", "Build Strength / Muscle"]
+
+
+class SlowFakeLLM(BaseChatModel):
+    delay: float = 0.3
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.delay)
+        message = AIMessage(content=json.dumps(PLAN))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def write_roster(path: str, profiles: int):
+    rng = random.Random(7)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["id", "age", "gender", "height_cm", "weight_kg", "activity_level", "goal"]
+        )
+        for i in range(profiles):
+            writer.writerow(
+                [
+                    f"emp{i}",
+                    rng.randint(20, 60),
+                    rng.choice(["Male", "Female"]),
+                    rng.randint(150, 190),
+                    rng.randint(45, 110),
+                    rng.choice(ACTIVITY),
+                    rng.choice(GOALS),
+                ]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=48)
+    parser.add_argument("--delay", type=float, default=0.3)
+    parser.add_argument("--chart-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    set_llm(SlowFakeLLM(delay=args.delay))
+    tmp = tempfile.mkdtemp()
+    roster = os.path.join(tmp, "roster.csv")
+    write_roster(roster, args.profiles)
+
+    start = time.perf_counter()
+    for i in range(20):
+        save_macros_chart({"Protein": 90, "Carbs": 180, "Fats": 45}, f"{tmp}/c{i}.png")
+    chart_ms = (time.perf_counter() - start) / 20 * 1000
+    print(f"one chart in-process: {chart_ms:.1f} ms")
+
+    for concurrency in (1, 4, 8, 16):
+        out = os.path.join(tmp, f"out-{concurrency}")
+        report = run_batch(roster, out, concurrency, chart_workers=args.chart_workers)
+        print(
+            f"concurrency {concurrency:>2}: "
+            f"{report['profiles_per_second']:6.2f} profiles/s, "
+            f"{report['charts_per_second']:6.2f} charts/s, "
+            f"LLM overlap {report['llm_parallelism']:.1f}x "
+            f"({report['processed']} ok, {report['failed']} failed, "
+            f"{report['seconds']} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
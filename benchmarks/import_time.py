@@ -0,0 +1,57 @@
+# benchmarks/import_time.py
+"""Compare cold-start import cost of eager agent imports vs the lazy registry.
+
+Usage: python benchmarks/import_time.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EAGER = (
+    "from agents.physician_agent import run_physician_agent\n"
+    "from agents.diet_planner_agent import run_diet_planner_agent\n"
+    "from agents.mental_health_agent import run_mental_health_agent\n"
+)
+LAZY = "from agents.registry import agent_options, run_agent\n"
+
+
+def time_import(code: str, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        samples.append(elapsed)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lazy = time_import(LAZY, args.runs)
+    print(f"lazy registry : {lazy * 1000:8.1f} ms")
+    try:
+        eager = time_import(EAGER, args.runs)
+    except RuntimeError as e:
+        print(f"eager imports : failed ({e})")
+        return
+    print(f"eager imports : {eager * 1000:8.1f} ms")
+    print(f"speedup       : {eager / lazy:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# benchmarks/meal_plan.py
+"""Wall-clock time of N-day meal plans: per-day requests in parallel vs in turn.
+
+A fake model sleeps for a fixed time per call and answers each day prompt
+with meals on a different main ingredient per day. With ``--repeats`` some
+days come back with day 1's dinner ingredient in a reworded dish, to
+exercise the re-planning rounds. Redone days all pick the same first
+dinner ingredient not yet used, so they clash with each other and need
+the re-check.
+
+Usage: python benchmarks/meal_plan.py [--days 7] [--delay 1.0] [--repeats 2]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from pydantic import PrivateAttr  # noqa: E402
+
+from agents import diet_planner_agent as diet  # noqa: E402
+from llms.provider import set_llm  # noqa: E402
+from utils.meal_plan import dish_key  # noqa: E402
+from utils.structured_output import MEAL_PLAN_SCHEMA, generate_structured  # noqa: E402
+
+PROFILE = (32, "Female", 162.0, 60.0, "Moderate", "Maintain Weight", "Vegetarian")
+BREAKFASTS = ["oats", "poha", "idli", "chilla", "upma", "dosa", "dalia"]
+MAINS = ["paneer", "chickpeas", "rajma", "moong dal", "tofu", "soya", "masoor dal"]
+
+
+def meal(name, description, calories, main):
+    return {
+        "meal": name,
+        "description": description,
+        "calories": calories,
+        "main_ingredient": main,
+    }
+
+
+class SlowFakeLLM(BaseChatModel):
+    delay: float = 1.0
+    repeats: int = 0
+    calls: int = 0
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.delay)
+        prompt = messages[-1].content
+        day = re.search(r"this is day (\d+)", prompt, re.I)
+        day = int(day.group(1)) if day else 1
+        i = day - 1
+        breakfast = BREAKFASTS[i % len(BREAKFASTS)]
+        lunch = MAINS[i % len(MAINS)]
+        dinner = MAINS[(i + len(MAINS) // 2) % len(MAINS)]
+        dinner_text = f"{dinner} curry"
+        avoid = re.search(r"Do not repeat these dishes from other days: (.*)", prompt)
+        if avoid:
+            kept = avoid.group(1)
+            dinner = next(m for m in MAINS if f"Dinner: {m} curry" not in kept)
+            dinner_text = f"{dinner} curry"
+        elif 1 < day <= 1 + self.repeats:
+            dinner = MAINS[len(MAINS) // 2]  # day 1's dinner, reworded
+            dinner_text = f"Spicy {dinner} masala"
+        with self._lock:
+            self.calls += 1
+        plan = {
+            "daily_plan": [
+                {
+                    "day": f"Day {day}",
+                    "meals": [
+                        meal("Breakfast", breakfast, 400, breakfast),
+                        meal("Snack 1", "Fruit", 100, "fruit"),
+                        meal("Lunch", f"{lunch} bowl", 600, lunch),
+                        meal("Dinner", dinner_text, 550, dinner),
+                    ],
+                    "total_calories": 1650,
+                    "macros": {"protein_g": 80, "carbs_g": 200, "fats_g": 55},
+                }
+            ],
+            "grocery_list": [
+                f"200 g {lunch}",
+                f"150 g {dinner}",
+                "1 cup curd",
+                "Spinach",
+                "2 bananas",
+            ],
+        }
+        message = AIMessage(content=json.dumps(plan))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def sequential_plan(days: int):
+    # The same per-day prompts, one after another.
+    llm = diet.get_llm()
+    return [
+        generate_structured(
+            llm, diet.build_diet_prompt(*PROFILE, day=d, days=days), MEAL_PLAN_SCHEMA
+        )
+        for d in range(1, days + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--repeats", type=int, default=0)
+    args = parser.parse_args()
+
+    llm = SlowFakeLLM(delay=args.delay, repeats=args.repeats)
+    set_llm(llm)
+
+    start = time.perf_counter()
+    generate_structured(llm, diet.build_diet_prompt(*PROFILE), MEAL_PLAN_SCHEMA)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sequential_plan(args.days)
+    sequential = time.perf_counter() - start
+
+    llm.calls = 0
+    start = time.perf_counter()
+    plan = diet.generate_meal_plan(*PROFILE, days=args.days)
+    parallel = time.perf_counter() - start
+
+    dinners = [
+        dish_key(day["meals"][-1])
+        for day in plan["daily_plan"]
+    ]
+    print(f"1-day plan:                  {single:6.2f} s")
+    print(f"{args.days}-day plan, days in turn:    {sequential:6.2f} s")
+    print(f"{args.days}-day plan, days in parallel: {parallel:6.2f} s")
+    print(f"distinct dinners: {len(set(dinners))}/{len(dinners)}")
+    print(f"day requests: {llm.calls} for {args.days} days")
+    print(f"grocery list: {args.days * 5} day items -> {len(plan['grocery_list'])}")
+    for item in plan["grocery_list"]:
+        print(f"  {item}")
+
+
+if __name__ == "__main__":
+    main()
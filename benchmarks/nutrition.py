@@ -0,0 +1,105 @@
+# benchmarks/nutrition.py
+"""Cohort nutrition targets: vectorised utils.nutrition vs the scalar loop.
+
+Builds a synthetic cohort, computes BMR/TDEE/target calories/macro grams
+with ``cohort_targets`` (from label columns and from integer codes) and
+with the scalar functions row by row, and reports the time of each.
+tests/test_nutrition.py checks that the two agree.
+
+Usage: python benchmarks/nutrition.py [--profiles 1000000] [--scalar 200000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import nutrition as n  # noqa: E402
+
+
+def make_cohort(size: int, odd_share: float = 0.02, seed: int = 0):
+    rng = np.random.default_rng(seed)
+
+    def column(labels, odd):
+        # Mostly form labels, plus ``odd_share`` of free-text spellings.
+        values = np.array(labels + odd)
+        weights = [(1 - odd_share) / len(labels)] * len(labels)
+        weights += [odd_share / len(odd)] * len(odd)
+        return values[rng.choice(len(values), size, p=weights)]
+
+    return {
+        "age": rng.integers(18, 90, size),
+        "gender": column(n.GENDERS, ("male", "FEMALE")),
+        "height": rng.uniform(140, 200, size).round(1),
+        "weight": rng.uniform(40, 140, size).round(1),
+        "activity": column(n.ACTIVITY_LEVELS, ("Unknown",)),
+        "goal": column(n.GOALS, ("Recomp",)),
+    }
+
+
+def scalar_targets(cohort, rows: int):
+    out = {key: np.empty(rows) for key in ("bmr", "tdee", "target_calories")}
+    for key in ("protein_g", "carbs_g", "fats_g"):
+        out[key] = np.empty(rows)
+    columns = [
+        cohort[key][:rows].tolist()
+        for key in ("age", "gender", "height", "weight", "activity", "goal")
+    ]
+    for i, (age, gender, height, weight, activity, goal) in enumerate(zip(*columns)):
+        bmr = n.calculate_bmr(age, gender, height, weight)
+        tdee = n.calculate_tdee(bmr, activity)
+        target = n.adjust_calories_for_goal(tdee, goal)
+        macros = n.calculate_macro_targets(target, goal, weight)
+        out["bmr"][i], out["tdee"][i], out["target_calories"][i] = bmr, tdee, target
+        for key, grams in macros.items():
+            out[key][i] = grams
+    return out
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    parser.add_argument("--scalar", type=int, default=200_000, help="rows to loop")
+    args = parser.parse_args()
+
+    cohort = make_cohort(args.profiles)
+    columns = [
+        cohort[key] for key in ("age", "gender", "height", "weight", "activity", "goal")
+    ]
+    _, vector_s = timed(n.cohort_targets, *columns)
+
+    codes = dict(cohort)
+    codes["gender"] = n.encode(cohort["gender"], n.GENDERS, casefold=True)
+    codes["activity"] = n.encode(cohort["activity"], n.ACTIVITY_LEVELS)
+    codes["goal"] = n.encode(cohort["goal"], n.GOALS)
+    coded_columns = [
+        codes[key] for key in ("age", "gender", "height", "weight", "activity", "goal")
+    ]
+    _, coded_s = timed(n.cohort_targets, *coded_columns)
+
+    rows = min(args.scalar, args.profiles)
+    _, scalar_s = timed(scalar_targets, cohort, rows)
+    per_row = scalar_s / rows
+
+    print(f"{args.profiles:,} profiles")
+    print(f"vectorised, label columns: {vector_s * 1000:8.1f} ms")
+    print(f"vectorised, integer codes: {coded_s * 1000:8.1f} ms")
+    print(
+        f"scalar loop:               {per_row * args.profiles * 1000:8.1f} ms"
+        f" (extrapolated from {rows:,} rows)"
+    )
+    speedup = per_row * args.profiles / vector_s
+    print(f"speed-up (labels): {speedup:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/physician_workflow.py
+"""End-to-end latency of the physician workflow: parallel vs chained nodes.
+
+Runs agents/physician_agent.py's nodes against a fake model that sleeps
+for a fixed time per call, once as the shipped graph (analysis and clinic
+prefetch in parallel branches) and once chained one after the other.
+Clinics come from the offline directory, so the prefetch branch itself
+costs microseconds.
+
+Usage: python benchmarks/physician_workflow.py [--delay 1.0] [--runs 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+
+from agents import physician_agent as pa  # noqa: E402
+from llms.provider import set_llm  # noqa: E402
+
+ANALYSIS = {
+    "diagnosis": "Seasonal allergic rhinitis",
+    "specialist": "ENT Specialist",
+    "self_care": ["Rest", "Drink warm fluids"],
+}
+
+
+class SlowFakeLLM(BaseChatModel):
+    delay: float = 1.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.delay)
+        message = AIMessage(content=json.dumps(ANALYSIS))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def chained_workflow():
+    graph = StateGraph(pa.AgentState)
+    graph.add_node("physician_analysis", pa.node_physician_analysis)
+    graph.add_node("clinic_prefetch", pa.node_clinic_prefetch)
+    graph.add_node("clinic_refine", pa.node_clinic_refine)
+    graph.add_edge(START, "physician_analysis")
+    graph.add_edge("physician_analysis", "clinic_prefetch")
+    graph.add_edge("clinic_prefetch", "clinic_refine")
+    graph.add_edge("clinic_refine", END)
+    return graph.compile()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    set_llm(SlowFakeLLM(delay=args.delay))
+    state = {"triage_summary": "Symptoms: sneezing, blocked nose", "location": "Delhi"}
+    for label, workflow in (("chained", chained_workflow()), ("parallel", pa.workflow)):
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            result = workflow.invoke(dict(state))
+        elapsed = (time.perf_counter() - start) / args.runs
+        first = result["clinics"][0]["name"] if result["clinics"] else "-"
+        print(f"{label:<9} {elapsed:6.2f} s/run  (top clinic: {first})")
+    print(f"slowest single call: {args.delay:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/semantic_cache.py
+"""Semantic cache: lookup latency at capacity and hit rate on paraphrases.
+
+Fills a SemanticCache with synthetic complaints, then times lookups and
+checks which paraphrase pairs hit (and which different complaints stay
+misses) at the default threshold. Red-flag pairs add one alarming symptom
+or flip a negation; they must always miss.
+
+Usage: python benchmarks/semantic_cache.py [--entries 5000] [--lookups 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llms.semantic_cache import SemanticCache, embed  # noqa: E402
+
+PARAPHRASES = [
+    ("sore throat", "throat pain"),
+    ("headache and fever", "fever with headaches"),
+    ("sore throat, mild fever", "throat pain and fever"),
+    ("stomach ache after eating", "abdominal pain after meals"),
+    ("coughing at night", "cough at night"),
+    ("no fever, sore throat", "throat pain without fever"),
+]
+DIFFERENT = [
+    ("throat pain", "chest pain"),
+    ("back pain", "stomach pain"),
+    ("headache", "knee swelling"),
+]
+# (stored, asked): the asked complaint must never get the stored answer.
+RED_FLAGS = [
+    ("cough, cold, fever", "cough, cold, fever, blood in cough"),
+    ("fever, headache, vomiting", "fever, headache, vomiting, confusion"),
+    ("headache and fever", "headache and fever with stiff neck"),
+    ("chest pain after running", "chest pain after running, arm numbness"),
+    ("stomach pain, nausea", "stomach pain, nausea, black stools"),
+    ("sore throat, no fever", "sore throat, fever"),
+    ("headache, no vomiting", "headache with vomiting"),
+    ("chest pain", "no chest pain"),
+    ("breathless at night", "not breathless at night"),
+]
+BODY = "head throat chest back stomach knee ear eye skin tooth neck shoulder".split()
+COMPLAINT = "pain swelling rash itching burning stiffness bleeding numbness".split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(), "semantic.db")
+    cache = SemanticCache(path, ttl=None, max_entries=args.entries)
+    start = time.perf_counter()
+    for i in range(args.entries):
+        text = f"{rng.choice(BODY)} {rng.choice(COMPLAINT)} case {i}"
+        cache.put(text, f"city-{i % 20}", "{}")
+    print(f"put: {(time.perf_counter() - start) * 1e3 / args.entries:.3f} ms/entry")
+
+    queries = [
+        (f"{rng.choice(BODY)} {rng.choice(COMPLAINT)}", f"city-{rng.randrange(20)}")
+        for _ in range(args.lookups)
+    ]
+    start = time.perf_counter()
+    for text, partition in queries:
+        cache.lookup(text, partition)
+    elapsed = (time.perf_counter() - start) * 1e3 / args.lookups
+    print(f"lookup over {len(cache):,} entries: {elapsed:.3f} ms")
+
+    probe = SemanticCache(os.path.join(tempfile.mkdtemp(), "probe.db"), ttl=None)
+    print(f"threshold {probe.threshold}; cosine shown even when the lookup misses")
+    # A missed paraphrase costs one LLM call; a wrong hit serves the wrong
+    # advice, so it must never happen.
+    wrong = {"hit": 0, "miss": 0}
+    groups = (("hit", PARAPHRASES), ("miss", DIFFERENT), ("miss", RED_FLAGS))
+    for expected, pairs in groups:
+        for stored, asked in pairs:
+            probe.clear()
+            probe.put(stored, "p", "cached")
+            got = "hit" if probe.lookup(asked, "p") else "miss"
+            cosine = float(embed(stored) @ embed(asked))
+            if got != expected:
+                wrong[got] += 1
+            print(
+                f"{stored!r:>28} ~ {asked!r:<40} {cosine:.3f} {got:>4}"
+                f"  (want {expected})"
+            )
+    print(f"missed paraphrases: {wrong['miss']}  wrong hits: {wrong['hit']}")
+
+
+if __name__ == "__main__":
+    main()
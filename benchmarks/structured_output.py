@@ -0,0 +1,87 @@
+# benchmarks/structured_output.py
+"""Benchmark JSON extraction on large and malformed LLM outputs.
+
+Compares utils.structured_output.extract_json with the two ad-hoc
+strategies it replaced (greedy DOTALL regex and find/rfind slicing).
+
+Usage: python benchmarks/structured_output.py [--days 2000] [--runs 5]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.structured_output import MEAL_PLAN_SCHEMA, extract_json, validate  # noqa: E402
+
+
+def make_plan(days: int) -> dict:
+    meal = {"meal": "Lunch", "description": "Rice {brown} & dal \"tadka\"", "calories": 500}
+    day = {
+        "day": "Day 1",
+        "meals": [meal] * 5,
+        "total_calories": 2500,
+        "macros": {"protein_g": 120, "carbs_g": 300, "fats_g": 70},
+    }
+    return {"daily_plan": [day] * days, "grocery_list": ["oats", "dal"] * days}
+
+
+def regex_extract(text):
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    try:
+        return json.loads(match.group(0) if match else text)
+    except json.JSONDecodeError:
+        return None
+
+
+def find_extract(text):
+    try:
+        return json.loads(text[text.find("{") : text.rfind("}") + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def bench(fn, text, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn(text)
+    return (time.perf_counter() - start) / runs, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    body = json.dumps(make_plan(args.days))
+    cases = {
+        "clean": body,
+        "prose + fences": f"Here is your plan:\n```json\n{body}\n```\nEnjoy {{and}} stay healthy!",
+        "truncated": body[: len(body) // 2],
+        "two objects": '{"draft": tru} then the real one: ' + body,
+    }
+    strategies = {
+        "extract_json": extract_json,
+        "regex DOTALL": regex_extract,
+        "find/rfind": find_extract,
+    }
+    print(f"payload: {len(body) / 1024:.0f} KiB\n")
+    print(f"{'case':<16}{'strategy':<14}{'ms':>10}  result")
+    for case, text in cases.items():
+        for name, fn in strategies.items():
+            elapsed, result = bench(fn, text, args.runs)
+            if result is None:
+                outcome = "no JSON"
+            elif validate(result, MEAL_PLAN_SCHEMA):
+                outcome = "invalid schema"
+            else:
+                outcome = "ok"
+            print(f"{case:<16}{name:<14}{elapsed * 1000:>10.2f}  {outcome}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# llms/cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from llms.singleflight import SingleFlight
+
+load_dotenv()
+
+DEFAULT_CACHE_PATH = "llm_cache.db"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def response_text(response: Any) -> str:
+    content = getattr(response, "content", response)
+    if isinstance(content, list):
+        # Some chat models return content as a list of typed parts.
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return content if isinstance(content, str) else str(content)
+
+
+def llm_params(llm) -> Dict[str, Any]:
+    """Parameters that change the model's output, used as part of the cache key."""
+    try:
+        params = dict(llm._identifying_params)
+    except Exception:
+        params = {}
+    params.setdefault("model", getattr(llm, "model", llm.__class__.__name__))
+    return params
+
+
+def make_cache_key(model: str, params: Dict[str, Any], prompt: Any) -> str:
+    payload = json.dumps(
+        {"model": model, "params": params, "prompt": prompt},
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """On-disk, content-addressed cache of LLM responses.
+
+    Entries expire after ``ttl`` seconds; once the cache holds more than
+    ``max_entries`` rows or ``max_bytes`` of responses, the least recently
+    used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                agent TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            response, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.stats["hits"] += 1
+            return response
+
+    def put(self, key: str, response: str, agent: Optional[str] = None):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache
+                    (key, agent, response, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, agent, response, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self.ttl is not None:
+            cur = self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self.stats["expired"] += cur.rowcount
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from least recently used until both limits are satisfied.
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"
+        ):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+        self.stats["evictions"] += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+# ---- Process-wide cache and per-agent opt-in ----
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                ttl = os.getenv("WELLNESS_LLM_CACHE_TTL")
+                _cache = LLMResponseCache(
+                    path=os.getenv("WELLNESS_LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    ttl=float(ttl) if ttl else DEFAULT_TTL_SECONDS,
+                    max_entries=int(
+                        os.getenv("WELLNESS_LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+                    ),
+                    max_bytes=int(
+                        os.getenv("WELLNESS_LLM_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+                    ),
+                )
+    return _cache
+
+
+def set_cache(cache: Optional[LLMResponseCache]):
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def cache_enabled_for(agent: Optional[str]) -> bool:
+    """Agents opt in through WELLNESS_LLM_CACHE_AGENTS, e.g. "diet,physician" or "*"."""
+    if not agent:
+        return False
+    enabled = os.getenv("WELLNESS_LLM_CACHE_AGENTS", "")
+    names = {name.strip() for name in enabled.split(",") if name.strip()}
+    return "*" in names or agent in names
+
+
+# Identical prompts in flight at the same time share one upstream request.
+llm_flight = SingleFlight()
+
+
+def response_key(llm, prompt: Any) -> str:
+    params = llm_params(llm)
+    return make_cache_key(str(params.get("model")), params, prompt)
+
+
+def cached_invoke(
+    llm,
+    prompt: Any,
+    agent: Optional[str] = None,
+    accept: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """Invoke ``llm`` and return the reply text.
+
+    Concurrent identical requests are coalesced through ``llm_flight``; the
+    reply is also served from the cache when ``agent`` has opted in. With
+    ``accept``, only replies it approves are stored (or served from cache).
+    """
+    key = response_key(llm, prompt)
+    use_cache = cache_enabled_for(agent)
+
+    def load() -> str:
+        if use_cache:
+            cached = get_cache().get(key)
+            if cached is not None and (accept is None or accept(cached)):
+                return cached
+        text = response_text(llm.invoke(prompt))
+        if use_cache and (accept is None or accept(text)):
+            get_cache().put(key, text, agent=agent)
+        return text
+
+    return llm_flight.do(key, load)
+
+
+def store_response(llm, prompt: Any, text: str, agent: Optional[str] = None):
+    """Cache ``text`` as the reply to ``prompt``, once the caller has checked it."""
+    if cache_enabled_for(agent):
+        get_cache().put(response_key(llm, prompt), text, agent=agent)
+
+
+class ReplyStream:
+    """Iterator over reply text chunks from ``cached_stream``.
+
+    ``source`` is set once iteration starts: "cache" (served from the
+    response cache), "shared" (the full text of an identical request that
+    was already streaming) or "model" (streamed from the model by this
+    caller). Only "model" replies are ``fresh`` and worth storing.
+    """
+
+    def __init__(self, llm, prompt: Any, agent: Optional[str] = None):
+        self.source: Optional[str] = None
+        self._chunks = self._stream(llm, prompt, agent)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._chunks
+
+    def __next__(self) -> str:
+        return next(self._chunks)
+
+    @property
+    def fresh(self) -> bool:
+        return self.source == "model"
+
+    def _stream(self, llm, prompt: Any, agent: Optional[str]) -> Iterator[str]:
+        key = response_key(llm, prompt)
+        if cache_enabled_for(agent):
+            cached = get_cache().get(key)
+            if cached is not None:
+                self.source = "cache"
+                yield cached
+                return
+
+        call, leader = llm_flight.join(key)
+        if not leader:
+            self.source = "shared"
+            yield llm_flight.wait(call)
+            return
+
+        self.source = "model"
+        parts = []
+        try:
+            for chunk in llm.stream(prompt):
+                text = response_text(chunk)
+                parts.append(text)
+                yield text
+        except GeneratorExit:
+            # The consumer stopped reading; followers must not get a partial
+            # reply.
+            llm_flight.finish(key, call, error=RuntimeError("stream abandoned"))
+            raise
+        except BaseException as e:
+            llm_flight.finish(key, call, error=e)
+            raise
+        llm_flight.finish(key, call, result="".join(parts))
+
+
+def cached_stream(llm, prompt: Any, agent: Optional[str] = None) -> ReplyStream:
+    """Stream the reply text chunk by chunk.
+
+    On a cache hit the whole cached reply is yielded as one chunk. Requests
+    that arrive while an identical one is streaming wait for it and get its
+    full text as one chunk, like ``cached_invoke`` callers do. Streamed
+    replies are never cached here, since they may be truncated or
+    malformed; callers ``store_response`` once they have validated a
+    ``fresh`` one.
+    """
+    return ReplyStream(llm, prompt, agent)
@@ -1,7 +1,14 @@
 # llms/github_llm.py
-from typing import List, Optional, Union, Sequence
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterator, List, Optional, Union, Sequence
+
 from azure.ai.inference import ChatCompletionsClient
+from azure.ai.inference.aio import ChatCompletionsClient as AsyncChatCompletionsClient
 from azure.ai.inference.models import (
+    AssistantMessage as AZAssistantMessage,
     SystemMessage as AZSystemMessage,
     UserMessage as AZUserMessage,
 )
@@ -12,16 +19,70 @@ from langchain_core.messages import (
     HumanMessage as LCHumanMessage,
     AIMessage as LCAIMessage,
 )
+from langchain_core.outputs import Generation, GenerationChunk, LLMResult
+from pydantic import PrivateAttr
 
 
 class GitHubModelsLLM(LLM):
     endpoint: str
     model: str
     token: str
+    temperature: float = 1.0
+    top_p: float = 1.0
+    max_tokens: Optional[int] = 1000
+    # Upper bound on in-flight requests when generating a batch of prompts.
+    max_concurrency: int = 8
+
+    _client: Optional[ChatCompletionsClient] = PrivateAttr(default=None)
+    _client_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    # Async clients by event loop; entries go when their loop is collected.
+    _async_clients: Any = PrivateAttr(default_factory=weakref.WeakKeyDictionary)
+
+    # ---- Clients ----
+    def _get_client(self) -> ChatCompletionsClient:
+        """Long-lived sync client, so connections are reused across calls."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = ChatCompletionsClient(
+                        endpoint=self.endpoint,
+                        credential=AzureKeyCredential(self.token),
+                    )
+        return self._client
+
+    def _get_async_client(self) -> AsyncChatCompletionsClient:
+        """Long-lived async client for the running event loop.
+
+        Its aiohttp session belongs to the loop that opens it, so each loop
+        (e.g. each ``asyncio.run``) gets its own client, reused by every
+        call on that loop. Close it with ``aclose`` before the loop ends.
+        """
+        loop = asyncio.get_running_loop()
+        with self._client_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._async_clients[loop] = AsyncChatCompletionsClient(
+                    endpoint=self.endpoint,
+                    credential=AzureKeyCredential(self.token),
+                )
+        return client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        """Close the async client of the running event loop, if any."""
+        with self._client_lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
 
+    # ---- Message conversion ----
     def _to_azure_messages(
         self, messages: Union[str, Sequence]
-    ) -> List[Union[AZSystemMessage, AZUserMessage]]:
+    ) -> List[Union[AZSystemMessage, AZUserMessage, AZAssistantMessage]]:
         """Convert strings or LangChain messages to Azure SDK message format."""
         if isinstance(messages, str):
             return [AZUserMessage(content=messages)]
@@ -34,42 +95,171 @@ class GitHubModelsLLM(LLM):
                 azure_msgs.append(m)
                 continue
 
-            clsname = m.__class__.__name__
-            content = getattr(m, "content", str(m))
-            if clsname in ("SystemMessage", "LCSystemMessage"):
-                azure_msgs.append(AZSystemMessage(content=content))
-            elif clsname in ("HumanMessage", "UserMessage", "LCHumanMessage"):
-                azure_msgs.append(AZUserMessage(content=content))
-            elif clsname in ("AIMessage", "LCAIMessage"):
+            if isinstance(m, dict):
+                role = m.get("role", "user")
+                content = m.get("content", "")
+            else:
+                clsname = m.__class__.__name__
+                content = getattr(m, "content", str(m))
+                if isinstance(m, LCSystemMessage) or clsname == "SystemMessage":
+                    role = "system"
+                elif isinstance(m, LCAIMessage) or clsname in (
+                    "AIMessage",
+                    "AIMessageChunk",
+                ):
+                    role = "assistant"
+                else:
+                    role = "user"
+
+            if role == "system":
                 azure_msgs.append(AZSystemMessage(content=content))
+            elif role == "assistant":
+                azure_msgs.append(AZAssistantMessage(content=content))
             else:
                 azure_msgs.append(AZUserMessage(content=content))
         return azure_msgs
 
+    def _request_params(self, stop: Optional[List[str]], **kwargs) -> dict:
+        params = {
+            "temperature": kwargs.get("temperature", self.temperature),
+            "top_p": kwargs.get("top_p", self.top_p),
+            "model": self.model,
+        }
+        max_tokens = kwargs.get("max_tokens", self.max_tokens)
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        if stop:
+            params["stop"] = stop
+        return params
+
+    # ---- Blocking / async calls ----
     def _call(
         self,
         prompt: Union[str, Sequence],
         stop: Optional[List[str]] = None,
         run_manager=None,
+        **kwargs: Any,
     ) -> str:
         """Synchronous call returning full assistant text."""
-        client = ChatCompletionsClient(
-            endpoint=self.endpoint,
-            credential=AzureKeyCredential(self.token),
+        resp = self._get_client().complete(
+            messages=self._to_azure_messages(prompt),
+            **self._request_params(stop, **kwargs),
         )
-        azure_messages = self._to_azure_messages(prompt)
-        resp = client.complete(
-            messages=azure_messages,
-            temperature=1.0,
-            top_p=1.0,
-            max_tokens=1000,
-            model=self.model,
+        return resp.choices[0].message.content
+
+    async def _acall(
+        self,
+        prompt: Union[str, Sequence],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> str:
+        return await self._acomplete(self._get_async_client(), prompt, stop, **kwargs)
+
+    async def _acomplete(
+        self,
+        client: AsyncChatCompletionsClient,
+        prompt: Union[str, Sequence],
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> str:
+        resp = await client.complete(
+            messages=self._to_azure_messages(prompt),
+            **self._request_params(stop, **kwargs),
         )
         return resp.choices[0].message.content
 
+    # ---- Streaming ----
+    def _stream(
+        self,
+        prompt: Union[str, Sequence],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        response = self._get_client().complete(
+            messages=self._to_azure_messages(prompt),
+            stream=True,
+            **self._request_params(stop, **kwargs),
+        )
+        for update in response:
+            if not update.choices:
+                continue
+            text = update.choices[0].delta.content or ""
+            if not text:
+                continue
+            chunk = GenerationChunk(text=text)
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        prompt: Union[str, Sequence],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> AsyncIterator[GenerationChunk]:
+        response = await self._get_async_client().complete(
+            messages=self._to_azure_messages(prompt),
+            stream=True,
+            **self._request_params(stop, **kwargs),
+        )
+        async for update in response:
+            if not update.choices:
+                continue
+            text = update.choices[0].delta.content or ""
+            if not text:
+                continue
+            chunk = GenerationChunk(text=text)
+            if run_manager:
+                await run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    # ---- Batch generation ----
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Run a batch of prompts concurrently over the shared client."""
+        if len(prompts) <= 1 or self.max_concurrency <= 1:
+            texts = [self._call(p, stop=stop, **kwargs) for p in prompts]
+        else:
+            workers = min(self.max_concurrency, len(prompts))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                texts = list(
+                    pool.map(lambda p: self._call(p, stop=stop, **kwargs), prompts)
+                )
+        return LLMResult(generations=[[Generation(text=t)] for t in texts])
+
+    async def _agenerate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        client = self._get_async_client()
+
+        async def run(p: str) -> str:
+            async with semaphore:
+                return await self._acomplete(client, p, stop=stop, **kwargs)
+
+        texts = await asyncio.gather(*(run(p) for p in prompts))
+        return LLMResult(generations=[[Generation(text=t)] for t in texts])
+
     @property
     def _identifying_params(self):
-        return {"model": self.model}
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "max_tokens": self.max_tokens,
+        }
 
     @property
     def _llm_type(self):
@@ -0,0 +1,83 @@
+# llms/provider.py
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class LLMConfig:
+    model: str = "gemini-2.5-pro"
+    temperature: Optional[float] = None
+    timeout: Optional[float] = None
+    max_retries: int = 2
+    transport: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "LLMConfig":
+        temperature = os.getenv("WELLNESS_LLM_TEMPERATURE")
+        timeout = os.getenv("WELLNESS_LLM_TIMEOUT")
+        return cls(
+            model=os.getenv("WELLNESS_LLM_MODEL", cls.model),
+            temperature=float(temperature) if temperature else None,
+            timeout=float(timeout) if timeout else None,
+            max_retries=int(os.getenv("WELLNESS_LLM_MAX_RETRIES", cls.max_retries)),
+            transport=os.getenv("WELLNESS_LLM_TRANSPORT") or None,
+        )
+
+
+_lock = threading.Lock()
+_llm = None
+_config: Optional[LLMConfig] = None
+
+
+def _build_llm(config: LLMConfig):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    kwargs = {"model": config.model, "max_retries": config.max_retries}
+    if config.temperature is not None:
+        kwargs["temperature"] = config.temperature
+    if config.timeout is not None:
+        kwargs["timeout"] = config.timeout
+    if config.transport:
+        kwargs["transport"] = config.transport
+    return ChatGoogleGenerativeAI(**kwargs)
+
+
+def get_llm_config() -> LLMConfig:
+    global _config
+    if _config is None:
+        _config = LLMConfig.from_env()
+    return _config
+
+
+def get_llm():
+    """Return the process-wide chat model.
+
+    The client is built once per worker on first use and shared by every
+    agent. Connection pooling is implicit: the one ChatGoogleGenerativeAI
+    instance keeps its underlying HTTP/gRPC channel open between calls;
+    ``transport`` only selects which of the two it uses.
+    """
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                _llm = _build_llm(get_llm_config())
+    return _llm
+
+
+def set_llm(llm, config: Optional[LLMConfig] = None):
+    """Inject a chat model (e.g. a fake in tests) or reconfigure the provider.
+
+    Passing ``llm=None`` drops the shared client so the next ``get_llm`` call
+    rebuilds it from ``config`` (or the environment).
+    """
+    global _llm, _config
+    with _lock:
+        _llm = llm
+        _config = config
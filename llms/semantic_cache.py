@@ -0,0 +1,335 @@
+# llms/semantic_cache.py
+"""Similarity cache for LLM results keyed on free text.
+
+Exact-match caching (llms/cache.py) misses when the same complaint is
+worded differently ("sore throat 2 days" vs "throat pain for two days").
+Here the text is turned into a hashed bag-of-words vector computed
+locally, and a lookup returns the stored result whose vector is most
+similar, if it clears ``threshold``. Entries only match within the same
+``partition``; callers put everything that must match exactly there.
+
+Similarity alone can rate a complaint plus one new symptom ("..., blood in
+cough") as a near match. So a hit also requires that every term of the
+query appears in the stored text, with negated terms ("no fever") kept
+apart from plain ones.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_SEMANTIC_CACHE_PATH = "semantic_cache.db"
+DEFAULT_DIM = 1024
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 5000
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = set(
+    "a about after am an and at bit feel feeling for from have has i in is it "
+    "me my of on or since some the to very with".split()
+)
+# Everyday wording mapped onto one token so it hashes to the same feature.
+_SYNONYMS = {
+    "ache": "pain", "aches": "pain", "aching": "pain", "hurts": "pain",
+    "hurting": "pain", "painful": "pain", "sore": "pain",
+    "abdomen": "stomach", "abdominal": "stomach", "belly": "stomach",
+    "tummy": "stomach", "feverish": "fever", "temperature": "fever",
+    "eating": "meal", "food": "meal",
+    "coughing": "cough", "breathing": "breath", "breathless": "breath",
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+}
+
+
+def _canonical(word: str) -> str:
+    word = _SYNONYMS.get(word, word)
+    if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return _SYNONYMS.get(word, word)
+
+
+# A negation covers the words after it up to the end of the clause.
+_NEGATIONS = {"no", "not", "without", "never", "denies", "deny", "nor"}
+_CLAUSE = re.compile(r"[.,;:|\n]|\bbut\b")
+_NOT = re.compile(r"\w*n['’]t\b")  # "don't", "can’t", ...
+
+
+def _words(text: str) -> Iterator[str]:
+    """Canonical content words; negated ones are prefixed "-" ("-fever")."""
+    for clause in _CLAUSE.split(_NOT.sub(" not", text.lower())):
+        negated = False
+        for word in _TOKEN.findall(clause):
+            if word in _NEGATIONS:
+                negated = True
+            elif word not in _STOPWORDS:
+                word = _canonical(word)
+                yield "-" + word if negated else word
+
+
+def terms(text: str) -> frozenset:
+    return frozenset(_words(text))
+
+
+def embed(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Unit-length hashed bag of words plus character 4-grams.
+
+    crc32 (not ``hash``) keeps vectors stable across processes, so stored
+    entries stay comparable after a restart.
+    """
+    vec = np.zeros(dim, dtype=np.float32)
+    for word in _words(text):
+        padded = f"<{word}>"
+        grams = [padded[i : i + 4] for i in range(max(1, len(padded) - 3))]
+        features = [("w:" + word, 1.0)]
+        features += [("c:" + gram, 0.5 / len(grams)) for gram in grams]
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vec[h % dim] += -weight if h & 0x80000000 else weight
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class SemanticCache:
+    """Vectors in one contiguous numpy matrix, persisted to SQLite.
+
+    A lookup is a single matrix-vector product over the live rows, masked
+    to the partition. Entries expire after ``ttl`` seconds and the least
+    recently used are evicted beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SEMANTIC_CACHE_PATH,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        dim: int = DEFAULT_DIM,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.dim = dim
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY,
+                partition TEXT NOT NULL,
+                text TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        # Row i of the matrices describes entry self._ids[i].
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._partition_of = np.zeros(0, dtype=np.int32)
+        self._created = np.zeros(0, dtype=np.float64)
+        self._accessed = np.zeros(0, dtype=np.float64)
+        self._ids: list = []
+        self._responses: list = []
+        self._terms: list = []
+        self._partitions: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _partition_id(self, partition: str) -> int:
+        return self._partitions.setdefault(partition, len(self._partitions))
+
+    def _load(self):
+        rows = self._conn.execute(
+            "SELECT id, partition, text, response, created_at, accessed_at "
+            "FROM semantic_cache ORDER BY id"
+        ).fetchall()
+        self._grow(len(rows))
+        for row_id, partition, text, response, created_at, accessed_at in rows:
+            self._append(
+                row_id, partition, embed(text, self.dim), terms(text), response
+            )
+            self._created[len(self) - 1] = created_at
+            self._accessed[len(self) - 1] = accessed_at
+
+    def _grow(self, extra: int):
+        # Capacity doubles, so appends are amortised O(dim).
+        need = len(self) + extra
+        capacity = len(self._vectors)
+        if need <= capacity:
+            return
+        capacity = max(need, capacity * 2, 64)
+        for name in ("_vectors", "_partition_of", "_created", "_accessed"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(self)] = old[: len(self)]
+            setattr(self, name, new)
+
+    def _append(
+        self,
+        row_id: int,
+        partition: str,
+        vector: np.ndarray,
+        term_set: frozenset,
+        response: str,
+    ):
+        self._grow(1)
+        i = len(self)
+        now = time.time()
+        self._vectors[i] = vector
+        self._partition_of[i] = self._partition_id(partition)
+        self._created[i] = now
+        self._accessed[i] = now
+        self._ids.append(row_id)
+        self._responses.append(response)
+        self._terms.append(term_set)
+
+    def _remove(self, rows):
+        """Drop matrix rows (by position) and their SQLite entries."""
+        doomed = sorted(set(int(i) for i in rows), reverse=True)
+        ids = [(self._ids[i],) for i in doomed]
+        for i in doomed:
+            last = len(self) - 1
+            # Swap with the last live row to keep the matrix contiguous.
+            if i != last:
+                for name in ("_vectors", "_partition_of", "_created", "_accessed"):
+                    arr = getattr(self, name)
+                    arr[i] = arr[last]
+                self._ids[i] = self._ids[last]
+                self._responses[i] = self._responses[last]
+                self._terms[i] = self._terms[last]
+            self._ids.pop()
+            self._responses.pop()
+            self._terms.pop()
+        self._conn.executemany("DELETE FROM semantic_cache WHERE id = ?", ids)
+
+    def lookup(self, text: str, partition: str) -> Optional[Tuple[str, float]]:
+        """Most similar stored ``(response, score)`` at or above threshold
+        whose text covers every term of ``text``."""
+        pid = self._partitions.get(partition)
+        vector = embed(text, self.dim)
+        wanted = terms(text)
+        now = time.time()
+        with self._lock:
+            n = len(self)
+            if pid is None or n == 0:
+                self.stats["misses"] += 1
+                return None
+            scores = self._vectors[:n] @ vector
+            scores[self._partition_of[:n] != pid] = -1.0
+            if self.ttl is not None:
+                scores[self._created[:n] < now - self.ttl] = -1.0
+            above = np.nonzero(scores >= self.threshold)[0]
+            best = next(
+                (
+                    int(i)
+                    for i in above[np.argsort(-scores[above])]
+                    if wanted <= self._terms[i]
+                ),
+                None,
+            )
+            if best is None:
+                self.stats["misses"] += 1
+                return None
+            score = float(scores[best])
+            self._accessed[best] = now
+            self._conn.execute(
+                "UPDATE semantic_cache SET accessed_at = ? WHERE id = ?",
+                (now, self._ids[best]),
+            )
+            self._conn.commit()
+            self.stats["hits"] += 1
+            return self._responses[best], score
+
+    def get(self, text: str, partition: str) -> Optional[str]:
+        hit = self.lookup(text, partition)
+        return hit[0] if hit else None
+
+    def put(self, text: str, partition: str, response: str):
+        vector = embed(text, self.dim)
+        term_set = terms(text)
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO semantic_cache "
+                "(partition, text, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (partition, text, response, now, now),
+            )
+            self._append(cur.lastrowid, partition, vector, term_set, response)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        n = len(self)
+        if self.ttl is not None:
+            expired = np.nonzero(self._created[:n] < time.time() - self.ttl)[0]
+            if len(expired):
+                self._remove(expired)
+                self.stats["expired"] += len(expired)
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            lru = np.argpartition(self._accessed[: len(self)], excess - 1)[:excess]
+            self._remove(lru)
+            self.stats["evictions"] += excess
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM semantic_cache")
+            self._conn.commit()
+            self._reset()
+
+
+# ---- Process-wide cache ----
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def semantic_cache_enabled() -> bool:
+    return os.getenv("WELLNESS_SEMANTIC_CACHE", "").lower() in ("1", "true", "yes")
+
+
+def get_semantic_cache() -> SemanticCache:
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                ttl = os.getenv("WELLNESS_SEMANTIC_CACHE_TTL")
+                _semantic_cache = SemanticCache(
+                    path=os.getenv(
+                        "WELLNESS_SEMANTIC_CACHE_PATH", DEFAULT_SEMANTIC_CACHE_PATH
+                    ),
+                    threshold=float(
+                        os.getenv(
+                            "WELLNESS_SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD
+                        )
+                    ),
+                    ttl=float(ttl) if ttl else DEFAULT_TTL_SECONDS,
+                    max_entries=int(
+                        os.getenv(
+                            "WELLNESS_SEMANTIC_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES
+                        )
+                    ),
+                )
+    return _semantic_cache
+
+
+def set_semantic_cache(cache: Optional[SemanticCache]):
+    global _semantic_cache
+    with _semantic_cache_lock:
+        _semantic_cache = cache
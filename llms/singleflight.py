@@ -0,0 +1,80 @@
+# llms/singleflight.py
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in
+    flight block and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def join(self, key: Hashable) -> Tuple[_Call, bool]:
+        """Register for ``key``; returns ``(call, leader)``.
+
+        The leader must end the call with ``finish``; followers get the
+        outcome from ``wait``. ``do`` wraps both for plain functions, and
+        streaming callers use the pieces directly.
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats["coalesced"] += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.stats["executions"] += 1
+            return call, True
+
+    def wait(self, call: _Call) -> Any:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def finish(
+        self,
+        key: Hashable,
+        call: _Call,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ):
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        call, leader = self.join(key)
+        if not leader:
+            return self.wait(call)
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,178 @@
+# tests/test_availability.py
+"""Slot conflicts, free slots and booking through the index and the store.
+
+Usage: python -m pytest -q tests/test_availability.py
+"""
+import os
+import random
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import availability  # noqa: E402
+from utils.availability import (  # noqa: E402
+    AvailabilityIndex,
+    SlotConflictError,
+    _Day,
+    book_appointment,
+    to_clock,
+    to_minutes,
+)
+from utils.bookings import BookingStore  # noqa: E402
+
+CLINIC = "Calm Minds Clinic"
+DATE = "2026-10-20"
+
+
+def booking(time, duration=None, clinic=CLINIC, date=DATE, **extra):
+    entry = {
+        "clinic_title": clinic,
+        "appointment_date": date,
+        "appointment_time": time,
+        "patient_name": "Asha",
+        **extra,
+    }
+    if duration is not None:
+        entry["duration_minutes"] = duration
+    return entry
+
+
+def day_with(*intervals):
+    day = _Day()
+    for start, end in intervals:
+        day.insert(to_minutes(start), to_minutes(end))
+    return day
+
+
+# ---- _Day.conflict ----
+def test_back_to_back_is_not_a_conflict():
+    day = day_with(("10:00", "10:30"))
+    assert day.conflict(to_minutes("09:30"), to_minutes("10:00")) is None
+    assert day.conflict(to_minutes("10:30"), to_minutes("11:00")) is None
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        ("09:45", "10:15"),  # overlaps the start
+        ("10:15", "10:45"),  # overlaps the end
+        ("10:05", "10:25"),  # inside
+        ("09:30", "11:00"),  # around
+        ("10:00", "10:30"),  # identical
+    ],
+)
+def test_overlaps_are_conflicts(start, end):
+    day = day_with(("08:00", "09:00"), ("10:00", "10:30"), ("12:00", "13:00"))
+    clash = day.conflict(to_minutes(start), to_minutes(end))
+    assert clash == (to_minutes("10:00"), to_minutes("10:30"))
+
+
+def test_gap_between_bookings_is_free():
+    day = day_with(("10:00", "10:30"), ("11:00", "11:30"))
+    assert day.conflict(to_minutes("10:30"), to_minutes("11:00")) is None
+    assert day.conflict(to_minutes("10:30"), to_minutes("11:01")) is not None
+
+
+# ---- AvailabilityIndex ----
+def test_reserve_release_and_clinics_are_separate():
+    index = AvailabilityIndex()
+    index.reserve(CLINIC, DATE, "10:00")
+    with pytest.raises(SlotConflictError) as err:
+        index.reserve(CLINIC, DATE, "10:15", duration=30)
+    assert err.value.conflict == ("10:00", "10:30")
+    index.reserve("Other Clinic", DATE, "10:00")
+    index.reserve(CLINIC, "2026-10-21", "10:00")
+    assert index.release(CLINIC, DATE, "10:00")
+    assert not index.release(CLINIC, DATE, "10:00")
+    assert index.is_free(CLINIC, DATE, "10:15")
+
+
+def test_free_slots_around_mid_grid_bookings():
+    index = AvailabilityIndex()
+    index.reserve(CLINIC, DATE, "10:10")  # 10:10-10:40
+    index.reserve(CLINIC, DATE, "12:30", duration=15)  # on the grid, short
+    index.reserve(CLINIC, DATE, "08:45")  # runs past opening
+    index.reserve(CLINIC, DATE, "17:50")  # runs past closing
+    slots = index.free_slots(CLINIC, DATE)
+    # 09:00 overlaps the early booking; 10:00 and 10:30 overlap 10:10-10:40.
+    assert slots[:3] == ["09:30", "11:00", "11:30"]
+    # Slots stay on the grid from opening time after each booking.
+    assert "12:00" in slots and "12:30" not in slots and "13:00" in slots
+    assert slots[-1] == "17:00"
+
+
+def test_free_slots_with_a_longer_duration():
+    index = AvailabilityIndex()
+    index.reserve(CLINIC, DATE, "10:00", duration=60)
+    slots = index.free_slots(CLINIC, DATE, ("09:00", "13:00"), duration=45)
+    assert slots == ["09:00", "11:15", "12:00"]
+
+
+def test_free_slots_match_is_free():
+    rng = random.Random(0)
+    for _ in range(50):
+        index = AvailabilityIndex()
+        for _ in range(rng.randint(0, 12)):
+            start = rng.randrange(8 * 60, 19 * 60, 5)
+            try:
+                index.reserve(CLINIC, DATE, to_clock(start), rng.choice([15, 30, 50]))
+            except SlotConflictError:
+                pass
+        step = rng.choice([20, 30, 45])
+        grid = range(9 * 60, 18 * 60 - step + 1, step)
+        expected = [
+            to_clock(t) for t in grid if index.is_free(CLINIC, DATE, to_clock(t), step)
+        ]
+        assert index.free_slots(CLINIC, DATE, duration=step) == expected
+
+
+# ---- book_appointment ----
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(availability, "_index", None)
+    return BookingStore(str(tmp_path / "bookings.db"))
+
+
+def test_booking_is_saved_and_indexed(store):
+    booking_id = book_appointment(booking("10:00"), store)
+    assert store.get(booking_id)["appointment_time"] == "10:00"
+    assert not availability.get_availability(store).is_free(CLINIC, DATE, "10:00")
+    with pytest.raises(SlotConflictError):
+        book_appointment(booking("10:15"), store)
+    assert store.count() == 1
+    # Back to back is fine.
+    book_appointment(booking("10:30"), store)
+    assert store.count() == 2
+
+
+def test_index_is_rolled_back_when_the_store_fails(store, monkeypatch):
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "add_unless", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        book_appointment(booking("10:00"), store)
+    assert availability.get_availability(store).is_free(CLINIC, DATE, "10:00")
+
+
+def test_clash_known_only_to_the_store(store, tmp_path):
+    index = availability.get_availability(store)
+    # Another process books 10:15-11:15 after this index was built.
+    other = BookingStore(str(tmp_path / "bookings.db"))
+    other.add(booking("10:15", duration=60, patient_name="Ravi"))
+
+    with pytest.raises(SlotConflictError) as err:
+        book_appointment(booking("10:00"), store)
+    assert err.value.conflict == ("10:15", "11:15")
+    assert store.count() == 1
+    # The index now knows that booking, so the next clash is caught early.
+    assert not index.is_free(CLINIC, DATE, "11:00")
+    assert index.is_free(CLINIC, DATE, "09:30")
+
+
+def test_booking_without_a_slot_is_saved_as_is(store):
+    booking_id = book_appointment({"patient_name": "Asha"}, store)
+    assert store.get(booking_id)["patient_name"] == "Asha"
@@ -0,0 +1,159 @@
+# tests/test_bookings.py
+"""BookingStore: the legacy JSON import, extra fields and guarded inserts.
+
+Usage: python -m pytest -q tests/test_bookings.py
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bookings import BookingStore, main  # noqa: E402
+
+
+def booking(name, time="10:00", date="2026-10-20", **extra):
+    return {
+        "timestamp": "2026-10-17 09:00:00",
+        "patient_name": name,
+        "phone": "98765",
+        "city": "Pune",
+        "specialist": "Psychologist",
+        "clinic_title": "Calm Minds Clinic",
+        "appointment_date": date,
+        "appointment_time": time,
+        **extra,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BookingStore(str(tmp_path / "bookings.db"))
+
+
+@pytest.fixture
+def legacy(tmp_path):
+    path = tmp_path / "bookings.json"
+    path.write_text(
+        json.dumps([booking("Asha"), booking("Ravi", "11:00"), "not a booking"]),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+# ---- Legacy import ----
+def test_migrate_json_imports_once(store, legacy):
+    assert store.migrate_json(legacy) == 2
+    assert store.migrate_json(legacy) == 0
+    assert store.count() == 2
+    # The same file by another relative path is still the same source.
+    relative = os.path.relpath(legacy)
+    assert store.migrate_json(relative) == 0
+    assert [b["patient_name"] for b in store.iter_all()] == ["Asha", "Ravi"]
+
+
+def test_migrate_json_from_a_second_store(store, legacy, tmp_path):
+    store.migrate_json(legacy)
+    other = BookingStore(str(tmp_path / "bookings.db"))
+    assert other.migrate_json(legacy) == 0
+    assert other.count() == 2
+
+
+def test_missing_or_broken_json(store, tmp_path):
+    assert store.migrate_json(str(tmp_path / "missing.json")) == 0
+    broken = tmp_path / "broken.json"
+    broken.write_text("[{", encoding="utf-8")
+    assert store.migrate_json(str(broken)) == 0
+    assert store.count() == 0
+
+
+def test_cli(tmp_path, legacy, capsys):
+    db = str(tmp_path / "cli.db")
+    main(["--db", db, "--json", legacy])
+    main(["--db", db, "--json", legacy])
+    out = capsys.readouterr().out.splitlines()
+    assert out[0].startswith("imported 2 booking(s); 2 in")
+    assert out[1].startswith("imported 0 booking(s); 2 in")
+
+
+# ---- Fields ----
+def test_unknown_keys_round_trip_through_extra(store):
+    original = booking("Asha", duration_minutes=45, notes={"first_visit": True})
+    booking_id = store.add(original)
+    saved = store.get(booking_id)
+    assert saved == {
+        "id": booking_id,
+        "probable_condition": None,
+        "clinic_link": None,
+        **original,
+    }
+    raw = store.pool.connection().execute(
+        "SELECT extra FROM bookings WHERE id = ?", (booking_id,)
+    ).fetchone()[0]
+    assert json.loads(raw) == {"duration_minutes": 45, "notes": {"first_visit": True}}
+
+
+def test_no_extra_column_without_unknown_keys(store):
+    booking_id = store.add(booking("Asha"))
+    raw = store.pool.connection().execute(
+        "SELECT extra FROM bookings WHERE id = ?", (booking_id,)
+    ).fetchone()[0]
+    assert raw is None
+
+
+def test_find_filters(store):
+    store.add(booking("Asha", "11:00"))
+    store.add(booking("Ravi", "09:00", city="Mumbai"))
+    store.add(booking("Meera", "10:00", date="2026-10-21"))
+    assert [b["patient_name"] for b in store.find(city="Pune")] == ["Asha", "Meera"]
+    assert [b["patient_name"] for b in store.find(date="2026-10-20")] == [
+        "Ravi",
+        "Asha",
+    ]
+    assert store.find(phone="98765", limit=1)[0]["patient_name"] == "Ravi"
+
+
+# ---- Guarded inserts ----
+def same_time(new):
+    return lambda existing: existing["appointment_time"] == new["appointment_time"]
+
+
+def test_add_unless_returns_the_clashing_row(store):
+    first = booking("Asha")
+    first_id = store.add(first)
+    second = booking("Ravi")
+    booking_id, existing = store.add_unless(second, same_time(second))
+    assert booking_id is None
+    assert existing == store.get(first_id)
+    assert store.count() == 1
+
+
+def test_add_unless_inserts_when_nothing_clashes(store):
+    store.add(booking("Asha"))
+    later = booking("Ravi", "11:00")
+    booking_id, existing = store.add_unless(later, same_time(later))
+    assert existing is None
+    assert store.get(booking_id)["patient_name"] == "Ravi"
+    # Only the same clinic and day are offered to the check.
+    other_day = booking("Meera", date="2026-10-21")
+    seen = []
+    store.add_unless(other_day, lambda b: seen.append(b) or False)
+    assert seen == []
+
+
+def test_add_unless_rolls_back_when_the_check_fails(store):
+    store.add(booking("Asha"))
+    store.add_unless(booking("Ravi"), lambda existing: True)
+    assert not store.pool.connection().in_transaction
+
+    def broken(existing):
+        raise KeyError("appointment_time")
+
+    with pytest.raises(KeyError):
+        store.add_unless(booking("Ravi"), broken)
+    # The write lock is released, so other writers are not blocked.
+    assert not store.pool.connection().in_transaction
+    assert store.add(booking("Meera", "12:00"))
+    assert store.count() == 2
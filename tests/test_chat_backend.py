@@ -0,0 +1,100 @@
+# tests/test_chat_backend.py
+"""One chat turn: streamed reply, checkpoint, thread catalogue and message log.
+
+Usage: python -m pytest -q tests/test_chat_backend.py
+"""
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.fake_chat_models import (  # noqa: E402
+    GenericFakeChatModel,
+)
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from llms.provider import set_llm  # noqa: E402
+from utils.chatbot import storage  # noqa: E402
+
+# The backend opens its database on import; storage may already have read
+# WELLNESS_CHAT_DB when another test imported it.
+storage.DB_PATH = os.path.join(tempfile.mkdtemp(), "chatbot.db")
+from utils.chatbot import backend  # noqa: E402
+
+
+@pytest.fixture
+def thread():
+    thread_id = str(uuid.uuid4())
+    yield thread_id, {"configurable": {"thread_id": thread_id}}
+    set_llm(None)
+
+
+def replies(*texts):
+    set_llm(GenericFakeChatModel(messages=iter([AIMessage(content=t) for t in texts])))
+
+
+def logged(thread_id):
+    messages, _ = backend.message_store.page(thread_id, limit=100)
+    return [(m["role"], m["content"]) for m in messages]
+
+
+def test_turn_is_streamed_and_recorded(thread):
+    thread_id, config = thread
+    replies("Take a slow breath.")
+    assert "".join(backend.stream_reply("I feel tense", config)) == (
+        "Take a slow breath."
+    )
+    assert logged(thread_id) == [
+        ("user", "I feel tense"),
+        ("assistant", "Take a slow breath."),
+    ]
+    meta = backend.thread_catalog.get(thread_id)
+    assert meta["message_count"] == 2
+    assert meta["name"] == "I feel tense"
+    assert len(backend.load_conversation(thread_id)) == 2
+
+
+def test_failed_checkpoint_leaves_the_log_untouched(thread, monkeypatch):
+    thread_id, config = thread
+    replies("first", "second")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(backend.checkpointer, "put", fail)
+        with pytest.raises(RuntimeError, match="disk full"):
+            list(backend.stream_reply("hello", config))
+    assert logged(thread_id) == []
+    assert backend.thread_catalog.get(thread_id) is None
+
+    # The next turn is logged at the positions the checkpoint gives it.
+    assert "".join(backend.stream_reply("hello again", config)) == "second"
+    history = backend.load_conversation(thread_id)
+    assert [m.content for m in history] == ["hello again", "second"]
+    assert logged(thread_id) == [("user", "hello again"), ("assistant", "second")]
+
+
+def test_display_name_is_persisted(thread):
+    thread_id, config = thread
+    session = {"chat_thread_names": {thread_id: "Chat 3 - Oct 17, 2026 09:00"}}
+    name = backend.update_chat_name_from_first_message(
+        session, thread_id, "Work has been\nreally stressful lately"
+    )
+    assert name == session["chat_thread_names"][thread_id]
+    assert name == "Work has been really stressful"
+    # Only the first message names a thread.
+    assert backend.update_chat_name_from_first_message(session, thread_id, "x") is None
+
+    replies("That sounds hard.")
+    list(backend.stream_reply("Work has been\nreally stressful lately", config))
+    backend.save_thread_name(thread_id, "Work stress")
+    replies("Try a short walk.")
+    list(backend.stream_reply("Any tips?", config))
+    meta = backend.thread_catalog.get(thread_id)
+    assert (meta["name"], meta["message_count"]) == ("Work stress", 4)
+    assert backend.list_threads(limit=1)[0]["name"] == "Work stress"
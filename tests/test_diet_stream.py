@@ -0,0 +1,162 @@
+# tests/test_diet_stream.py
+"""The single-day diet plan stream: caching and what the user sees.
+
+Usage: python -m pytest -q tests/test_diet_stream.py
+"""
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("streamlit")
+from langchain_core.language_models.fake_chat_models import (  # noqa: E402
+    GenericFakeChatModel,
+)
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from agents import diet_planner_agent as diet  # noqa: E402
+from llms import cache  # noqa: E402
+from llms.provider import set_llm  # noqa: E402
+
+PLAN = {
+    "daily_plan": [
+        {
+            "day": "Day 1",
+            "meals": [
+                {"meal": "Breakfast", "description": "Oats", "calories": 350},
+                {"meal": "Lunch", "description": "Dal rice", "calories": 600},
+            ],
+            "total_calories": 950,
+            "macros": {"protein_g": 40, "carbs_g": 150, "fats_g": 20},
+        }
+    ],
+    "grocery_list": ["Oats - 1 cup", "Dal - 100 g"],
+}
+VALID = json.dumps(PLAN)
+TRUNCATED = VALID[: VALID.index('"grocery_list"')]
+
+
+class FakeStreamlit:
+    """Records what would be on screen; placeholders can be cleared."""
+
+    def __init__(self):
+        self.page = []
+        self._target = self.page
+
+    def _write(self, kind, text):
+        self._target.append((kind, str(text)))
+
+    def markdown(self, text, **kwargs):
+        self._write("markdown", text)
+
+    def subheader(self, text):
+        self._write("subheader", text)
+
+    def warning(self, text):
+        self._write("warning", text)
+
+    def image(self, data):
+        self._write("image", "")
+
+    def empty(self):
+        block = []
+        self._target.append(("block", block))
+        fake = self
+
+        class Placeholder:
+            def empty(self):
+                block.clear()
+
+            @contextmanager
+            def container(self):
+                block.clear()
+                outer, fake._target = fake._target, block
+                try:
+                    yield
+                finally:
+                    fake._target = outer
+
+        return Placeholder()
+
+    def shown(self):
+        def flatten(items):
+            for kind, value in items:
+                if kind == "block":
+                    yield from flatten(value)
+                else:
+                    yield kind, value
+
+        return list(flatten(self.page))
+
+
+@pytest.fixture
+def screen(monkeypatch, tmp_path):
+    fake = FakeStreamlit()
+    monkeypatch.setattr(diet, "st", fake)
+    monkeypatch.setenv("WELLNESS_LLM_CACHE_AGENTS", "diet")
+    cache.set_cache(cache.LLMResponseCache(path=str(tmp_path / "cache.db")))
+    yield fake
+    cache.set_cache(None)
+    set_llm(None)
+
+
+def fake_llm(*replies):
+    return GenericFakeChatModel(messages=iter([AIMessage(content=r) for r in replies]))
+
+
+def meal_lines(screen, meal):
+    return [v for k, v in screen.shown() if k == "markdown" and f"**{meal}**" in v]
+
+
+def test_malformed_stream_is_replaced_by_the_repaired_plan(screen):
+    set_llm(fake_llm(TRUNCATED, VALID))
+    data = diet.show_single_day_plan("prompt")
+    assert data == PLAN
+    # Each meal once: the partial render was cleared before the repair.
+    assert len(meal_lines(screen, "Breakfast")) == 1
+    assert len(meal_lines(screen, "Lunch")) == 1
+    assert any(kind == "warning" for kind, _ in screen.shown())
+
+
+def test_only_fresh_valid_streams_are_stored(screen, monkeypatch):
+    llm = fake_llm(VALID)
+    set_llm(llm)
+    puts = []
+    store = cache.get_cache()
+    real_put = store.put
+    monkeypatch.setattr(
+        store, "put", lambda *a, **k: (puts.append(a[0]), real_put(*a, **k))
+    )
+
+    assert diet.show_single_day_plan("prompt") == PLAN
+    assert len(puts) == 1
+    created = store._conn.execute("SELECT created_at FROM llm_cache").fetchone()
+
+    # Served from the cache: rendered again, but not written back.
+    assert diet.show_single_day_plan("prompt") == PLAN
+    assert len(puts) == 1
+    assert store._conn.execute("SELECT created_at FROM llm_cache").fetchone() == created
+
+
+def test_truncated_stream_is_not_cached(screen):
+    set_llm(fake_llm(TRUNCATED, VALID))
+    diet.show_single_day_plan("prompt")
+    key = cache.response_key(diet.get_llm(), "prompt")
+    # The repaired JSON is what gets cached, never the truncated text.
+    assert json.loads(cache.get_cache().get(key)) == PLAN
+
+
+def test_stream_source(screen):
+    llm = fake_llm(VALID)
+    stream = cache.cached_stream(llm, "p", agent="diet")
+    assert stream.source is None
+    assert "".join(stream) == VALID
+    assert stream.source == "model" and stream.fresh
+    cache.store_response(llm, "p", VALID, agent="diet")
+    again = cache.cached_stream(llm, "p", agent="diet")
+    assert list(again) == [VALID]
+    assert again.source == "cache" and not again.fresh
@@ -0,0 +1,153 @@
+# tests/test_github_llm.py
+"""GitHubModelsLLM client reuse, with the Azure clients replaced by fakes.
+
+Usage: python -m pytest -q tests/test_github_llm.py
+"""
+import asyncio
+import inspect
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("azure.ai.inference")
+from langchain_core.language_models import LLM  # noqa: E402
+
+from llms import github_llm  # noqa: E402
+
+
+def reply(text):
+    message = types.SimpleNamespace(content=text)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def update(text):
+    delta = types.SimpleNamespace(content=text)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+
+class FakeClient:
+    created = []
+
+    def __init__(self, endpoint, credential):
+        self.calls = 0
+        self.closed = False
+        FakeClient.created.append(self)
+
+    def complete(self, messages, stream=False, **params):
+        assert not self.closed
+        self.calls += 1
+        text = messages[-1].content
+        if stream:
+            return iter([update(word) for word in text.split()] + [update("")])
+        return reply("echo:" + text)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncClient:
+    created = []
+
+    def __init__(self, endpoint, credential):
+        self.loop = None
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.closed = False
+        FakeAsyncClient.created.append(self)
+
+    async def complete(self, messages, stream=False, **params):
+        # An aiohttp session only works on the loop that first used it.
+        loop = asyncio.get_running_loop()
+        self.loop = self.loop or loop
+        assert self.loop is loop and not self.closed
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        text = messages[-1].content
+        if stream:
+            return self._updates(text)
+        return reply("echo:" + text)
+
+    async def _updates(self, text):
+        for word in text.split():
+            yield update(word)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    FakeClient.created.clear()
+    FakeAsyncClient.created.clear()
+    monkeypatch.setattr(github_llm, "ChatCompletionsClient", FakeClient)
+    monkeypatch.setattr(github_llm, "AsyncChatCompletionsClient", FakeAsyncClient)
+    return github_llm.GitHubModelsLLM(
+        endpoint="https://example.invalid", model="fake", token="t", max_concurrency=2
+    )
+
+
+def test_acall_keeps_langchains_signature():
+    ours = inspect.signature(github_llm.GitHubModelsLLM._acall)
+    assert list(ours.parameters) == list(inspect.signature(LLM._acall).parameters)
+
+
+def test_sync_client_is_reused(llm):
+    assert llm.invoke("hi") == "echo:hi"
+    assert llm.batch(["a", "b", "c"]) == ["echo:a", "echo:b", "echo:c"]
+    assert list(llm.stream("one two")) == ["one", "two"]
+    assert len(FakeClient.created) == 1
+    llm.close()
+    assert FakeClient.created[0].closed
+
+
+def test_async_client_is_reused_on_a_loop(llm):
+    async def session():
+        first = await llm.ainvoke("hi")
+        batch = await llm.abatch(["a", "b", "c", "d"])
+        words = [chunk async for chunk in llm.astream("one two")]
+        return first, batch, words
+
+    first, batch, words = asyncio.run(session())
+    assert first == "echo:hi"
+    assert batch == ["echo:a", "echo:b", "echo:c", "echo:d"]
+    assert words == ["one", "two"]
+    (client,) = FakeAsyncClient.created
+    assert client.calls == 6
+
+
+def test_agenerate_shares_one_client_and_bounds_concurrency(llm):
+    async def run():
+        return await llm.agenerate([f"p{i}" for i in range(6)])
+
+    result = asyncio.run(run())
+    assert [g[0].text for g in result.generations] == [f"echo:p{i}" for i in range(6)]
+    (client,) = FakeAsyncClient.created
+    assert client.calls == 6
+    assert client.peak <= llm.max_concurrency
+
+
+def test_each_event_loop_gets_its_own_client(llm):
+    assert asyncio.run(llm.ainvoke("a")) == "echo:a"
+    assert asyncio.run(llm.ainvoke("b")) == "echo:b"
+    first, second = FakeAsyncClient.created
+    assert first.loop is not second.loop
+
+
+def test_aclose_closes_the_loops_client(llm):
+    async def session():
+        await llm.ainvoke("a")
+        await llm.aclose()
+        await llm.aclose()  # nothing left to close
+        return await llm.ainvoke("b")
+
+    assert asyncio.run(session()) == "echo:b"
+    first, second = FakeAsyncClient.created
+    assert first.closed and not second.closed
@@ -0,0 +1,80 @@
+# tests/test_grocery.py
+"""Parsing grocery items and merging per-day lists.
+
+Usage: python -m pytest -q tests/test_grocery.py
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.grocery import item_key, merge_grocery_lists, parse_item  # noqa: E402
+
+
+# ---- Parsing ----
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("200 g chicken breast", ("chicken breast", 200, "g")),
+        ("2 cups of oats", ("oats", 2, "cup")),
+        ("Oats - 1 cup", ("Oats", 1, "cup")),
+        ("paneer (250 g)", ("paneer", 250, "g")),
+        ("Chicken breast 200g", ("Chicken breast", 200, "g")),
+        ("0.5 kg rice", ("rice", 500, "g")),
+        ("1/2 cup curd", ("curd", 0.5, "cup")),
+        ("1 l milk", ("milk", 1000, "ml")),
+        ("3 eggs", ("eggs", 3, "")),
+        ("1 dozen bananas", ("bananas", 12, "")),
+        ("  - Spinach ", ("Spinach", None, "")),
+    ],
+)
+def test_parse_item(text, expected):
+    assert parse_item(text) == expected
+
+
+def test_item_key_ignores_case_punctuation_and_plurals():
+    assert item_key("Tomatoes") == item_key("tomato")
+    assert item_key("Berries") == item_key("berry")
+    assert item_key("Bananas") == item_key("banana")
+    assert item_key("Chickpeas,") == item_key("chickpea")
+    assert item_key("Hummus") == "hummus"
+
+
+# ---- Merging ----
+def test_quantities_with_compatible_units_are_summed():
+    merged = merge_grocery_lists(
+        [
+            ["200 g paneer", "1/2 cup curd", "2 eggs"],
+            ["Paneer 0.3 kg", "Curd - 1.5 cups", "Eggs (4)"],
+        ]
+    )
+    assert merged == ["Paneer - 500 g", "Curd - 2 cups", "Eggs - 6"]
+
+
+def test_grams_roll_over_to_kilograms():
+    assert merge_grocery_lists([["600 g rice"], ["0.6 kg rice"]]) == ["Rice - 1.2 kg"]
+    assert merge_grocery_lists([["750 ml milk"], ["500 ml milk"]]) == [
+        "Milk - 1.25 l"
+    ]
+
+
+def test_incompatible_units_are_listed_side_by_side():
+    assert merge_grocery_lists([["2 tbsp ghee"], ["10 g ghee"]]) == [
+        "Ghee - 2 tbsp + 10 g"
+    ]
+
+
+def test_items_without_quantity_count_days():
+    merged = merge_grocery_lists([["Spinach", "spinach"], ["Spinach"], ["Lemon"]])
+    assert merged == ["Spinach (2 days)", "Lemon"]
+
+
+def test_first_seen_order_and_name():
+    merged = merge_grocery_lists([["tomatoes", "Oats - 1 cup"], ["Tomato", "oats"]])
+    assert merged == ["Tomatoes (2 days)", "Oats - 1 cup"]
+
+
+def test_blank_and_non_string_items_are_skipped():
+    assert merge_grocery_lists([["", "  ", None, 3, "Salt"]]) == ["Salt"]
@@ -0,0 +1,133 @@
+# tests/test_llm_cache.py
+"""LLMResponseCache expiry and eviction, and cached_invoke's opt-in and filter.
+
+Usage: python -m pytest -q tests/test_llm_cache.py
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llms import cache  # noqa: E402
+from llms.cache import LLMResponseCache, cached_invoke, response_key  # noqa: E402
+
+
+class CountingLLM:
+    """Answers each invoke with the next reply and counts the calls."""
+
+    model = "counting-fake"
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return self.replies.pop(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("WELLNESS_LLM_CACHE_AGENTS", "diet")
+    store = LLMResponseCache(path=str(tmp_path / "cache.db"), ttl=60, max_entries=3)
+    cache.set_cache(store)
+    yield store
+    cache.set_cache(None)
+
+
+# ---- LLMResponseCache ----
+def test_entries_expire_after_ttl(store, clock):
+    store.put("k", "reply")
+    clock[0] += 60
+    assert store.get("k") == "reply"
+    clock[0] += 1
+    assert store.get("k") is None
+    assert len(store) == 0
+    assert store.stats["expired"] == 1
+
+
+def test_reading_does_not_extend_the_ttl(store, clock):
+    store.put("k", "reply")
+    clock[0] += 50
+    assert store.get("k") == "reply"
+    clock[0] += 20
+    assert store.get("k") is None
+
+
+def test_least_recently_used_is_evicted(store, clock):
+    for key in ("a", "b", "c"):
+        clock[0] += 1
+        store.put(key, key.upper())
+    clock[0] += 1
+    assert store.get("a") == "A"  # now "b" is the least recently used
+    clock[0] += 1
+    store.put("d", "D")
+    assert len(store) == 3
+    assert store.get("b") is None
+    assert [store.get(k) for k in ("a", "c", "d")] == ["A", "C", "D"]
+    assert store.stats["evictions"] == 1
+
+
+def test_eviction_by_size(tmp_path, clock):
+    store = LLMResponseCache(path=str(tmp_path / "bytes.db"), max_bytes=10)
+    store.put("a", "12345")
+    clock[0] += 1
+    store.put("b", "67890")
+    clock[0] += 1
+    store.put("c", "é")  # two bytes push the total over the limit
+    assert store.get("a") is None
+    assert store.get("b") == "67890" and store.get("c") == "é"
+
+
+def test_expired_rows_are_dropped_on_write(store, clock):
+    store.put("old", "x")
+    clock[0] += 61
+    store.put("new", "y")
+    assert len(store) == 1
+
+
+# ---- cached_invoke ----
+def test_cache_is_opt_in_per_agent(store):
+    llm = CountingLLM("one", "two", "three")
+    assert cached_invoke(llm, "p", agent="diet") == "one"
+    assert cached_invoke(llm, "p", agent="diet") == "one"
+    assert cached_invoke(llm, "p", agent="physician") == "two"
+    assert cached_invoke(llm, "p") == "three"
+    assert llm.calls == 3
+
+
+def test_accept_filters_what_is_stored(store):
+    valid = lambda text: text.startswith("{")  # noqa: E731
+    llm = CountingLLM("oops", '{"ok": 1}', "never")
+    assert cached_invoke(llm, "p", agent="diet", accept=valid) == "oops"
+    assert store.get(response_key(llm, "p")) is None
+    assert cached_invoke(llm, "p", agent="diet", accept=valid) == '{"ok": 1}'
+    assert cached_invoke(llm, "p", agent="diet", accept=valid) == '{"ok": 1}'
+    assert llm.calls == 2
+
+
+def test_accept_filters_what_is_served(store):
+    valid = lambda text: text.startswith("{")  # noqa: E731
+    llm = CountingLLM('{"fresh": 1}')
+    # Stored earlier without a filter, e.g. by an older version.
+    store.put(response_key(llm, "p"), "not json", agent="diet")
+    assert cached_invoke(llm, "p", agent="diet", accept=valid) == '{"fresh": 1}'
+    assert store.get(response_key(llm, "p")) == '{"fresh": 1}'
+    assert llm.calls == 1
+
+
+def test_key_depends_on_prompt_and_model(store):
+    a, b = CountingLLM(), CountingLLM()
+    b.model = "other"
+    assert response_key(a, "p") == response_key(CountingLLM(), "p")
+    assert response_key(a, "p") != response_key(a, "q")
+    assert response_key(a, "p") != response_key(b, "p")
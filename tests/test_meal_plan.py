@@ -0,0 +1,143 @@
+# tests/test_meal_plan.py
+"""Repeated dishes across the days of a multi-day plan, and the redo rounds.
+
+Usage: python -m pytest -q tests/test_meal_plan.py
+"""
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.meal_plan import (  # noqa: E402
+    REPLAN_ROUNDS,
+    dish_key,
+    plan_days,
+    repeated_days,
+)
+
+
+def meal(name, description, main=None):
+    entry = {"meal": name, "description": description, "calories": 400}
+    if main is not None:
+        entry["main_ingredient"] = main
+    return entry
+
+
+def day(breakfast, lunch, dinner, snack="Fruit"):
+    return {
+        "meals": [
+            meal("Breakfast", f"{breakfast} bowl", breakfast),
+            meal("Snack 1", snack, snack),
+            meal("Lunch", f"{lunch} wrap", lunch),
+            meal("Dinner", f"{dinner} curry", dinner),
+        ]
+    }
+
+
+# ---- Repeat detection ----
+def test_key_is_slot_and_main_ingredient():
+    a = meal("Dinner", "Paneer tikka masala", "Paneer")
+    b = meal(" dinner ", "Grilled paneer with peppers", "paneer ")
+    assert dish_key(a) == dish_key(b) == ("dinner", "paneer")
+    # The same ingredient at another meal is variety, not a repeat.
+    assert dish_key(meal("Lunch", "Paneer wrap", "paneer")) != dish_key(a)
+
+
+def test_key_falls_back_to_the_description():
+    assert dish_key(meal("Lunch", "  Dal   Rice ")) == ("lunch", "dal rice")
+    assert dish_key(meal("Lunch", "Dal rice", "")) == ("lunch", "dal rice")
+
+
+def test_repeated_days():
+    plans = [
+        day("oats", "rajma", "paneer"),
+        day("poha", "tofu", "Paneer"),  # dinner repeats day 1
+        day("idli", "chickpeas", "soya"),
+        day("oats", "moong dal", "fish"),  # breakfast repeats day 1
+    ]
+    repeats, seen = repeated_days(plans)
+    assert repeats == [1, 3]
+    # Only kept days' dishes are listed for the redo prompt.
+    assert ("dinner", "paneer") in seen
+    assert ("lunch", "tofu") not in seen
+    assert seen[("dinner", "soya")] == "Dinner: soya curry (soya)"
+
+
+def test_snacks_may_repeat():
+    plans = [day("oats", "rajma", "paneer"), day("poha", "tofu", "soya")]
+    assert repeated_days(plans)[0] == []
+
+
+# ---- Redo rounds ----
+class Planner:
+    """``plan_day`` stand-in: answers from ``dinners[day]`` and records calls.
+
+    A redo request takes the next dinner queued for that day.
+    """
+
+    def __init__(self, dinners):
+        self.dinners = {d: list(options) for d, options in dinners.items()}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, d, avoid):
+        with self._lock:
+            self.calls.append((d, avoid))
+            options = self.dinners[d]
+            dinner = options.pop(0) if len(options) > 1 else options[0]
+        return day(f"breakfast {d}", f"lunch {d}", dinner), [f"{d * 100} g {dinner}"]
+
+
+def run(planner, days, rounds=REPLAN_ROUNDS):
+    with ThreadPoolExecutor(max_workers=days) as pool:
+        return plan_days(planner, days, pool, rounds=rounds)
+
+
+def dinners(results):
+    return [plan["meals"][-1]["main_ingredient"] for plan, _ in results]
+
+
+def test_no_repeats_means_one_request_per_day():
+    planner = Planner({1: ["paneer"], 2: ["tofu"], 3: ["soya"]})
+    results = run(planner, 3)
+    assert dinners(results) == ["paneer", "tofu", "soya"]
+    assert sorted(d for d, _ in planner.calls) == [1, 2, 3]
+    assert results[2][1] == ["300 g soya"]
+
+
+def test_repeat_is_redone_without_the_kept_dishes():
+    planner = Planner({1: ["paneer"], 2: ["paneer", "tofu"], 3: ["soya"]})
+    assert dinners(run(planner, 3)) == ["paneer", "tofu", "soya"]
+    (redo,) = planner.calls[3:]
+    assert redo[0] == 2
+    assert "Dinner: paneer curry (paneer)" in redo[1]
+    assert "Dinner: soya curry (soya)" in redo[1]
+
+
+def test_redone_days_are_checked_again():
+    # Days 2 and 3 both repeat day 1, then both redo to tofu: day 3 now
+    # clashes with the redone day 2 and goes round again.
+    planner = Planner(
+        {1: ["paneer"], 2: ["paneer", "tofu"], 3: ["paneer", "tofu", "soya"]}
+    )
+    assert dinners(run(planner, 3)) == ["paneer", "tofu", "soya"]
+    assert [d for d, _ in planner.calls[3:]] in ([2, 3, 3], [3, 2, 3])
+    # The second round avoids the redone day's dish too.
+    assert "Dinner: tofu curry (tofu)" in planner.calls[-1][1]
+
+
+def test_redo_rounds_are_bounded():
+    planner = Planner({1: ["paneer"], 2: ["paneer"]})
+    assert dinners(run(planner, 2, rounds=2)) == ["paneer", "paneer"]
+    assert len(planner.calls) == 2 + 2
+
+
+@pytest.mark.parametrize("rounds", [0, 1])
+def test_rounds_can_be_lowered(rounds):
+    planner = Planner({1: ["paneer"], 2: ["paneer", "tofu"]})
+    run(planner, 2, rounds=rounds)
+    assert len(planner.calls) == 2 + rounds
@@ -0,0 +1,86 @@
+# tests/test_nutrition.py
+"""The vectorised cohort targets agree with the scalar form functions.
+
+Usage: python -m pytest -q tests/test_nutrition.py
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import nutrition as n  # noqa: E402
+
+KEYS = ("bmr", "tdee", "target_calories", "protein_g", "carbs_g", "fats_g")
+
+
+def cohort(size=2000, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def column(labels):
+        # Form labels plus spellings that take the fallbacks.
+        values = np.array(labels)
+        return values[rng.integers(0, len(values), size)]
+
+    return {
+        "age": rng.integers(18, 90, size),
+        "gender": column(n.GENDERS + ("male", "FEMALE", "")),
+        "height": rng.uniform(140, 200, size).round(1),
+        "weight": rng.uniform(40, 140, size).round(1),
+        "activity": column(n.ACTIVITY_LEVELS + ("Unknown",)),
+        "goal": column(n.GOALS + ("Recomp",)),
+    }
+
+
+def scalar(age, gender, height, weight, activity, goal):
+    bmr = n.calculate_bmr(age, gender, height, weight)
+    tdee = n.calculate_tdee(bmr, activity)
+    target = n.adjust_calories_for_goal(tdee, goal)
+    return {
+        "bmr": bmr,
+        "tdee": tdee,
+        "target_calories": target,
+        **n.calculate_macro_targets(target, goal, weight),
+    }
+
+
+def columns(data):
+    return [data[k] for k in ("age", "gender", "height", "weight", "activity", "goal")]
+
+
+@pytest.mark.parametrize("coded", [False, True])
+def test_cohort_matches_scalar_functions(coded):
+    data = cohort()
+    vector_input = dict(data)
+    if coded:
+        vector_input["gender"] = n.encode(data["gender"], n.GENDERS, casefold=True)
+        vector_input["activity"] = n.encode(data["activity"], n.ACTIVITY_LEVELS)
+        vector_input["goal"] = n.encode(data["goal"], n.GOALS)
+    vector = n.cohort_targets(*columns(vector_input))
+    rows = zip(*(column.tolist() for column in columns(data)))
+    for i, row in enumerate(rows):
+        expected = scalar(*row)
+        for key in KEYS:
+            assert vector[key][i] == pytest.approx(expected[key], abs=1e-9), (key, row)
+
+
+@pytest.mark.parametrize(
+    "goal, target",
+    [
+        ("Lose Weight", 1500),
+        ("Maintain Weight", 2000),
+        ("Gain Weight", 2500),
+        ("Build Strength / Muscle", 2250),
+        ("Recomp", 2000),
+    ],
+)
+def test_goal_adjustment(goal, target):
+    assert n.adjust_calories_for_goal(2000, goal) == target
+
+
+def test_encode():
+    codes = n.encode(np.array(["Female", "male", "x"]), n.GENDERS, casefold=True)
+    assert codes.tolist() == [1, 0, -1]
+    assert n.encode(np.array([0, 3, -2]), n.GOALS).tolist() == [0, 3, -1]
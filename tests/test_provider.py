@@ -0,0 +1,92 @@
+# tests/test_provider.py
+"""The shared chat model: built once, overridable with set_llm.
+
+Usage: python -m pytest -q tests/test_provider.py
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llms import provider  # noqa: E402
+from llms.provider import LLMConfig, get_llm, get_llm_config, set_llm  # noqa: E402
+
+
+@pytest.fixture
+def built(monkeypatch):
+    """Records every client the provider builds instead of calling Gemini."""
+    configs = []
+
+    def build(config):
+        configs.append(config)
+        return ("client", config)
+
+    monkeypatch.setattr(provider, "_build_llm", build)
+    set_llm(None)
+    yield configs
+    set_llm(None)
+
+
+def test_set_llm_overrides_the_shared_client(built):
+    fake = object()
+    set_llm(fake)
+    assert get_llm() is fake
+    assert get_llm() is fake
+    assert built == []
+
+
+def test_set_llm_none_rebuilds_from_the_given_config(built):
+    set_llm(object())
+    config = LLMConfig(model="gemini-test", temperature=0.2, transport="rest")
+    set_llm(None, config)
+    assert get_llm() == ("client", config)
+    assert get_llm_config() is config
+    assert built == [config]
+
+
+def test_client_is_built_once_under_concurrency(built, monkeypatch):
+    monkeypatch.setattr(provider, "_config", LLMConfig())
+    start = threading.Barrier(8)
+    clients = []
+
+    def call():
+        start.wait()
+        clients.append(get_llm())
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(built) == 1
+    assert all(client is clients[0] for client in clients)
+
+
+def test_config_from_env(monkeypatch):
+    monkeypatch.setenv("WELLNESS_LLM_MODEL", "gemini-flash")
+    monkeypatch.setenv("WELLNESS_LLM_TEMPERATURE", "0.3")
+    monkeypatch.setenv("WELLNESS_LLM_TIMEOUT", "20")
+    monkeypatch.setenv("WELLNESS_LLM_MAX_RETRIES", "5")
+    monkeypatch.setenv("WELLNESS_LLM_TRANSPORT", "rest")
+    assert LLMConfig.from_env() == LLMConfig("gemini-flash", 0.3, 20.0, 5, "rest")
+    for name in ("TEMPERATURE", "TIMEOUT", "TRANSPORT"):
+        monkeypatch.setenv(f"WELLNESS_LLM_{name}", "")
+    config = LLMConfig.from_env()
+    assert (config.temperature, config.timeout, config.transport) == (None, None, None)
+
+
+def test_build_passes_only_the_options_that_are_set(monkeypatch):
+    genai = pytest.importorskip("langchain_google_genai")
+    seen = []
+    monkeypatch.setattr(
+        genai, "ChatGoogleGenerativeAI", lambda **kwargs: seen.append(kwargs)
+    )
+    provider._build_llm(LLMConfig(model="m"))
+    provider._build_llm(LLMConfig(model="m", timeout=5, transport="grpc"))
+    assert seen == [
+        {"model": "m", "max_retries": 2},
+        {"model": "m", "max_retries": 2, "timeout": 5, "transport": "grpc"},
+    ]
@@ -0,0 +1,128 @@
+# tests/test_semantic_cache.py
+"""SemanticCache: paraphrase hits, symptom-aware misses, expiry and clearing.
+
+Usage: python -m pytest -q tests/test_semantic_cache.py
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llms import semantic_cache as sc  # noqa: E402
+from llms.semantic_cache import SemanticCache, terms  # noqa: E402
+
+STORED = "sore throat for 2 days, no fever"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(sc.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SemanticCache(path=str(tmp_path / "semantic.db"), ttl=3600, max_entries=3)
+
+
+def test_terms_keep_negations_apart():
+    assert terms("No fever, but a bad cough") == {"-fever", "bad", "cough"}
+    assert terms("I don't have a fever") == {"-fever"}
+    assert terms("Sore throat") == terms("throat aching") == {"pain", "throat"}
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "throat pain for two days, no fever",
+        "my throat hurts since two days and no fever",
+        "Sore throat for 2 days. No fever.",
+    ],
+)
+def test_paraphrase_hits(cache, query):
+    cache.put(STORED, "triage", "rest and fluids")
+    response, score = cache.lookup(query, "triage")
+    assert response == "rest and fluids"
+    assert score >= cache.threshold
+
+
+def test_added_symptom_misses_even_when_similar(tmp_path):
+    # A low threshold so only the term check can reject the match.
+    cache = SemanticCache(path=str(tmp_path / "low.db"), threshold=0.5)
+    cache.put("sore throat for 2 days", "triage", "rest and fluids")
+    assert cache.get("sore throat for 2 days, blood in cough", "triage") is None
+    # Fewer symptoms than the stored complaint are still covered by it.
+    assert cache.get("sore throat", "triage") == "rest and fluids"
+
+
+@pytest.mark.parametrize(
+    "stored, query",
+    [
+        ("sore throat for 2 days", "sore throat for 2 days, no fever"),
+        ("sore throat for 2 days, fever", "sore throat for 2 days, no fever"),
+        (STORED, "sore throat for 2 days, fever"),
+    ],
+)
+def test_negated_symptom_misses(tmp_path, stored, query):
+    cache = SemanticCache(path=str(tmp_path / "low.db"), threshold=0.5)
+    cache.put(stored, "triage", "rest and fluids")
+    assert cache.get(query, "triage") is None
+
+
+def test_partitions_do_not_mix(cache):
+    cache.put(STORED, "triage:adult", "adult advice")
+    assert cache.get(STORED, "triage:child") is None
+    assert cache.get(STORED, "triage:adult") == "adult advice"
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put(STORED, "triage", "rest and fluids")
+    clock[0] += 3599
+    assert cache.get(STORED, "triage") == "rest and fluids"
+    clock[0] += 2
+    assert cache.get(STORED, "triage") is None
+    # Expired rows are dropped on the next write.
+    cache.put("headache since morning", "triage", "hydrate")
+    assert len(cache) == 1
+    assert cache.stats["expired"] == 1
+
+
+def test_least_recently_used_is_evicted(cache, clock):
+    for i, text in enumerate(["headache", "back pain", "stomach pain"]):
+        clock[0] += 1
+        cache.put(text, "triage", f"r{i}")
+    clock[0] += 1
+    assert cache.get("headache", "triage") == "r0"
+    clock[0] += 1
+    cache.put("cough", "triage", "r3")
+    assert len(cache) == 3
+    assert cache.get("back pain", "triage") is None
+    assert cache.get("headache", "triage") == "r0"
+
+
+def test_entries_survive_a_restart(cache, tmp_path):
+    cache.put(STORED, "triage", "rest and fluids")
+    reopened = SemanticCache(path=str(tmp_path / "semantic.db"))
+    assert reopened.get("throat pain for two days, no fever", "triage") == (
+        "rest and fluids"
+    )
+
+
+def test_clear_resets_everything(cache):
+    cache.put(STORED, "triage:a", "old a")
+    cache.put("headache", "triage:b", "old b")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache._partitions == {}
+    assert len(cache._vectors) == len(cache._created) == len(cache._accessed) == 0
+    assert len(cache._partition_of) == 0
+    assert cache.get(STORED, "triage:a") is None
+    # New entries start from clean rows and partition ids.
+    cache.put("headache", "triage:c", "new c")
+    assert cache._partitions == {"triage:c": 0}
+    assert cache.get("headache", "triage:b") is None
+    assert cache.get("headache", "triage:c") == "new c"
+    assert SemanticCache(path=cache.path).get("headache", "triage:c") == "new c"
@@ -0,0 +1,201 @@
+# tests/test_singleflight.py
+"""SingleFlight: one execution per key for concurrent callers, errors shared.
+
+Usage: python -m pytest -q tests/test_singleflight.py
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llms import cache  # noqa: E402
+from llms.singleflight import SingleFlight  # noqa: E402
+
+FOLLOWERS = 5
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_concurrently(flight, key, fn, followers=FOLLOWERS):
+    """The leader blocks in ``fn`` until every follower has joined."""
+    release = threading.Event()
+    outcomes = [None] * (followers + 1)
+
+    def blocked():
+        release.wait(5)
+        return fn()
+
+    def call(i):
+        try:
+            outcomes[i] = ("ok", flight.do(key, blocked))
+        except Exception as e:
+            outcomes[i] = ("error", e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(followers + 1)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: flight.stats["calls"] >= followers + 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_one_execution_serves_every_waiter():
+    flight = SingleFlight()
+    runs = []
+    outcomes = run_concurrently(flight, "k", lambda: runs.append(1) or "reply")
+    assert outcomes == [("ok", "reply")] * (FOLLOWERS + 1)
+    assert len(runs) == 1
+    assert flight.stats == {
+        "calls": FOLLOWERS + 1,
+        "executions": 1,
+        "coalesced": FOLLOWERS,
+    }
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+    error = ValueError("upstream 503")
+
+    def fail():
+        raise error
+
+    outcomes = run_concurrently(flight, "k", fail)
+    assert outcomes == [("error", error)] * (FOLLOWERS + 1)
+    assert flight.stats["executions"] == 1
+    # The failed call is forgotten; the next caller runs again.
+    assert flight.do("k", lambda: "recovered") == "recovered"
+    assert flight.stats["executions"] == 2
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    call, leader = flight.join("a")
+    assert leader
+    assert flight.do("b", lambda: "b") == "b"
+    flight.finish("a", call, result="a")
+    assert flight.wait(call) == "a"
+
+
+def test_join_wait_finish():
+    flight = SingleFlight()
+    call, leader = flight.join("k")
+    again, follower_leads = flight.join("k")
+    assert leader and not follower_leads and again is call
+    assert call.waiters == 1
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(flight.wait(call)))
+    waiter.start()
+    flight.finish("k", call, result="done")
+    waiter.join(5)
+    assert results == ["done"]
+    # Finished calls are not joined again.
+    assert flight.join("k")[1]
+
+
+def test_sequential_calls_each_execute():
+    flight = SingleFlight()
+    assert [flight.do("k", lambda: i) for i in range(3)] == [0, 1, 2]
+    assert flight.stats["executions"] == 3
+
+
+# ---- Through llms.cache ----
+class BlockingLLM:
+    model = "blocking-fake"
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.release = threading.Event()
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        self.release.wait(5)
+        return self.reply
+
+    def stream(self, prompt):
+        self.calls += 1
+        self.release.wait(5)
+        yield from self.reply.split(" ")
+
+
+@pytest.fixture
+def flight(monkeypatch):
+    flight = SingleFlight()
+    monkeypatch.setattr(cache, "llm_flight", flight)
+    monkeypatch.delenv("WELLNESS_LLM_CACHE_AGENTS", raising=False)
+    return flight
+
+
+def in_threads(n, fn):
+    results = [None] * n
+    threads = [
+        threading.Thread(target=lambda i=i: results.__setitem__(i, fn()))
+        for i in range(n)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_cached_invoke_coalesces_identical_prompts(flight):
+    llm = BlockingLLM("breathe slowly")
+    threads, results = in_threads(4, lambda: cache.cached_invoke(llm, "p"))
+    wait_for(lambda: flight.stats["calls"] == 4)
+    llm.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["breathe slowly"] * 4
+    assert llm.calls == 1
+
+
+def test_stream_followers_get_the_full_text(flight):
+    llm = BlockingLLM("breathe slowly")
+    leader = cache.cached_stream(llm, "p")
+    streamed = []
+    first = threading.Thread(target=lambda: streamed.extend(leader))
+    first.start()
+    wait_for(lambda: flight.in_flight() == 1)
+    threads, results = in_threads(2, lambda: list(cache.cached_stream(llm, "p")))
+    wait_for(lambda: flight.stats["coalesced"] == 2)
+    llm.release.set()
+    first.join(5)
+    for thread in threads:
+        thread.join(5)
+    assert streamed == ["breathe", "slowly"] and leader.source == "model"
+    assert results == [["breatheslowly"]] * 2
+    assert llm.calls == 1
+
+
+def test_abandoned_stream_fails_its_followers(flight):
+    llm = BlockingLLM("breathe slowly")
+    llm.release.set()
+    leader = cache.cached_stream(llm, "p")
+    assert next(leader) == "breathe"
+    follower = cache.cached_stream(llm, "p")
+    outcome = []
+
+    def follow():
+        try:
+            list(follower)
+        except RuntimeError as e:
+            outcome.append(str(e))
+
+    thread = threading.Thread(target=follow)
+    thread.start()
+    wait_for(lambda: flight.stats["coalesced"] == 1)
+    leader._chunks.close()
+    thread.join(5)
+    assert outcome == ["stream abandoned"]
+    assert flight.in_flight() == 0
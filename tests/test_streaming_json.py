@@ -0,0 +1,234 @@
+# tests/test_streaming_json.py
+"""StreamingJSONParser: chunking, truncation and malformed input.
+
+Usage: python -m pytest -q tests/test_streaming_json.py
+"""
+import json
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.streaming_json import (  # noqa: E402
+    StreamingJSONError,
+    StreamingJSONParser,
+    iter_json_events,
+)
+
+
+def meal(name, description, calories):
+    return {"meal": name, "description": description, "calories": calories}
+
+
+PLAN = {
+    "daily_plan": [
+        {
+            "day": "Day 1",
+            "meals": [
+                meal("Breakfast", 'Oats, "steel-cut"', 350),
+                meal("Lunch", "Dal\\rice été \n bowl", 600),
+                meal("Dinner", "Paneer {tikka} [grilled]", 550.5),
+            ],
+            "total_calories": 1500.5,
+            "macros": {"protein_g": 80, "carbs_g": 200, "fats_g": 55},
+            "notes": None,
+            "vegetarian": True,
+            "tags": [],
+            "extra": {},
+        }
+    ],
+    "grocery_list": ["Oats - 1 cup", "Paneer, 200 g", "a \\ b", "-1.5e2"],
+}
+TEXT = json.dumps(PLAN, indent=2, ensure_ascii=False)
+PATTERNS = [("daily_plan", "*", "meals", "*"), ("grocery_list", "*")]
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def parse(chunks, patterns=PATTERNS):
+    parser = StreamingJSONParser(patterns)
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return parser.close(), events
+
+
+EXPECTED_EVENTS = [
+    (("daily_plan", 0, "meals", i), meal)
+    for i, meal in enumerate(PLAN["daily_plan"][0]["meals"])
+] + [(("grocery_list", i), item) for i, item in enumerate(PLAN["grocery_list"])]
+
+
+# ---- Chunking ----
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 16, 64, len(TEXT)])
+def test_any_chunk_size_gives_the_same_result(size):
+    result, events = parse(chunked(TEXT, size))
+    assert result == PLAN
+    assert events == EXPECTED_EVENTS
+
+
+def test_every_split_point():
+    # Two chunks split at every offset: inside keys, strings, escapes,
+    # numbers, literals and between tokens.
+    compact = json.dumps(PLAN)
+    for i in range(len(compact) + 1):
+        result, events = parse([compact[:i], compact[i:]])
+        assert result == PLAN, i
+        assert events == EXPECTED_EVENTS, i
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        'a "quoted" word',
+        "back\\slash",
+        "ends with backslash \\",
+        "brace } bracket ] comma , colon :",
+        "unicode é ☃ \U0001f600",
+        "line\nbreak\ttab",
+    ],
+)
+def test_split_inside_strings_and_escapes(value):
+    text = json.dumps({"k": [value, {"v": value}]})
+    start = text.index('"', 5)
+    for i in range(start, len(text)):
+        result, _ = parse([text[:i], text[i:]])
+        assert result == {"k": [value, {"v": value}]}, i
+
+
+def test_escaped_unicode_split_across_chunks():
+    text = '{"k": "caf\\u00e9 \\"ok\\""}'
+    for size in range(1, len(text) + 1):
+        result, _ = parse(chunked(text, size))
+        assert result == {"k": 'café "ok"'}
+
+
+def test_scalar_events_arrive_when_complete():
+    parser = StreamingJSONParser([("grocery_list", "*")])
+    events = parser.feed('{"grocery_list": ["Oats", 12')
+    assert events == [(("grocery_list", 0), "Oats")]
+    # The number may still continue in the next chunk.
+    assert parser.feed("3") == []
+    assert parser.feed(", true]}") == [
+        (("grocery_list", 1), 123),
+        (("grocery_list", 2), True),
+    ]
+    assert parser.close() == {"grocery_list": ["Oats", 123, True]}
+
+
+def test_text_around_the_root_value_is_ignored():
+    chunks = ["Here is your plan:\n```json\n", TEXT, "\n```\nEnjoy!"]
+    result, events = parse(chunks)
+    assert result == PLAN
+    assert events == EXPECTED_EVENTS
+
+
+def test_feed_after_done_is_ignored():
+    parser = StreamingJSONParser()
+    parser.feed('[1, 2]  [3')
+    assert parser.feed("]") == []
+    assert parser.close() == [1, 2]
+    assert parser.text == "[1, 2]  [3"
+
+
+def test_iter_json_events():
+    events = list(iter_json_events(chunked(TEXT, 9), PATTERNS))
+    assert events == EXPECTED_EVENTS
+
+
+# ---- Truncation ----
+@pytest.mark.parametrize(
+    "text, where",
+    [
+        ('{"a": 1', "$"),
+        ('{"a": ', "$"),
+        ('{"a"', "$"),
+        ('{"a": {"b": [1, 2', "$.a.b"),
+        ('[1, 2, {"c": 3', "$[2]"),
+        ('[[1, [2, 3]', "$[0]"),
+        ('{"a": "unterminated', "$"),
+        ('{"a": ["x", "y\\', "$.a"),
+        ('{"a": tru', "$"),
+    ],
+)
+def test_truncation_inside_each_container(text, where):
+    for size in (1, 4, len(text)):
+        parser = StreamingJSONParser()
+        for chunk in chunked(text, size):
+            parser.feed(chunk)
+        match = "truncated inside " + re.escape(where)
+        with pytest.raises(StreamingJSONError, match=match):
+            parser.close()
+
+
+def test_truncated_plan_at_every_offset():
+    compact = json.dumps(PLAN)
+    for i in range(len(compact)):
+        parser = StreamingJSONParser(PATTERNS)
+        parser.feed(compact[:i])
+        with pytest.raises(StreamingJSONError):
+            parser.close()
+
+
+@pytest.mark.parametrize("text", ["", "   ", "no json here", "```json\n```"])
+def test_no_value(text):
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    with pytest.raises(StreamingJSONError, match="no JSON value"):
+        parser.close()
+
+
+# ---- Malformed input ----
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"a": 1]',  # mismatched closer
+        "[1, 2}",
+        '{"a" 1}',  # missing colon
+        '{"a":: 1}',  # doubled colon
+        '{"a": 1 "b": 2}',  # missing comma between members
+        '[1 2]',  # missing comma between elements
+        '["a" "b"]',
+        '[{"a": 1} {"b": 2}]',
+        '[[1] [2]]',
+        '{"a": 1,}',  # trailing commas
+        "[1, 2,]",
+        '{"a": [1,], "b": 2}',
+        "[,1]",  # leading / doubled commas
+        "[1,,2]",
+        '{, "a": 1}',
+        '{"a": 1,, "b": 2}',
+        "[1: 2]",  # colon in an array
+        '{1: 2}',  # non-string key
+        '{"a": 1, 2}',
+        '{"a": 1, "b"}',  # key without value
+        '{"a": }',
+        '{"a": nul}',  # bad literals and numbers
+        '{"a": True}',
+        "[01]",
+        "[1.]",
+        '["bad \\x escape"]',
+    ],
+)
+def test_malformed_json_is_rejected(text):
+    for size in (1, 3, len(text)):
+        with pytest.raises(StreamingJSONError):
+            parse(chunked(text, size))
+
+
+def test_error_is_raised_as_soon_as_it_is_seen():
+    parser = StreamingJSONParser()
+    parser.feed('{"a": [1, 2')
+    with pytest.raises(StreamingJSONError, match="missing ','"):
+        parser.feed(' "x"')
+
+
+def test_error_reports_the_offset():
+    match = "expected '}' but found ']' at offset 7"
+    with pytest.raises(StreamingJSONError, match=match):
+        parse(['{"a": 1]'])
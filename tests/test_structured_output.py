@@ -0,0 +1,187 @@
+# tests/test_structured_output.py
+"""JSON extraction from model replies, schema checks and the repair loop.
+
+Usage: python -m pytest -q tests/test_structured_output.py
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llms import cache  # noqa: E402
+from utils.structured_output import (  # noqa: E402
+    ANALYSIS_SCHEMA,
+    MAX_RESTARTS,
+    StructuredOutputError,
+    extract_json,
+    generate_structured,
+    iter_json_candidates,
+    validate,
+)
+
+ANALYSIS = {
+    "diagnosis": "Tension headache",
+    "specialist": "General Physician",
+    "self_care": ["Hydrate", "Rest"],
+}
+
+
+def spans(text):
+    return [text[a:b] for a, b in iter_json_candidates(text)]
+
+
+# ---- iter_json_candidates ----
+def test_candidates_skip_braces_and_quotes_inside_strings():
+    text = 'Sure! {"a": "x } y", "b": "say \\"{\\""} then {"c": {"d": 1}}'
+    assert spans(text) == [
+        '{"a": "x } y", "b": "say \\"{\\""}',
+        '{"c": {"d": 1}}',
+    ]
+
+
+def test_candidates_ignore_prose_quotes_and_stray_closers():
+    text = 'He said "hi" } and {"a": 1} "unclosed'
+    assert spans(text) == ['{"a": 1}']
+
+
+def test_unbalanced_candidate_is_not_yielded():
+    assert spans('{"a": {"b": 1}') == []
+
+
+# ---- extract_json ----
+@pytest.mark.parametrize(
+    "text",
+    [
+        json.dumps(ANALYSIS),
+        "Here you go:\n```json\n" + json.dumps(ANALYSIS, indent=2) + "\n```",
+        "Note {draft}: " + json.dumps(ANALYSIS),
+        '{"diagnosis": broken} Corrected: ' + json.dumps(ANALYSIS),
+    ],
+)
+def test_extract_json(text):
+    assert extract_json(text) == ANALYSIS
+
+
+@pytest.mark.parametrize("text", ["", "no json", "[1, 2]", '{"a": '])
+def test_extract_json_without_an_object(text):
+    assert extract_json(text) is None
+
+
+def test_extract_json_gives_up_after_max_restarts():
+    def text(broken):
+        return "{x} " * broken + '{"ok": 1}'
+
+    assert extract_json(text(MAX_RESTARTS + 1)) == {"ok": 1}
+    assert extract_json(text(MAX_RESTARTS + 2)) is None
+
+
+# ---- validate ----
+def test_validate_reports_paths():
+    data = {
+        "diagnosis": "x",
+        "specialist": 3,
+        "self_care": ["a", None],
+        "visit_clinic": "yes",
+    }
+    assert validate(data, ANALYSIS_SCHEMA) == [
+        "$.specialist: expected string, got int",
+        "$.self_care[1]: expected string, got NoneType",
+        "$.visit_clinic: expected boolean, got str",
+    ]
+
+
+def test_optional_keys_may_be_missing_or_null():
+    assert validate({**ANALYSIS, "advice": None}, ANALYSIS_SCHEMA) == []
+    assert validate({"diagnosis": "x"}, ANALYSIS_SCHEMA) == [
+        "$.specialist: missing",
+        "$.self_care: missing",
+    ]
+
+
+# ---- generate_structured ----
+class ScriptedLLM:
+    """Replies in order and records the prompts it was given."""
+
+    model = "scripted-fake"
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return self.replies.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.delenv("WELLNESS_LLM_CACHE_AGENTS", raising=False)
+
+
+def test_valid_reply_needs_one_call():
+    llm = ScriptedLLM("```json\n" + json.dumps(ANALYSIS) + "\n```")
+    assert generate_structured(llm, "triage", ANALYSIS_SCHEMA) == ANALYSIS
+    assert llm.prompts == ["triage"]
+
+
+def test_invalid_reply_is_repaired():
+    bad = '{"diagnosis": "Tension headache"}'
+    llm = ScriptedLLM(bad, json.dumps(ANALYSIS))
+    assert generate_structured(llm, "triage", ANALYSIS_SCHEMA) == ANALYSIS
+    repair = llm.prompts[1]
+    assert repair.startswith("triage")
+    assert "- $.specialist: missing" in repair
+    assert bad in repair
+
+
+def test_unparseable_reply_is_repaired():
+    llm = ScriptedLLM("Sorry, I cannot do that.", json.dumps(ANALYSIS))
+    assert generate_structured(llm, "triage", ANALYSIS_SCHEMA) == ANALYSIS
+    assert "- no valid JSON object found" in llm.prompts[1]
+
+
+def test_error_after_the_last_repair():
+    llm = ScriptedLLM("nope", "still nope", "never asked")
+    with pytest.raises(StructuredOutputError) as err:
+        generate_structured(llm, "triage", ANALYSIS_SCHEMA, max_repairs=1)
+    assert "after 1 repair(s)" in str(err.value)
+    assert err.value.raw == "still nope"
+    assert err.value.errors == ["no valid JSON object found"]
+    assert len(llm.prompts) == 2
+
+
+def test_no_repairs():
+    llm = ScriptedLLM("nope")
+    with pytest.raises(StructuredOutputError, match="after 0 repair"):
+        generate_structured(llm, "triage", ANALYSIS_SCHEMA, max_repairs=0)
+
+
+def test_raw_reply_skips_the_first_call():
+    llm = ScriptedLLM(json.dumps(ANALYSIS))
+    data = generate_structured(
+        llm, "triage", ANALYSIS_SCHEMA, raw='{"diagnosis": "trunc'
+    )
+    assert data == ANALYSIS
+    assert len(llm.prompts) == 1 and llm.prompts[0] != "triage"
+
+
+def test_repaired_json_is_cached_under_the_original_prompt(tmp_path, monkeypatch):
+    monkeypatch.setenv("WELLNESS_LLM_CACHE_AGENTS", "physician")
+    store = cache.LLMResponseCache(path=str(tmp_path / "cache.db"))
+    cache.set_cache(store)
+    try:
+        llm = ScriptedLLM("nope", json.dumps(ANALYSIS))
+        generate_structured(llm, "triage", ANALYSIS_SCHEMA, agent="physician")
+        key = cache.response_key(llm, "triage")
+        assert json.loads(store.get(key)) == ANALYSIS
+        # Served from the cache without calling the model.
+        again = generate_structured(llm, "triage", ANALYSIS_SCHEMA, agent="physician")
+        assert again == ANALYSIS
+        assert len(llm.prompts) == 2
+        # The repair prompt itself is never cached.
+        assert len(store) == 1
+    finally:
+        cache.set_cache(None)
@@ -0,0 +1,213 @@
+# utils/availability.py
+"""Appointment slot availability with conflict detection.
+
+Bookings are indexed per clinic and per day as sorted, non-overlapping
+intervals (minutes since midnight). Checking a slot is a binary search
+over that one day's bookings, independent of how many bookings exist in
+total.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.bookings import get_booking_store
+
+SLOT_MINUTES = 30
+OPENING_HOURS = ("09:00", "18:00")
+
+
+class SlotConflictError(ValueError):
+    def __init__(self, message: str, clinic: str = "", date: str = "", conflict=None):
+        super().__init__(message)
+        self.clinic = clinic
+        self.date = date
+        self.conflict = conflict
+
+
+def conflict_error(clinic: str, date: str, clash: Tuple[int, int]) -> SlotConflictError:
+    booked = (to_clock(clash[0]), to_clock(clash[1]))
+    return SlotConflictError(
+        f"{clinic} is already booked {booked[0]}-{booked[1]} on {date}",
+        clinic=clinic,
+        date=date,
+        conflict=booked,
+    )
+
+
+def to_minutes(value: str) -> int:
+    """'HH:MM' or 'HH:MM:SS' -> minutes since midnight."""
+    parts = str(value).split(":")
+    return int(parts[0]) * 60 + int(parts[1] if len(parts) > 1 else 0)
+
+
+def to_clock(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class _Day:
+    """Sorted starts/ends of one clinic's bookings on one day."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def conflict(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        # Intervals never overlap, so only the neighbours of the insertion
+        # point can clash with [start, end).
+        i = bisect_right(self.starts, start)
+        if i and self.ends[i - 1] > start:
+            return self.starts[i - 1], self.ends[i - 1]
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.starts[i], self.ends[i]
+        return None
+
+    def insert(self, start: int, end: int):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def remove(self, start: int) -> bool:
+        i = bisect_left(self.starts, start)
+        if i < len(self.starts) and self.starts[i] == start:
+            del self.starts[i]
+            del self.ends[i]
+            return True
+        return False
+
+
+class AvailabilityIndex:
+    def __init__(self, slot_minutes: int = SLOT_MINUTES):
+        self.slot_minutes = slot_minutes
+        self._days: Dict[Tuple[str, str], _Day] = defaultdict(_Day)
+        self.lock = threading.Lock()
+
+    def _interval(self, time: str, duration: Optional[int]) -> Tuple[int, int]:
+        start = to_minutes(time)
+        return start, start + (duration or self.slot_minutes)
+
+    def is_free(self, clinic: str, date: str, time: str, duration=None) -> bool:
+        day = self._days.get((clinic, date))
+        return day is None or day.conflict(*self._interval(time, duration)) is None
+
+    def reserve(self, clinic: str, date: str, time: str, duration=None):
+        """Claim a slot; raises SlotConflictError if it overlaps a booking."""
+        start, end = self._interval(time, duration)
+        day = self._days[(clinic, date)]
+        clash = day.conflict(start, end)
+        if clash is not None:
+            raise conflict_error(clinic, date, clash)
+        day.insert(start, end)
+
+    def release(self, clinic: str, date: str, time: str) -> bool:
+        day = self._days.get((clinic, date))
+        return day is not None and day.remove(to_minutes(time))
+
+    def free_slots(
+        self,
+        clinic: str,
+        date: str,
+        opening_hours: Tuple[str, str] = OPENING_HOURS,
+        duration: Optional[int] = None,
+    ) -> List[str]:
+        """Start times of free ``duration``-minute slots within opening hours."""
+        step = duration or self.slot_minutes
+        open_at, close_at = (to_minutes(t) for t in opening_hours)
+        day = self._days.get((clinic, date))
+        starts, ends = (day.starts, day.ends) if day else ([], [])
+        # Skip bookings that end before opening, then walk the gaps; slots
+        # stay on the grid that starts at opening time.
+        i = bisect_right(ends, open_at)
+        slots = []
+        t = open_at
+        while t + step <= close_at:
+            if i < len(starts) and starts[i] < t + step:
+                if ends[i] > t:
+                    t = open_at + -(-(ends[i] - open_at) // step) * step
+                i += 1
+                continue
+            slots.append(to_clock(t))
+            t += step
+        return slots
+
+    def load(self, bookings: Iterable[Dict[str, Any]]) -> int:
+        """Index existing bookings; overlapping legacy records are skipped."""
+        loaded = 0
+        for booking in bookings:
+            clinic = booking.get("clinic_title")
+            date = booking.get("appointment_date")
+            time = booking.get("appointment_time")
+            if not (clinic and date and time):
+                continue
+            try:
+                self.reserve(clinic, date, time, booking.get("duration_minutes"))
+                loaded += 1
+            except (SlotConflictError, ValueError):
+                pass
+        return loaded
+
+    def __len__(self):
+        return sum(len(day.starts) for day in self._days.values())
+
+
+_index: Optional[AvailabilityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_availability(store=None) -> AvailabilityIndex:
+    """Shared index, built once from the booking store."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                store = store or get_booking_store()
+                index = AvailabilityIndex()
+                index.load(store.iter_all())
+                _index = index
+    return _index
+
+
+def book_appointment(booking: Dict[str, Any], store=None) -> int:
+    """Reserve the booking's slot and save it; returns the booking id.
+
+    Raises SlotConflictError if the clinic is already booked at that time.
+    The in-memory index rejects known clashes without touching the database;
+    the store then re-checks inside its write transaction, which also sees
+    bookings made by other processes.
+    """
+    store = store or get_booking_store()
+    index = get_availability(store)
+    clinic = booking.get("clinic_title")
+    date = booking.get("appointment_date")
+    time = booking.get("appointment_time")
+    if not (clinic and date and time):
+        return store.add(booking)
+    start, end = index._interval(time, booking.get("duration_minutes"))
+
+    def clashes(existing: Dict[str, Any]) -> bool:
+        try:
+            other = index._interval(
+                existing.get("appointment_time"), existing.get("duration_minutes")
+            )
+        except (TypeError, ValueError):
+            return False
+        return other[0] < end and start < other[1]
+
+    with index.lock:
+        index.reserve(clinic, date, time, booking.get("duration_minutes"))
+        try:
+            booking_id, existing = store.add_unless(booking, clashes)
+        except Exception:
+            index.release(clinic, date, time)
+            raise
+        if existing is None:
+            return booking_id
+        # Booked by another process since the index was built.
+        index.release(clinic, date, time)
+        index.load([existing])
+        clash = index._interval(
+            existing["appointment_time"], existing.get("duration_minutes")
+        )
+        raise conflict_error(clinic, date, clash)
@@ -0,0 +1,88 @@
+# utils/batch.py
+"""Helpers shared by the headless batch commands (agents/*_batch.py).
+
+Input rows are streamed from CSV or JSONL, results are appended to JSONL
+one record at a time, and a rerun skips rows whose record already
+succeeded.
+"""
+import csv
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+
+def iter_rows(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(key, row)`` one row at a time; the file is never fully loaded.
+
+    Column names are lower-cased; rows without an ``id`` are keyed by
+    position.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for position, row in enumerate(rows, start=1):
+            row = {str(k).strip().lower(): v for k, v in row.items()}
+            key = str(row.get("id") or position)
+            yield key, row
+
+
+def pick(row: Dict[str, Any], columns: Sequence[str]) -> str:
+    """First non-empty value among ``columns``, as a stripped string."""
+    for column in columns:
+        value = row.get(column)
+        if value not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+def completed_keys(out_path: str) -> Set[str]:
+    """Keys of rows that already succeeded in ``out_path``.
+
+    A torn last line (the process died mid-write) is ignored and that row
+    runs again.
+    """
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in record:
+                done.add(str(record.get("id")))
+    return done
+
+
+def terminate_last_line(path: str):
+    # After a crash mid-write, start new records on a fresh line.
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+class RateLimiter:
+    """Spaces calls to ``wait`` to at most ``per_second`` across all threads."""
+
+    def __init__(self, per_second: Optional[float]):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
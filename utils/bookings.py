@@ -0,0 +1,252 @@
+# utils/bookings.py
+"""Appointment bookings in SQLite.
+
+Replaces the old ``bookings.json`` file, which was read and rewritten in
+full on every booking and could lose writes when two sessions booked at
+once. Each booking is now a single INSERT; WAL and busy_timeout serialise
+concurrent writers.
+
+CLI:    python -m utils.bookings --json bookings.json
+Python: get_booking_store().add({...})
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.chatbot.storage import ConnectionPool
+
+BOOKINGS_DB = os.getenv("WELLNESS_BOOKINGS_DB", "bookings.db")
+LEGACY_JSON = "bookings.json"
+
+FIELDS = (
+    "timestamp",
+    "patient_name",
+    "phone",
+    "city",
+    "specialist",
+    "probable_condition",
+    "clinic_title",
+    "clinic_link",
+    "appointment_date",
+    "appointment_time",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT,
+    patient_name TEXT,
+    phone TEXT,
+    city TEXT,
+    specialist TEXT,
+    probable_condition TEXT,
+    clinic_title TEXT,
+    clinic_link TEXT,
+    appointment_date TEXT,
+    appointment_time TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bookings_phone ON bookings(phone);
+CREATE INDEX IF NOT EXISTS idx_bookings_city ON bookings(city);
+CREATE INDEX IF NOT EXISTS idx_bookings_specialist ON bookings(specialist);
+CREATE INDEX IF NOT EXISTS idx_bookings_date
+    ON bookings(appointment_date, appointment_time);
+CREATE INDEX IF NOT EXISTS idx_bookings_clinic_day
+    ON bookings(clinic_title, appointment_date);
+CREATE TABLE IF NOT EXISTS booking_migrations (
+    source TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    applied_at REAL NOT NULL
+);
+"""
+
+# Columns find() may filter on; each one is indexed.
+FILTERS = {
+    "phone": "phone",
+    "city": "city",
+    "specialist": "specialist",
+    "date": "appointment_date",
+}
+
+
+class BookingStore:
+    def __init__(self, path: str = BOOKINGS_DB):
+        self.pool = ConnectionPool(path)
+        conn = self.pool.connection()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _row(self, booking: Dict[str, Any]):
+        extra = {k: v for k, v in booking.items() if k not in FIELDS}
+        values = [booking.get(field) for field in FIELDS]
+        return (*values, json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    def add(self, booking: Dict[str, Any]) -> int:
+        """Insert one booking and return its id."""
+        conn = self.pool.connection()
+        with conn:
+            cur = conn.execute(
+                f"INSERT INTO bookings ({', '.join(FIELDS)}, extra) "
+                f"VALUES ({', '.join('?' * (len(FIELDS) + 1))})",
+                self._row(booking),
+            )
+        return cur.lastrowid
+
+    def add_unless(
+        self, booking: Dict[str, Any], clashes: Callable[[Dict[str, Any]], bool]
+    ) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """Insert ``booking`` unless it clashes with a booking of the same
+        clinic on the same day.
+
+        Returns ``(id, None)``, or ``(None, existing)`` for the first
+        existing booking that ``clashes`` accepts. The check and the insert
+        run in one BEGIN IMMEDIATE transaction, so two processes cannot both
+        see the slot as free.
+        """
+        conn = self.pool.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for existing in self._select(
+                "WHERE clinic_title = ? AND appointment_date = ?",
+                (booking.get("clinic_title"), booking.get("appointment_date")),
+            ):
+                if clashes(existing):
+                    conn.rollback()
+                    return None, existing
+            cur = conn.execute(
+                f"INSERT INTO bookings ({', '.join(FIELDS)}, extra) "
+                f"VALUES ({', '.join('?' * (len(FIELDS) + 1))})",
+                self._row(booking),
+            )
+            conn.commit()
+        except BaseException:
+            # Also when ``clashes`` raises: never leave the write lock held.
+            conn.rollback()
+            raise
+        return cur.lastrowid, None
+
+    def get(self, booking_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._select("WHERE id = ?", (booking_id,))
+        return rows[0] if rows else None
+
+    def find(
+        self,
+        phone: Optional[str] = None,
+        city: Optional[str] = None,
+        specialist: Optional[str] = None,
+        date: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Bookings matching every given filter, by appointment date."""
+        given = {"phone": phone, "city": city, "specialist": specialist, "date": date}
+        clauses = [f"{FILTERS[k]} = ?" for k, v in given.items() if v is not None]
+        params = [v for v in given.values() if v is not None]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._select(
+            f"{where} ORDER BY appointment_date, appointment_time, id LIMIT ?",
+            (*params, limit),
+        )
+
+    def count(self) -> int:
+        conn = self.pool.connection()
+        return conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    def iter_all(self, batch: int = 5000) -> Iterator[Dict[str, Any]]:
+        """Every booking in id order, fetched ``batch`` rows at a time."""
+        last = 0
+        while True:
+            rows = self._select("WHERE id > ? ORDER BY id LIMIT ?", (last, batch))
+            yield from rows
+            if len(rows) < batch:
+                return
+            last = rows[-1]["id"]
+
+    def _select(self, tail: str, params) -> List[Dict[str, Any]]:
+        rows = self.pool.connection().execute(
+            f"SELECT id, {', '.join(FIELDS)}, extra FROM bookings {tail}", params
+        ).fetchall()
+        bookings = []
+        for row in rows:
+            booking = {"id": row[0], **dict(zip(FIELDS, row[1:-1]))}
+            if row[-1]:
+                booking.update(json.loads(row[-1]))
+            bookings.append(booking)
+        return bookings
+
+    def migrate_json(self, path: str = LEGACY_JSON) -> int:
+        """Import a legacy ``bookings.json`` once; returns rows imported.
+
+        The import is recorded by absolute path, so calling this again (or
+        from several processes at once) never duplicates bookings.
+        """
+        if not os.path.exists(path):
+            return 0
+        source = os.path.abspath(path)
+        conn = self.pool.connection()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            data = []
+        rows = [self._row(b) for b in data if isinstance(b, dict)]
+        # BEGIN IMMEDIATE takes the write lock before the check, so two
+        # processes cannot both decide the file still needs importing.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute(
+                "SELECT 1 FROM booking_migrations WHERE source = ?", (source,)
+            ).fetchone()
+            if done:
+                conn.rollback()
+                return 0
+            conn.executemany(
+                f"INSERT INTO bookings ({', '.join(FIELDS)}, extra) "
+                f"VALUES ({', '.join('?' * (len(FIELDS) + 1))})",
+                rows,
+            )
+            conn.execute(
+                "INSERT INTO booking_migrations (source, rows, applied_at) "
+                "VALUES (?, ?, ?)",
+                (source, len(rows), time.time()),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        return len(rows)
+
+
+_store: Optional[BookingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_booking_store() -> BookingStore:
+    """Shared store; imports the legacy ``bookings.json`` on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = BookingStore()
+                store.migrate_json(LEGACY_JSON)
+                _store = store
+    return _store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Import a legacy bookings.json into the bookings database."
+    )
+    parser.add_argument("--db", default=BOOKINGS_DB)
+    parser.add_argument("--json", default=LEGACY_JSON)
+    args = parser.parse_args(argv)
+    store = BookingStore(args.db)
+    imported = store.migrate_json(args.json)
+    print(f"imported {imported} booking(s); {store.count()} in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
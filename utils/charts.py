@@ -0,0 +1,167 @@
+# utils/charts.py
+"""Macro pie charts, cached and rendered without pyplot.
+
+Two renderers share one input (``{"Protein": 120, "Carbs": 180, ...}``):
+
+* ``render_macros_svg`` builds the pie as an SVG string with plain
+  trigonometry; it never imports matplotlib and is the default for the UI.
+* ``render_macros_png`` draws with matplotlib on a bare Agg ``Figure``,
+  which is never registered with pyplot's global figure manager and is
+  cleared as soon as the PNG bytes are written, so nothing accumulates in
+  a long-running worker.
+
+Values are rounded to whole grams before rendering and both renderers are
+wrapped in a bounded LRU cache keyed by the rounded values, so repeated
+splits cost a dictionary lookup.
+"""
+import html
+import io
+import math
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# "svg" (no matplotlib) or "png".
+CHART_RENDERER = os.getenv("WELLNESS_CHART_RENDERER", "svg")
+CHART_CACHE_SIZE = int(os.getenv("WELLNESS_CHART_CACHE_SIZE", "256"))
+
+# matplotlib's default cycle, so both renderers look alike.
+COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b")
+START_ANGLE = 90
+
+Slices = Tuple[Tuple[str, int], ...]
+
+
+def _slices(macros: Dict[str, float]) -> Slices:
+    # The cache key: labels with whole-gram, non-negative values.
+    return tuple(
+        (str(label), max(0, round(float(value or 0))))
+        for label, value in macros.items()
+    )
+
+
+# ---- SVG ----
+def render_macros_svg(macros: Dict[str, float], title: Optional[str] = None) -> str:
+    return _svg(_slices(macros), title)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _svg(slices: Slices, title: Optional[str], size: int = 320) -> str:
+    cx = cy = size / 2
+    r = size * 0.34
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {size} {size}" font-family="sans-serif" font-size="12">'
+    ]
+    if title:
+        parts.append(
+            f'<text x="{cx}" y="16" text-anchor="middle" font-size="14">'
+            f"{html.escape(title)}</text>"
+        )
+
+    def point(angle: float, radius: float) -> Tuple[float, float]:
+        # Counter-clockwise from START_ANGLE, like matplotlib; SVG's y
+        # axis points down.
+        rad = math.radians(angle)
+        return cx + radius * math.cos(rad), cy - radius * math.sin(rad)
+
+    total = sum(value for _, value in slices)
+    if total <= 0:
+        parts.append(
+            f'<text x="{cx}" y="{cy}" text-anchor="middle">No macro data</text></svg>'
+        )
+        return "".join(parts)
+
+    angle = START_ANGLE
+    for i, (label, value) in enumerate(slices):
+        if value <= 0:
+            continue
+        color = COLORS[i % len(COLORS)]
+        span = 360.0 * value / total
+        if span >= 360.0:
+            parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r:.1f}" fill="{color}"/>')
+        else:
+            x0, y0 = point(angle, r)
+            x1, y1 = point(angle + span, r)
+            large = 1 if span > 180 else 0
+            parts.append(
+                f'<path d="M{cx:.1f},{cy:.1f} L{x0:.1f},{y0:.1f} '
+                f'A{r:.1f},{r:.1f} 0 {large} 0 {x1:.1f},{y1:.1f} Z" '
+                f'fill="{color}"/>'
+            )
+        middle = angle + span / 2
+        px, py = point(middle, r * 0.6)
+        lx, ly = point(middle, r * 1.1)
+        anchor = "start" if math.cos(math.radians(middle)) >= 0 else "end"
+        parts.append(
+            f'<text x="{px:.1f}" y="{py:.1f}" text-anchor="middle" '
+            f'dominant-baseline="middle">{100.0 * value / total:.1f}%</text>'
+            f'<text x="{lx:.1f}" y="{ly:.1f}" text-anchor="{anchor}" '
+            f'dominant-baseline="middle">{html.escape(label)}</text>'
+        )
+        angle += span
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+# ---- PNG (matplotlib) ----
+def macros_figure(macros: Dict[str, float], title: Optional[str] = None):
+    """A pie on a bare Agg Figure; callers own it and should ``clear()`` it."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(4, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    labels = list(macros.keys())
+    values = list(macros.values())
+    if sum(values) > 0:
+        ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=START_ANGLE)
+        ax.axis("equal")
+    else:
+        ax.text(0.5, 0.5, "No macro data", ha="center", va="center")
+        ax.axis("off")
+    if title:
+        ax.set_title(title)
+    return fig
+
+
+def render_macros_png(
+    macros: Dict[str, float], title: Optional[str] = None, dpi: int = 100
+) -> bytes:
+    return _png(_slices(macros), title, dpi)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _png(slices: Slices, title: Optional[str], dpi: int) -> bytes:
+    fig = macros_figure(dict(slices), title)
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=dpi)
+        return buffer.getvalue()
+    finally:
+        # Drop the axes and artists now instead of waiting for the cycle
+        # collector to find the figure.
+        fig.clear()
+
+
+def save_macros_chart(
+    macros: Dict[str, float], path: str, title: Optional[str] = None, dpi: int = 100
+) -> str:
+    """Render the pie chart for ``macros`` to a PNG at ``path``."""
+    with open(path, "wb") as f:
+        f.write(render_macros_png(macros, title, dpi))
+    return path
+
+
+def chart_cache_info() -> Dict[str, Tuple[int, int, int]]:
+    """``(hits, misses, size)`` per renderer."""
+    return {
+        name: (info.hits, info.misses, info.currsize)
+        for name, info in (("svg", _svg.cache_info()), ("png", _png.cache_info()))
+    }
+
+
+def clear_chart_cache():
+    _svg.cache_clear()
+    _png.cache_clear()
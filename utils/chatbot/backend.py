@@ -1,23 +1,37 @@
 import os
 import uuid
-import sqlite3
+from contextlib import asynccontextmanager
 from typing import TypedDict, Annotated
 from datetime import datetime
 from dotenv import load_dotenv
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.sqlite import SqliteSaver
 
 from langchain_core.messages import (
     BaseMessage,
     HumanMessage,
     AIMessage,
+    AIMessageChunk,
     SystemMessage as LCSystemMessage,
 )
 
 # from langchain_groq import ChatGroq
-from langchain_google_genai import ChatGoogleGenerativeAI
+from llms.cache import response_text
+from llms.provider import get_llm
+from utils.chatbot.context import (
+    ContextBudget,
+    fold_into_summary,
+    split_for_budget,
+)
+from utils.chatbot.storage import (
+    DB_PATH,
+    ConnectionPool,
+    PooledSqliteSaver,
+    async_checkpointer,
+)
+from utils.chatbot.history import MessageStore
+from utils.chatbot.threads import ThreadCatalog, default_thread_name
 
 
 # ========================
@@ -28,12 +42,15 @@ def generate_thread_id():
 
 
 def update_chat_name_from_first_message(session_state, thread_id, user_message):
-    # Update chat name if it currently is the default or empty
+    # Update chat name if it currently is the default or empty; returns the
+    # new name (None if unchanged) so the caller can persist it.
     current_name = session_state.get("chat_thread_names", {}).get(thread_id, "")
     if current_name.startswith("Chat "):  # Means default name assigned
         snippet = user_message.replace("\n", " ")[:30].strip()
         if snippet:
             session_state["chat_thread_names"][thread_id] = snippet
+            return snippet
+    return None
 
 
 # ========================
@@ -45,11 +62,19 @@ load_dotenv()
 # ---- Chat state definition ----
 class ChatState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
+    # Rolling summary of messages[:summarized_count], folded in as the
+    # thread outgrows the context budget.
+    summary: str
+    summarized_count: int
+
+
+# ---- Context window ----
+context_budget = ContextBudget.from_env()
 
 
 # ---- Initialize LLM ----
 # llm = ChatGroq(model="llama-3.1-8b-instant", temperature=0.7, max_retries=2)
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-pro")
+# The shared client comes from llms.provider (configured via WELLNESS_LLM_*).
 
 
 # ---- Chat node ----
@@ -63,11 +88,22 @@ def chat_node(state: ChatState):
     )
     history: list[BaseMessage] = state["messages"]
 
-    # Prepend system prompt if not already present
-    if not history or not isinstance(history[0], LCSystemMessage):
-        formatted = [LCSystemMessage(content=system_prompt)] + history
-    else:
-        formatted = history
+    # Keep recent turns within the token budget; older turns are folded
+    # into the rolling summary so each turn's prompt stays bounded.
+    summary = state.get("summary", "")
+    summarized_count = state.get("summarized_count", 0)
+    to_fold, recent = split_for_budget(
+        history[summarized_count:], summary, context_budget
+    )
+    if to_fold:
+        summary = fold_into_summary(get_llm(), summary, to_fold)
+        summarized_count += len(to_fold)
+
+    if summary:
+        system_prompt += f"\n\nSummary of the earlier conversation:\n{summary}"
+    formatted = [LCSystemMessage(content=system_prompt)] + [
+        m for m in recent if not isinstance(m, LCSystemMessage)
+    ]
 
     # Convert BaseMessage objects to dict format for Groq LLM
     messages_for_groq = []
@@ -82,15 +118,39 @@ def chat_node(state: ChatState):
             role = "user"
         messages_for_groq.append({"role": role, "content": msg.content})
 
-    reply = llm.invoke(messages_for_groq)
+    # Stream the reply so LangGraph's "messages" stream mode can forward
+    # tokens as they arrive; the joined text is still returned (and
+    # checkpointed) as a single AIMessage.
+    parts = []
+    reply_id = None
+    for chunk in get_llm().stream(messages_for_groq):
+        parts.append(response_text(chunk))
+        reply_id = reply_id or getattr(chunk, "id", None)
+    reply_text = "".join(parts)
 
-    reply_text = reply.content if hasattr(reply, "content") else str(reply)
-    return {"messages": history + [AIMessage(content=reply_text)]}
+    reply = AIMessage(content=reply_text, id=reply_id or str(uuid.uuid4()))
+
+    # Emit only the new message: add_messages appends it to the stored
+    # history, so checkpoint writes no longer re-serialise the whole thread.
+    # Every message has a unique id (the provider's, else a fresh uuid), so
+    # add_messages appends each exactly once. The ids are not derived from
+    # the turn: sending the same input again is a new turn, not a replay.
+    return {
+        "messages": [reply],
+        "summary": summary,
+        "summarized_count": summarized_count,
+    }
 
 
 # ---- Build LangGraph ----
-conn = sqlite3.connect(database="chatbot.db", check_same_thread=False)
-checkpointer = SqliteSaver(conn=conn)
+# One WAL-mode connection per thread instead of a single shared handle
+pool = ConnectionPool(DB_PATH)
+checkpointer = PooledSqliteSaver(pool)
+
+# Thread metadata and the flat message log live in the same file.
+thread_catalog = ThreadCatalog(pool)
+message_store = MessageStore(pool)
+thread_catalog.backfill(checkpointer)
 
 graph = StateGraph(ChatState)
 graph.add_node("chat_node", chat_node)
@@ -99,14 +159,98 @@ graph.add_edge("chat_node", END)
 chatbot = graph.compile(checkpointer=checkpointer)
 
 
+@asynccontextmanager
+async def open_async_chatbot(path: str = DB_PATH):
+    """The chat graph on an AsyncSqliteSaver, for async callers.
+
+    Usage: ``async with open_async_chatbot() as bot: await bot.ainvoke(...)``
+    """
+    async with async_checkpointer(path) as saver:
+        yield graph.compile(checkpointer=saver)
+
+
+# ---- Streaming ----
+def stream_reply(user_input: str, config: dict):
+    """Run one chat turn and yield the assistant reply token by token.
+
+    The graph checkpoints the completed AIMessage as usual once the stream
+    is exhausted; only then are the thread catalogue and the message log
+    updated, so they never hold a turn the checkpoint does not.
+    """
+    state = None
+    for mode, event in chatbot.stream(
+        {"messages": [HumanMessage(content=user_input, id=str(uuid.uuid4()))]},
+        config=config,
+        stream_mode=["messages", "values"],
+    ):
+        if mode == "values":
+            state = event
+            continue
+        chunk, metadata = event
+        if metadata.get("langgraph_node") != "chat_node":
+            continue
+        if "chat_summary" in (metadata.get("tags") or []):
+            continue
+        # Only token chunks; the final AIMessage shares their id and is skipped
+        if isinstance(chunk, AIMessageChunk):
+            text = response_text(chunk)
+            if text:
+                yield text
+
+    thread_id = config.get("configurable", {}).get("thread_id")
+    if state is not None and thread_id is not None:
+        record_turn(thread_id, state["messages"])
+
+
+def record_turn(thread_id, messages):
+    """Bring the thread catalogue and message log up to a saved state."""
+    thread_catalog.touch(thread_id, len(messages), name=default_thread_name(messages))
+    message_store.append_new(thread_id, messages)
+
+
 # ---- Thread utilities ----
 def retrieve_all_threads():
-    all_threads = set()
-    for checkpoint in checkpointer.list(None):
-        all_threads.add(checkpoint.config["configurable"]["thread_id"])
-    return list(all_threads)
+    return [t["thread_id"] for t in thread_catalog.list(limit=-1)]
+
+
+def list_threads(limit: int = 20, offset: int = 0):
+    """Most recently active threads first, from the thread catalogue."""
+    return thread_catalog.list(limit=limit, offset=offset)
+
+
+def count_threads() -> int:
+    return thread_catalog.count()
+
+
+def save_thread_name(thread_id, name: str):
+    """Persist a display name; later turns keep it."""
+    thread_catalog.rename(thread_id, name)
 
 
 def load_conversation(thread_id):
     state = chatbot.get_state(config={"configurable": {"thread_id": thread_id}})
     return state.values.get("messages", [])
+
+
+def load_conversation_page(thread_id, limit: int = 30, before=None):
+    """Most recent ``limit`` messages of a thread, as role/content dicts.
+
+    Returns ``(messages, cursor)``; pass ``cursor`` as ``before`` to load the
+    previous page (None when the start of the thread has been reached).
+    Threads that predate the message log are imported from their checkpoint
+    the first time they are opened.
+    """
+    if before is None and not message_store.has_thread(thread_id):
+        message_store.append_new(thread_id, load_conversation(thread_id))
+    return message_store.page(thread_id, limit=limit, before=before)
+
+
+def search_messages(query: str, limit: int = 20, before=None, since=None, until=None):
+    """Full-text search over every thread's messages, best matches first.
+
+    Returns ``(hits, cursor)``; see ``MessageStore.search_page``. Pass
+    ``cursor`` as ``before`` to search matches older than the ranked window.
+    """
+    return message_store.search_page(
+        query, limit=limit, before=before, since=since, until=until
+    )
@@ -0,0 +1,201 @@
+# utils/chatbot/compaction.py
+"""Checkpoint retention and compaction for chatbot.db.
+
+SqliteSaver keeps every intermediate checkpoint of every thread. This job
+keeps only the newest ``keep_last`` checkpoints per thread, drops threads
+idle for longer than the retention window, and returns the freed pages to
+the filesystem.
+
+CLI:    python -m utils.chatbot.compaction --keep 3 --retention-days 180
+Python: compact("chatbot.db", keep_last=3, retention_days=180)
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from utils.chatbot.storage import DB_PATH, connect
+
+# Tables holding per-thread rows, removed together when a thread expires.
+THREAD_TABLES = ("writes", "checkpoints", "thread_messages", "thread_meta")
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+            (name,),
+        ).fetchone()
+        is not None
+    )
+
+
+def file_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p)
+    )
+
+
+def time_thread_queries(conn: sqlite3.Connection, sample: int = 50) -> float:
+    """Average ms to read a thread's checkpoints, as ``list``/``get_state`` do."""
+    if not _table_exists(conn, "checkpoints"):
+        return 0.0
+    threads = [
+        row[0]
+        for row in conn.execute(
+            "SELECT DISTINCT thread_id FROM checkpoints LIMIT ?", (sample,)
+        )
+    ]
+    if not threads:
+        return 0.0
+    start = time.perf_counter()
+    for thread_id in threads:
+        conn.execute(
+            "SELECT checkpoint_id, checkpoint, metadata FROM checkpoints "
+            "WHERE thread_id = ? ORDER BY checkpoint_id DESC",
+            (thread_id,),
+        ).fetchall()
+    return (time.perf_counter() - start) * 1000 / len(threads)
+
+
+def expired_threads(conn: sqlite3.Connection, retention_days: float) -> List[str]:
+    if not _table_exists(conn, "thread_meta"):
+        return []
+    cutoff = time.time() - retention_days * 86400
+    return [
+        row[0]
+        for row in conn.execute(
+            "SELECT thread_id FROM thread_meta WHERE updated_at < ?", (cutoff,)
+        )
+    ]
+
+
+def drop_threads(conn: sqlite3.Connection, thread_ids: List[str]) -> None:
+    params = [(t,) for t in thread_ids]
+    for table in THREAD_TABLES:
+        if _table_exists(conn, table):
+            conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", params)
+
+
+def prune_checkpoints(conn: sqlite3.Connection, keep_last: int) -> int:
+    """Delete all but the newest ``keep_last`` checkpoints of each thread."""
+    cur = conn.execute(
+        """
+        DELETE FROM checkpoints WHERE rowid IN (
+            SELECT rowid FROM (
+                SELECT rowid, ROW_NUMBER() OVER (
+                    PARTITION BY thread_id, checkpoint_ns
+                    ORDER BY checkpoint_id DESC
+                ) AS rn
+                FROM checkpoints
+            ) WHERE rn > ?
+        )
+        """,
+        (keep_last,),
+    )
+    # Pending writes only matter for checkpoints that still exist.
+    conn.execute(
+        """
+        DELETE FROM writes WHERE NOT EXISTS (
+            SELECT 1 FROM checkpoints c
+            WHERE c.thread_id = writes.thread_id
+              AND c.checkpoint_ns = writes.checkpoint_ns
+              AND c.checkpoint_id = writes.checkpoint_id
+        )
+        """
+    )
+    return cur.rowcount
+
+
+def vacuum(conn: sqlite3.Connection, max_pages: Optional[int] = None) -> str:
+    """Return free pages to the OS.
+
+    The first run on a database created without incremental auto-vacuum
+    switches it over with one full VACUUM; later runs free at most
+    ``max_pages`` pages per call (all of them if None).
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        mode = "full (switched to incremental)"
+    else:
+        # incremental_vacuum frees one page per VM step and a plain execute()
+        # only steps once; executescript runs it to completion.
+        pages = "" if max_pages is None else f"({int(max_pages)})"
+        conn.executescript(f"PRAGMA incremental_vacuum{pages};")
+        mode = "incremental"
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return mode
+
+
+def compact(
+    path: str = DB_PATH,
+    keep_last: int = 3,
+    retention_days: Optional[float] = None,
+    vacuum_pages: Optional[int] = None,
+) -> Dict:
+    """Prune checkpoints, expire idle threads and vacuum; returns a report."""
+    if keep_last < 1:
+        raise ValueError("keep_last must be at least 1 (the thread's current state)")
+    conn = connect(path)
+    try:
+        bytes_before = file_bytes(path)
+        query_ms_before = time_thread_queries(conn)
+
+        dropped = []
+        pruned = 0
+        with conn:
+            if retention_days is not None:
+                dropped = expired_threads(conn, retention_days)
+                drop_threads(conn, dropped)
+            if _table_exists(conn, "checkpoints"):
+                pruned = prune_checkpoints(conn, keep_last)
+
+        vacuum_mode = vacuum(conn, vacuum_pages)
+        bytes_after = file_bytes(path)
+        query_ms_after = time_thread_queries(conn)
+    finally:
+        conn.close()
+
+    return {
+        "db": path,
+        "threads_dropped": len(dropped),
+        "checkpoints_pruned": pruned,
+        "vacuum": vacuum_mode,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_reclaimed": bytes_before - bytes_after,
+        "thread_query_ms_before": round(query_ms_before, 3),
+        "thread_query_ms_after": round(query_ms_after, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prune old checkpoints and expired threads from chatbot.db."
+    )
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument(
+        "--keep", type=int, default=3, help="checkpoints to keep per thread"
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=float,
+        default=None,
+        help="drop threads with no activity for this many days",
+    )
+    parser.add_argument(
+        "--vacuum-pages",
+        type=int,
+        default=None,
+        help="max pages to free per run (default: all)",
+    )
+    args = parser.parse_args(argv)
+    report = compact(args.db, args.keep, args.retention_days, args.vacuum_pages)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
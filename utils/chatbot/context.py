@@ -0,0 +1,107 @@
+# utils/chatbot/context.py
+import os
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from llms.cache import response_text
+
+# Rough per-message overhead for role markers and separators.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@dataclass(frozen=True)
+class ContextBudget:
+    # Tokens available for the rolling summary plus recent turns.
+    max_tokens: int = 3000
+    # When the budget is exceeded, older turns are folded until the recent
+    # window fits in this fraction of it, so summaries happen in batches
+    # rather than on every turn.
+    low_watermark: float = 0.6
+
+    @classmethod
+    def from_env(cls) -> "ContextBudget":
+        return cls(
+            max_tokens=int(os.getenv("WELLNESS_CHAT_CONTEXT_TOKENS", cls.max_tokens)),
+            low_watermark=float(
+                os.getenv("WELLNESS_CHAT_CONTEXT_WATERMARK", cls.low_watermark)
+            ),
+        )
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: BaseMessage) -> int:
+    return estimate_tokens(response_text(message)) + MESSAGE_OVERHEAD_TOKENS
+
+
+def split_for_budget(
+    messages: Sequence[BaseMessage], summary: str, budget: ContextBudget
+) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """Split unsummarised messages into ``(to_fold, recent)``.
+
+    ``recent`` is the newest suffix that fits the budget next to the current
+    summary; it always keeps at least the latest message. Nothing is folded
+    while everything fits.
+    """
+    messages = list(messages)
+    sizes = [message_tokens(m) for m in messages]
+    summary_tokens = estimate_tokens(summary) if summary else 0
+    if summary_tokens + sum(sizes) <= budget.max_tokens:
+        return [], messages
+
+    target = int(budget.max_tokens * budget.low_watermark) - summary_tokens
+    kept = 0
+    cut = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        if cut < len(messages) and kept + sizes[i] > target:
+            break
+        kept += sizes[i]
+        cut = i
+    return messages[:cut], messages[cut:]
+
+
+def format_transcript(messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    for m in messages:
+        if isinstance(m, HumanMessage):
+            speaker = "User"
+        elif isinstance(m, AIMessage):
+            speaker = "Companion"
+        else:
+            continue
+        lines.append(f"{speaker}: {response_text(m)}")
+    return "\n".join(lines)
+
+
+def build_summary_prompt(summary: str, messages: Sequence[BaseMessage]) -> str:
+    return f"""You maintain a running summary of a mental wellness conversation.
+Update the summary with the new lines below. Keep the user's feelings,
+circumstances, goals, coping strategies already suggested, and any safety
+concerns. Write at most 150 words in third person. Return only the summary.
+
+Current summary:
+{summary or "(none yet)"}
+
+New lines:
+{format_transcript(messages)}
+"""
+
+
+# Tagged so LangGraph's "messages" stream mode does not forward summary
+# tokens to the user alongside the reply.
+SUMMARY_TAGS = ["nostream", "chat_summary"]
+
+
+def fold_into_summary(llm, summary: str, messages: Sequence[BaseMessage]) -> str:
+    """Incrementally extend ``summary`` with ``messages`` using one LLM call."""
+    if not messages:
+        return summary
+    reply = llm.invoke(
+        build_summary_prompt(summary, messages), config={"tags": SUMMARY_TAGS}
+    )
+    return response_text(reply).strip()
@@ -144,19 +144,18 @@
 
 import streamlit as st
 from datetime import datetime
-from langchain_core.messages import (
-    HumanMessage,
-    AIMessage,
-    SystemMessage as LCSystemMessage,
-)
 
 from utils.chatbot.backend import (
-    chatbot,
     generate_thread_id,
-    retrieve_all_threads,
-    load_conversation,
+    list_threads,
+    count_threads,
+    load_conversation_page,
+    save_thread_name,
+    search_messages,
+    stream_reply,
     update_chat_name_from_first_message,
 )
+from utils.chatbot.history import SEARCH_WINDOW
 
 # Import the new breathing exercise tool
 from utils.chatbot.tools.breathing_exercises import (
@@ -166,6 +165,14 @@ from utils.chatbot.tools.spotify_recommender import spotify_music_tool
 from utils.chatbot.tools.daily_checkin import daily_checkin_tool
 
 
+# Sidebar page size for the thread list
+THREADS_PER_PAGE = 20
+# Messages loaded per page when opening a conversation
+HISTORY_PAGE_SIZE = 30
+# Message hits shown for a sidebar search
+SEARCH_RESULTS = 10
+
+
 # ========================
 # Frontend utilities
 # ========================
@@ -179,6 +186,7 @@ def reset_chat():
     st.session_state["thread_id"] = thread_id
     add_thread(thread_id)
     st.session_state["message_history"] = []
+    st.session_state["history_cursor"] = None
 
     if "chat_histories" not in st.session_state:
         st.session_state["chat_histories"] = {}
@@ -186,9 +194,19 @@ def reset_chat():
 
     if "chat_thread_names" not in st.session_state:
         st.session_state["chat_thread_names"] = {}
-    count = len(st.session_state["chat_threads"])
+    count = count_threads() + len(st.session_state["chat_threads"])
     now_str = datetime.now().strftime("%b %d, %Y %H:%M")
     st.session_state["chat_thread_names"][thread_id] = f"Chat {count + 1} - {now_str}"
+    st.session_state["thread_page"] = 0
+
+
+def open_thread(thread_id):
+    st.session_state["thread_id"] = thread_id
+    # Only the newest page is loaded; older ones on request
+    messages, cursor = load_conversation_page(thread_id, HISTORY_PAGE_SIZE)
+    st.session_state["message_history"] = messages
+    st.session_state["history_cursor"] = cursor
+    st.rerun()
 
 
 # =================
@@ -202,8 +220,11 @@ def run_emotion_chat():
         st.session_state["message_history"] = []
     if "thread_id" not in st.session_state:
         st.session_state["thread_id"] = generate_thread_id()
+    # Threads started in this session; saved threads come from the catalogue
     if "chat_threads" not in st.session_state:
-        st.session_state["chat_threads"] = retrieve_all_threads()
+        st.session_state["chat_threads"] = []
+    if "thread_page" not in st.session_state:
+        st.session_state["thread_page"] = 0
     if "chat_thread_names" not in st.session_state:
         st.session_state["chat_thread_names"] = {}
 
@@ -214,7 +235,7 @@ def run_emotion_chat():
     add_thread(st.session_state["thread_id"])
 
     if st.session_state["thread_id"] not in st.session_state["chat_thread_names"]:
-        count = len(st.session_state["chat_threads"])
+        count = count_threads() + len(st.session_state["chat_threads"])
         now_str = datetime.now().strftime("%b %d, %Y %H:%M")
         st.session_state["chat_thread_names"][
             st.session_state["thread_id"]
@@ -240,29 +261,81 @@ def run_emotion_chat():
         
     #     st.sidebar.markdown("---")  # Separator
 
+    # ---- Search across all conversations ----
+    query = st.sidebar.text_input("Search conversations", key="chat_search")
+    if st.session_state.get("chat_search_for") != query:
+        # A new query starts again from the newest matches
+        st.session_state["chat_search_for"] = query
+        st.session_state["chat_search_before"] = []
+    if query.strip():
+        windows = st.session_state["chat_search_before"]
+        hits, older = search_messages(
+            query, limit=SEARCH_RESULTS, before=windows[-1] if windows else None
+        )
+        if not hits:
+            st.sidebar.caption("No matching messages.")
+        for hit in hits:
+            label = f"{'🧑' if hit['role'] == 'user' else '🤖'} {hit['snippet']}"
+            if st.sidebar.button(label, key=f"hit-{hit['thread_id']}-{hit['seq']}"):
+                open_thread(hit["thread_id"])
+        if older is not None or windows:
+            st.sidebar.caption(
+                f"Very common searches rank only {SEARCH_WINDOW:,} matching "
+                "messages at a time, newest first. Add words to narrow the "
+                "search, or step through older matches."
+            )
+            newer_col, older_col = st.sidebar.columns(2)
+            if windows and newer_col.button("← Newer", key="search-newer"):
+                windows.pop()
+                st.rerun()
+            if older is not None and older_col.button("Older →", key="search-older"):
+                windows.append(older)
+                st.rerun()
+        st.sidebar.markdown("---")
+
     st.sidebar.header("My Conversations")
-    for thread_id in st.session_state["chat_threads"][::-1]:
-        name = st.session_state["chat_thread_names"].get(thread_id, str(thread_id))
+    page = st.session_state["thread_page"]
+    saved = list_threads(limit=THREADS_PER_PAGE, offset=page * THREADS_PER_PAGE)
+    saved_ids = {t["thread_id"] for t in saved}
+    entries = []
+    if page == 0:
+        # New chats appear before their first message is saved
+        for thread_id in st.session_state["chat_threads"][::-1]:
+            if str(thread_id) not in saved_ids:
+                entries.append((thread_id, None))
+    entries.extend((t["thread_id"], t["name"]) for t in saved)
+
+    for thread_id, saved_name in entries:
+        name = (
+            saved_name
+            or st.session_state["chat_thread_names"].get(thread_id)
+            or str(thread_id)
+        )
         if st.sidebar.button(name, key=f"thread-btn-{thread_id}"):
-            st.session_state["thread_id"] = thread_id
-            CONFIG = {"configurable": {"thread_id": thread_id}}
-            messages = load_conversation(thread_id)
-
-            temp_messages = []
-            for message in messages:
-                if isinstance(message, HumanMessage):
-                    role = "user"
-                elif isinstance(message, AIMessage):
-                    role = "assistant"
-                elif isinstance(message, LCSystemMessage):
-                    continue
-                else:
-                    role = "assistant"
-                temp_messages.append({"role": role, "content": message.content})
-
-            st.session_state["message_history"] = temp_messages
+            open_thread(thread_id)
+
+    newer_col, older_col = st.sidebar.columns(2)
+    if page > 0 and newer_col.button("← Newer", key="thread-page-newer"):
+        st.session_state["thread_page"] = page - 1
+        st.rerun()
+    if len(saved) == THREADS_PER_PAGE and older_col.button(
+        "Older →", key="thread-page-older"
+    ):
+        st.session_state["thread_page"] = page + 1
+        st.rerun()
 
     # ---- MAIN CHAT HISTORY ----
+    cursor = st.session_state.get("history_cursor")
+    if cursor is not None and st.button("Load earlier messages"):
+        older, cursor = load_conversation_page(
+            st.session_state["thread_id"], HISTORY_PAGE_SIZE, before=cursor
+        )
+        st.session_state["message_history"] = (
+            older + st.session_state["message_history"]
+        )
+        st.session_state["history_cursor"] = cursor
+        st.rerun()
+
     for m in st.session_state["message_history"]:
         with st.chat_message(m["role"]):
             st.markdown(m["content"])
@@ -272,7 +345,9 @@ def run_emotion_chat():
 
     if user_input:
         thread_id = st.session_state["thread_id"]
-        update_chat_name_from_first_message(st.session_state, thread_id, user_input)
+        new_name = update_chat_name_from_first_message(
+            st.session_state, thread_id, user_input
+        )
 
         st.session_state["message_history"].append(
             {"role": "user", "content": user_input}
@@ -280,26 +355,18 @@ def run_emotion_chat():
         with st.chat_message("user"):
             st.markdown(user_input)
 
-        result_state = chatbot.invoke(
-            {"messages": [HumanMessage(content=user_input)]}, config=CONFIG
-        )
-
-        ai_text = ""
-        msgs = result_state.get("messages", [])
-        if msgs and isinstance(msgs[-1], AIMessage):
-            ai_text = msgs[-1].content
-        else:
-            for msg in reversed(msgs):
-                if isinstance(msg, AIMessage):
-                    ai_text = msg.content
-                    break
-
+        # Render tokens as they stream in from the graph
         with st.chat_message("assistant"):
-            st.markdown(ai_text)
+            ai_text = st.write_stream(stream_reply(user_input, CONFIG))
+        if not isinstance(ai_text, str):
+            ai_text = "".join(str(part) for part in ai_text)
 
         st.session_state["message_history"].append(
             {"role": "assistant", "content": ai_text}
         )
+        # Saved once the turn is, so a failed turn leaves no catalogue row
+        if new_name:
+            save_thread_name(thread_id, new_name)
 
 
 if __name__ == "__main__":
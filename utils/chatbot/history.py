@@ -0,0 +1,281 @@
+# utils/chatbot/history.py
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROLES = {"human": "user", "ai": "assistant"}
+
+# Queries with up to SEARCH_RANK_ALL matches are ranked over every match.
+# Beyond that only the newest SEARCH_WINDOW matches are ranked, so a very
+# common word costs the same as a rare one no matter how large the history
+# grows; callers page to older windows with the returned cursor.
+SEARCH_RANK_ALL = 5000
+SEARCH_WINDOW = 1000
+SNIPPET_WORDS = 12
+
+# External-content FTS5 index over thread_messages, kept in sync by
+# triggers so every write from the chatbot is searchable immediately.
+# The prefix index serves the short, half-typed last word of a query.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS thread_messages_fts USING fts5(
+    content,
+    content='thread_messages',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS thread_messages_ai AFTER INSERT ON thread_messages BEGIN
+    INSERT INTO thread_messages_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS thread_messages_ad AFTER DELETE ON thread_messages BEGIN
+    INSERT INTO thread_messages_fts(thread_messages_fts, rowid, content)
+    VALUES ('delete', old.rowid, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS thread_messages_au AFTER UPDATE ON thread_messages BEGIN
+    INSERT INTO thread_messages_fts(thread_messages_fts, rowid, content)
+    VALUES ('delete', old.rowid, old.content);
+    INSERT INTO thread_messages_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+"""
+
+
+class MessageStore:
+    """Flat, append-only copy of each thread's chat messages.
+
+    Checkpoints hold the whole conversation in one blob, so reading any
+    part of it means deserialising all of it. This table keeps one row per
+    user/assistant message, keyed by its position in the thread, so the UI
+    can fetch the newest page first and older pages on demand.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        conn = pool.connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS thread_messages (
+                thread_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                message_id TEXT,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (thread_id, seq)
+            )
+            """
+        )
+        conn.commit()
+        self.searchable = self._setup_fts(conn)
+
+    @staticmethod
+    def _setup_fts(conn) -> bool:
+        """Create the FTS index; returns False if SQLite lacks FTS5."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'thread_messages_fts'"
+        ).fetchone()
+        try:
+            conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        if not exists:
+            # Index messages stored before search existed, once.
+            conn.execute(
+                "INSERT INTO thread_messages_fts(thread_messages_fts) VALUES ('rebuild')"
+            )
+            conn.commit()
+        return True
+
+    def next_seq(self, thread_id) -> int:
+        row = self.pool.connection().execute(
+            "SELECT MAX(seq) FROM thread_messages WHERE thread_id = ?",
+            (str(thread_id),),
+        ).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def append_new(self, thread_id, messages: Sequence) -> List[Tuple]:
+        """Store ``messages[next_seq:]``; positions in the thread are the seq.
+
+        Returns the inserted rows as ``(seq, message_id, role, content)``.
+        """
+        start = self.next_seq(thread_id)
+        now = time.time()
+        rows = []
+        for seq in range(start, len(messages)):
+            message = messages[seq]
+            role = ROLES.get(getattr(message, "type", None))
+            if role is None:
+                continue
+            rows.append((seq, getattr(message, "id", None), role, str(message.content)))
+        if rows:
+            conn = self.pool.connection()
+            conn.executemany(
+                "INSERT OR IGNORE INTO thread_messages "
+                "(thread_id, seq, message_id, role, content, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(str(thread_id), *row, now) for row in rows],
+            )
+            conn.commit()
+        return rows
+
+    def has_thread(self, thread_id) -> bool:
+        return (
+            self.pool.connection()
+            .execute(
+                "SELECT 1 FROM thread_messages WHERE thread_id = ? LIMIT 1",
+                (str(thread_id),),
+            )
+            .fetchone()
+            is not None
+        )
+
+    def page(
+        self, thread_id, limit: int = 30, before: Optional[int] = None
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """Newest ``limit`` messages older than seq ``before``.
+
+        Returns ``(messages, cursor)``: messages in chronological order and
+        the cursor to pass as ``before`` for the next older page (None when
+        there is nothing older). Cost depends on ``limit``, not thread length.
+        """
+        params = [str(thread_id)]
+        where = "thread_id = ?"
+        if before is not None:
+            where += " AND seq < ?"
+            params.append(before)
+        rows = self.pool.connection().execute(
+            f"SELECT seq, role, content FROM thread_messages WHERE {where} "
+            "ORDER BY seq DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        rows.reverse()
+        messages = [
+            {"seq": seq, "role": role, "content": content}
+            for seq, role, content in rows
+        ]
+        cursor = rows[0][0] if has_more and rows else None
+        return messages, cursor
+
+    def search(self, query: str, limit: int = 20, **filters) -> List[Dict]:
+        """The first page of ``search_page``, without its cursor."""
+        return self.search_page(query, limit, **filters)[0]
+
+    def search_page(
+        self,
+        query: str,
+        limit: int = 20,
+        before: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """Ranked (bm25) message hits for ``query`` across all threads.
+
+        Words are matched as terms (the last one as a prefix), so user input
+        never has to follow FTS5 query syntax. ``since``/``until`` bound
+        ``created_at`` (epoch seconds, ``until`` exclusive).
+
+        Returns ``(hits, cursor)``. When there are more than
+        ``SEARCH_RANK_ALL`` matches only the newest ``SEARCH_WINDOW`` are
+        ranked, and ``cursor`` is the value to pass as ``before`` to rank
+        the next older window; otherwise every match is ranked and
+        ``cursor`` is None.
+        """
+        match = to_fts_query(query)
+        if not match or not self.searchable:
+            return [], None
+        join, where, params = "", ["thread_messages_fts MATCH ?"], [match]
+        if before is not None:
+            where.append("thread_messages_fts.rowid < ?")
+            params.append(before)
+        if since is not None or until is not None:
+            join = "JOIN thread_messages t ON t.rowid = thread_messages_fts.rowid"
+            if since is not None:
+                where.append("t.created_at >= ?")
+                params.append(since)
+            if until is not None:
+                where.append("t.created_at < ?")
+                params.append(until)
+        matches = (
+            f"FROM thread_messages_fts {join} WHERE {' AND '.join(where)} "
+            "ORDER BY thread_messages_fts.rowid DESC"
+        )
+        conn = self.pool.connection()
+        # Counting rowids is cheap next to bm25, so find out first whether
+        # every match can be ranked.
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM "
+            f"(SELECT thread_messages_fts.rowid {matches} LIMIT ?)",
+            (*params, SEARCH_RANK_ALL + 1),
+        ).fetchone()
+        window, cursor = count, None
+        if count > SEARCH_RANK_ALL:
+            window = SEARCH_WINDOW
+            (cursor,) = conn.execute(
+                f"SELECT thread_messages_fts.rowid {matches} LIMIT 1 OFFSET ?",
+                (*params, window - 1),
+            ).fetchone()
+        rows = conn.execute(
+            f"""
+            SELECT m.thread_id, m.seq, m.role, m.content, hits.rank
+            FROM (
+                SELECT thread_messages_fts.rowid, bm25(thread_messages_fts) AS rank
+                {matches}
+                LIMIT ?
+            ) AS hits
+            JOIN thread_messages m ON m.rowid = hits.rowid
+            ORDER BY hits.rank
+            LIMIT ?
+            """,
+            (*params, window, limit),
+        ).fetchall()
+        terms = re.findall(r"\w+", query.lower())
+        hits = [
+            {
+                "thread_id": thread_id,
+                "seq": seq,
+                "role": role,
+                "snippet": make_snippet(content, terms),
+                "rank": rank,
+            }
+            for thread_id, seq, role, content, rank in rows
+        ]
+        return hits, cursor
+
+
+def to_fts_query(text: str) -> str:
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def make_snippet(content: str, terms: Sequence[str], words: int = SNIPPET_WORDS) -> str:
+    """``words`` words of ``content`` around the first hit, hits in **bold**.
+
+    Built in Python for the returned page only; FTS5's snippet() would run
+    for every ranked candidate.
+    """
+    tokens = content.split()
+    prefix = terms[-1] if terms else ""
+    exact = set(terms[:-1])
+
+    def is_hit(token):
+        word = re.sub(r"\W+", "", token.lower())
+        return bool(word) and (word in exact or word.startswith(prefix))
+
+    hits = [i for i, token in enumerate(tokens) if is_hit(token)] if terms else []
+    start = max(0, (hits[0] if hits else 0) - words // 3)
+    window = [
+        f"**{token}**" if is_hit(token) else token
+        for token in tokens[start : start + words]
+    ]
+    text = " ".join(window)
+    if start > 0:
+        text = "…" + text
+    if start + words < len(tokens):
+        text += "…"
+    return text
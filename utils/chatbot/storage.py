@@ -0,0 +1,154 @@
+# utils/chatbot/storage.py
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from typing import Iterator, List
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+DB_PATH = os.getenv("WELLNESS_CHAT_DB", "chatbot.db")
+
+# WAL lets readers run alongside the single writer; busy_timeout makes
+# writers wait for the lock instead of failing with "database is locked".
+# auto_vacuum only takes effect on new files (see compaction.vacuum).
+PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=134217728",
+)
+
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+    return configure_connection(conn)
+
+
+class _Slot:
+    # Lives only in one thread's threading.local, so it is freed when the
+    # thread ends; its finalizer then closes the connection.
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+def _close(conn: sqlite3.Connection):
+    try:
+        conn.close()
+    except sqlite3.ProgrammingError:
+        pass
+
+
+class ConnectionPool:
+    """One tuned SQLite connection per live OS thread.
+
+    Streamlit runs each session's script on its own thread, so sessions no
+    longer queue on a single shared handle; SQLite's own locking (WAL +
+    busy_timeout) arbitrates between them. Streamlit starts a new thread
+    for every rerun, so a connection is closed as soon as its thread ends
+    rather than being kept for the life of the process.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Finalizers of open connections; a finalizer drops its connection
+        # once it has run, so nothing here keeps a dead thread's handle.
+        self._open: List[weakref.finalize] = []
+
+    def connection(self) -> sqlite3.Connection:
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            conn = connect(self.path)
+            slot = self._local.slot = _Slot(conn)
+            finalizer = weakref.finalize(slot, _close, conn)
+            with self._lock:
+                self._open = [f for f in self._open if f.alive]
+                self._open.append(finalizer)
+        return slot.conn
+
+    def close_all(self):
+        with self._lock:
+            finalizers, self._open = self._open, []
+        for finalizer in finalizers:
+            finalizer()
+        self._local = threading.local()
+
+    def __len__(self):
+        with self._lock:
+            return sum(1 for f in self._open if f.alive)
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """SqliteSaver that takes its connection from a ConnectionPool.
+
+    The stock saver funnels every read and write through one connection
+    guarded by a process-wide lock; here each thread uses its own
+    connection, reads run without the lock, and only writes are queued.
+    """
+
+    def __init__(self, pool: ConnectionPool, **kwargs):
+        self.pool = pool
+        super().__init__(pool.connection(), **kwargs)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.pool.connection()
+
+    @conn.setter
+    def conn(self, value):
+        # SqliteSaver.__init__ assigns self.conn; connections come from the pool.
+        pass
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        with self.lock:
+            super().setup()
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        self.setup()
+        conn = self.conn
+        # SQLite admits one writer at a time anyway; queueing writers on an
+        # in-process lock is cheaper than SQLite's sleep-and-retry busy
+        # handler. Reads take no lock and run concurrently under WAL.
+        lock = self.lock if transaction else nullcontext()
+        with lock:
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                if transaction:
+                    conn.commit()
+                cur.close()
+
+
+@asynccontextmanager
+async def async_checkpointer(path: str = DB_PATH):
+    """AsyncSqliteSaver on a tuned aiosqlite connection, for async graphs.
+
+    Requires the optional ``aiosqlite`` package.
+    """
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    async with aiosqlite.connect(path) as conn:
+        for pragma in PRAGMAS:
+            await conn.execute(pragma)
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        yield saver
@@ -0,0 +1,168 @@
+# utils/chatbot/threads.py
+import sqlite3
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class ThreadCatalog:
+    """Per-thread metadata kept next to the checkpoints in chatbot.db.
+
+    One row per chat thread (display name, created/updated time, message
+    count), updated on every chat turn, so the sidebar can page through
+    threads by recency without scanning checkpoints.
+    """
+
+    def __init__(self, conn):
+        # Accepts a plain connection (serialised with a lock) or a
+        # ConnectionPool (one connection per thread, no lock needed).
+        if hasattr(conn, "connection"):
+            self._pool = conn
+            self.lock = nullcontext()
+        else:
+            self._pool = None
+            self._conn = conn
+            self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS thread_meta (
+                    thread_id TEXT PRIMARY KEY,
+                    name TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    message_count INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_thread_meta_updated "
+                "ON thread_meta(updated_at DESC)"
+            )
+            self.conn.commit()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self._pool.connection() if self._pool is not None else self._conn
+
+    def touch(
+        self,
+        thread_id,
+        message_count: int,
+        name: Optional[str] = None,
+        updated_at: Optional[float] = None,
+    ):
+        """Record activity on a thread; ``name`` only fills a missing name."""
+        now = updated_at if updated_at is not None else time.time()
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT INTO thread_meta
+                    (thread_id, name, created_at, updated_at, message_count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(thread_id) DO UPDATE SET
+                    name = COALESCE(thread_meta.name, excluded.name),
+                    updated_at = excluded.updated_at,
+                    message_count = excluded.message_count
+                """,
+                (str(thread_id), name, now, now, message_count),
+            )
+            self.conn.commit()
+
+    def rename(self, thread_id, name: str):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT INTO thread_meta (thread_id, name, created_at, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(thread_id) DO UPDATE SET name = excluded.name
+                """,
+                (str(thread_id), name, now, now),
+            )
+            self.conn.commit()
+
+    def get(self, thread_id) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT thread_id, name, created_at, updated_at, message_count "
+                "FROM thread_meta WHERE thread_id = ?",
+                (str(thread_id),),
+            ).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def list(self, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """Threads ordered by most recent activity, one page at a time."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT thread_id, name, created_at, updated_at, message_count "
+                "FROM thread_meta ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM thread_meta").fetchone()[0]
+
+    def delete(self, thread_ids):
+        with self.lock:
+            self.conn.executemany(
+                "DELETE FROM thread_meta WHERE thread_id = ?",
+                [(str(t),) for t in thread_ids],
+            )
+            self.conn.commit()
+
+    def backfill(self, checkpointer) -> int:
+        """One-off import of threads that predate the catalogue.
+
+        Walks the checkpoints once and records each thread's latest state;
+        a no-op once the catalogue has rows.
+        """
+        if self.count():
+            return 0
+        seen = {}
+        for checkpoint in checkpointer.list(None):
+            thread_id = checkpoint.config["configurable"]["thread_id"]
+            if thread_id in seen:
+                continue
+            # list() yields newest checkpoints first
+            messages = checkpoint.checkpoint["channel_values"].get("messages", [])
+            seen[thread_id] = (messages, _checkpoint_time(checkpoint.checkpoint))
+        for thread_id, (messages, updated_at) in seen.items():
+            self.touch(
+                thread_id,
+                len(messages),
+                name=default_thread_name(messages),
+                updated_at=updated_at,
+            )
+        return len(seen)
+
+
+def _checkpoint_time(checkpoint) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(checkpoint["ts"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _row_to_dict(row) -> Dict:
+    thread_id, name, created_at, updated_at, message_count = row
+    return {
+        "thread_id": thread_id,
+        "name": name,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "message_count": message_count,
+    }
+
+
+def default_thread_name(messages) -> Optional[str]:
+    """Same rule as the frontend: the first 30 chars of the first user message."""
+    for message in messages:
+        if getattr(message, "type", None) == "human":
+            snippet = str(message.content).replace("\n", " ")[:30].strip()
+            return snippet or None
+    return None
@@ -0,0 +1,236 @@
+# utils/clinics.py
+"""Offline clinic directory with nearest-clinic lookup.
+
+Clinics come from ``data/clinics.json`` and cities from
+``data/cities.csv`` (both replaceable through environment variables). Each
+speciality gets its own k-d tree over the clinics' positions on the unit
+sphere, so "k nearest cardiology clinics to Pune" is a tree search, not
+a scan of the whole directory.
+"""
+import csv
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "data")
+CLINICS_PATH = os.getenv(
+    "WELLNESS_CLINICS_PATH", os.path.join(DATA_DIR, "clinics.json")
+)
+CITIES_PATH = os.getenv("WELLNESS_CITIES_PATH", os.path.join(DATA_DIR, "cities.csv"))
+EARTH_RADIUS_KM = 6371.0
+
+# Speciality keys used in the directory, and the words that map onto them.
+# Words are compared by their first five letters ("cardiologist" ->
+# "cardi" -> cardiology).
+SPECIALTY_ALIASES = {
+    "general": ["general", "family", "primary", "internal", "physician", "gp"],
+    "cardiology": ["cardiology", "heart"],
+    "dermatology": ["dermatology", "skin"],
+    "ent": ["ent", "otolaryngology", "otorhinolaryngology", "ear", "nose", "throat"],
+    "endocrinology": ["endocrinology", "diabetes", "diabetologist", "thyroid"],
+    "gastroenterology": ["gastroenterology", "digestive", "hepatology", "liver"],
+    "gynecology": ["gynecology", "gynaecology", "obstetrics", "obstetrician"],
+    "nephrology": ["nephrology", "kidney", "renal"],
+    "neurology": ["neurology", "neurosurgery"],
+    "oncology": ["oncology", "cancer"],
+    "ophthalmology": ["ophthalmology", "eye", "optometrist"],
+    "orthopedics": ["orthopedics", "orthopaedics", "bone", "joint"],
+    "pediatrics": ["pediatrics", "paediatrics", "child", "children"],
+    "psychiatry": ["psychiatry", "psychology", "mental"],
+    "pulmonology": ["pulmonology", "chest", "lung", "respiratory"],
+    "urology": ["urology"],
+}
+_ALIAS_STEMS = {
+    alias[:5]: key for key, aliases in SPECIALTY_ALIASES.items() for alias in aliases
+}
+
+
+def specialty_key(specialist: Optional[str]) -> Optional[str]:
+    """Map free text such as 'Cardiologist' or 'ENT Specialist' to a key."""
+    if not specialist:
+        return None
+    words = re.findall(r"[a-z]+", specialist.lower())
+    # A specific speciality wins over the generic "physician"/"general".
+    found = [_ALIAS_STEMS[w[:5]] for w in words if w[:5] in _ALIAS_STEMS]
+    specific = [key for key in found if key != "general"]
+    if specific:
+        return specific[0]
+    return found[0] if found else None
+
+
+def to_xyz(lat: float, lon: float) -> Tuple[float, float, float]:
+    # Straight-line distance between unit vectors grows with great-circle
+    # distance, so nearest-neighbour order on xyz is order on the globe.
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+class KDTree:
+    """Static 3-d tree over (point, item) pairs, stored in flat arrays."""
+
+    def __init__(self, points: Sequence[Tuple[float, float, float]], items: Sequence):
+        order = list(range(len(points)))
+        self.points: List[Tuple[float, float, float]] = []
+        self.items: List[Any] = []
+        self.axes: List[int] = []
+        self.left: List[int] = []
+        self.right: List[int] = []
+        self.root = self._build(order, points, items, 0)
+
+    def _build(self, idx: List[int], points, items, depth: int) -> int:
+        if not idx:
+            return -1
+        axis = depth % 3
+        idx.sort(key=lambda i: points[i][axis])
+        mid = len(idx) // 2
+        node = len(self.points)
+        self.points.append(points[idx[mid]])
+        self.items.append(items[idx[mid]])
+        self.axes.append(axis)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.left[node] = self._build(idx[:mid], points, items, depth + 1)
+        self.right[node] = self._build(idx[mid + 1 :], points, items, depth + 1)
+        return node
+
+    def nearest(self, query: Tuple[float, float, float], k: int = 5):
+        """Up to ``k`` ``(squared_distance, item)`` pairs, closest first."""
+        if k <= 0 or self.root < 0:
+            return []
+        heap: List[Tuple[float, int]] = []  # max-heap via negated distances
+        points, axes, left, right = self.points, self.axes, self.left, self.right
+        # Each entry carries the squared distance to the splitting plane
+        # that separates it from the query; subtrees beyond the current
+        # k-th best are skipped when popped.
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if node < 0 or (len(heap) == k and bound >= -heap[0][0]):
+                continue
+            p = points[node]
+            d = (p[0] - query[0]) ** 2 + (p[1] - query[1]) ** 2 + (p[2] - query[2]) ** 2
+            if len(heap) < k:
+                heapq.heappush(heap, (-d, node))
+            elif d < -heap[0][0]:
+                heapq.heapreplace(heap, (-d, node))
+            diff = query[axes[node]] - p[axes[node]]
+            if diff < 0:
+                near, far = left[node], right[node]
+            else:
+                near, far = right[node], left[node]
+            # The far side is pushed first so the near side is searched first.
+            stack.append((far, diff * diff))
+            stack.append((near, bound))
+        return [(-d, self.items[node]) for d, node in sorted(heap, reverse=True)]
+
+    def __len__(self):
+        return len(self.points)
+
+
+def normalize_city(name: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z ]", " ", name.lower())).strip()
+
+
+def load_cities(path: str = CITIES_PATH) -> Dict[str, Tuple[float, float]]:
+    cities = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            cities[normalize_city(row["city"])] = (float(row["lat"]), float(row["lon"]))
+    return cities
+
+
+def load_clinics(path: str = CLINICS_PATH) -> List[Dict[str, Any]]:
+    if path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            clinics = list(csv.DictReader(f))
+        for clinic in clinics:
+            clinic["lat"], clinic["lon"] = float(clinic["lat"]), float(clinic["lon"])
+            # CSV keeps specialities in one "a;b;c" column
+            clinic["specialties"] = [
+                s.strip() for s in clinic.get("specialties", "").split(";") if s.strip()
+            ]
+        return clinics
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ClinicDirectory:
+    def __init__(
+        self,
+        clinics: List[Dict[str, Any]],
+        cities: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        self.clinics = clinics
+        self.cities = cities or {}
+        by_specialty: Dict[Optional[str], List[Dict[str, Any]]] = {None: clinics}
+        for clinic in clinics:
+            specialties = clinic.get("specialties", [])
+            for key in {specialty_key(s) or s.lower() for s in specialties}:
+                by_specialty.setdefault(key, []).append(clinic)
+        self.trees = {
+            key: KDTree([to_xyz(c["lat"], c["lon"]) for c in group], group)
+            for key, group in by_specialty.items()
+        }
+
+    def geocode(self, location: str) -> Optional[Tuple[float, float]]:
+        """Coordinates for 'City', 'City, State' or 'Area, City, Country'."""
+        if not location:
+            return None
+        parts = [normalize_city(p) for p in location.split(",")]
+        for part in parts + [normalize_city(location)]:
+            if part in self.cities:
+                return self.cities[part]
+        return None
+
+    def nearest(
+        self,
+        where,
+        specialist: Optional[str] = None,
+        k: int = 5,
+        max_km: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """``k`` closest clinics to ``where`` (a location string or lat/lon).
+
+        With ``specialist``, only clinics offering that speciality are
+        considered; an unrecognised speciality searches all clinics. Each
+        result is a copy of the clinic with ``distance_km`` added.
+        """
+        coords = self.geocode(where) if isinstance(where, str) else where
+        if coords is None:
+            return []
+        key = specialty_key(specialist)
+        tree = self.trees.get(key if key in self.trees else None)
+        results = []
+        for _, clinic in tree.nearest(to_xyz(*coords), k):
+            distance = haversine_km(coords, (clinic["lat"], clinic["lon"]))
+            if max_km is not None and distance > max_km:
+                break
+            results.append({**clinic, "distance_km": round(distance, 1)})
+        return results
+
+
+_directory: Optional[ClinicDirectory] = None
+_directory_lock = threading.Lock()
+
+
+def get_clinic_directory() -> ClinicDirectory:
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                _directory = ClinicDirectory(load_clinics(), load_cities())
+    return _directory
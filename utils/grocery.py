@@ -0,0 +1,118 @@
+# utils/grocery.py
+"""Merge per-day grocery lists into one shopping list.
+
+Day plans list items as free text ("200 g chicken breast", "Spinach",
+"Oats - 1 cup"). Items are matched on a normalised name, and quantities
+with compatible units are summed.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# unit spelling -> (canonical unit, factor to that unit)
+UNITS = {
+    "g": ("g", 1), "gm": ("g", 1), "gms": ("g", 1), "gram": ("g", 1),
+    "grams": ("g", 1), "kg": ("g", 1000), "kgs": ("g", 1000),
+    "ml": ("ml", 1), "l": ("ml", 1000), "litre": ("ml", 1000),
+    "liter": ("ml", 1000), "litres": ("ml", 1000), "liters": ("ml", 1000),
+    "cup": ("cup", 1), "cups": ("cup", 1),
+    "tbsp": ("tbsp", 1), "tablespoon": ("tbsp", 1), "tablespoons": ("tbsp", 1),
+    "tsp": ("tsp", 1), "teaspoon": ("tsp", 1), "teaspoons": ("tsp", 1),
+    "slice": ("slice", 1), "slices": ("slice", 1),
+    "piece": ("", 1), "pieces": ("", 1), "pcs": ("", 1), "pc": ("", 1),
+    "dozen": ("", 12),
+}
+_NUMBER = r"\d+/\d+|\d+(?:\.\d+)?"
+_UNIT = "|".join(sorted(map(re.escape, UNITS), key=len, reverse=True))
+_AMOUNT = rf"(?P<qty>{_NUMBER})\s*(?:(?P<unit>{_UNIT})\b\.?)?"
+# "200 g chicken", "2 cups of oats", "3 eggs"
+_LEADING = re.compile(rf"^{_AMOUNT}\s*(?:of\s+)?(?P<name>.+)$", re.I)
+# "chicken breast 200g", "oats - 1 cup", "paneer (250 g)"
+_TRAILING = re.compile(rf"^(?P<name>.+?)[\s:,(-]+{_AMOUNT}\)?$", re.I)
+
+
+def _number(text: str) -> float:
+    if "/" in text:
+        num, den = text.split("/")
+        return float(num) / float(den) if float(den) else 0.0
+    return float(text)
+
+
+def parse_item(text: str) -> Tuple[str, Optional[float], str]:
+    """``(name, quantity, unit)``; quantity is None when none is given."""
+    text = re.sub(r"\s+", " ", text).strip(" -•*")
+    for pattern in (_LEADING, _TRAILING):
+        match = pattern.match(text)
+        if match:
+            unit, factor = UNITS.get((match.group("unit") or "").lower(), ("", 1))
+            quantity = _number(match.group("qty")) * factor
+            return match.group("name").strip(" -:,()"), quantity, unit
+    return text, None, ""
+
+
+def item_key(name: str) -> str:
+    """Case-, punctuation- and plural-insensitive form of an item name."""
+    words = re.findall(r"[a-z]+", name.lower())
+    if words:
+        last = words[-1]
+        if last.endswith("ies") and len(last) > 4:
+            last = last[:-3] + "y"
+        elif last.endswith("oes"):
+            last = last[:-2]
+        elif last.endswith("s") and not last.endswith(("ss", "us")) and len(last) > 3:
+            last = last[:-1]
+        words[-1] = last
+    return " ".join(words)
+
+
+def _format_quantity(quantity: float, unit: str) -> str:
+    if unit in ("g", "ml") and quantity >= 1000:
+        quantity, unit = quantity / 1000, "kg" if unit == "g" else "l"
+    if unit in ("cup", "slice") and quantity != 1:
+        unit += "s"
+    amount = f"{quantity:.2f}".rstrip("0").rstrip(".")
+    return f"{amount} {unit}".strip()
+
+
+def merge_grocery_lists(lists: Iterable[Iterable[str]]) -> List[str]:
+    """One entry per distinct item, in first-seen order, quantities summed.
+
+    Items seen without a quantity on several days note how many days use
+    them, e.g. ``"Spinach (3 days)"``.
+    """
+    order: List[str] = []
+    names: Dict[str, str] = {}
+    totals: Dict[str, Dict[str, float]] = {}
+    days: Dict[str, int] = {}
+    for items in lists:
+        seen_today = set()
+        for text in items:
+            if not isinstance(text, str) or not text.strip():
+                continue
+            name, quantity, unit = parse_item(text)
+            key = item_key(name)
+            if not key:
+                continue
+            if key not in names:
+                order.append(key)
+                names[key] = name[:1].upper() + name[1:]
+                totals[key] = {}
+                days[key] = 0
+            if quantity is not None:
+                totals[key][unit] = totals[key].get(unit, 0.0) + quantity
+            if key not in seen_today:
+                seen_today.add(key)
+                days[key] += 1
+
+    merged = []
+    for key in order:
+        if totals[key]:
+            amounts = " + ".join(
+                _format_quantity(quantity, unit)
+                for unit, quantity in totals[key].items()
+            )
+            merged.append(f"{names[key]} - {amounts}")
+        elif days[key] > 1:
+            merged.append(f"{names[key]} ({days[key]} days)")
+        else:
+            merged.append(names[key])
+    return merged
@@ -0,0 +1,78 @@
+# utils/meal_plan.py
+"""Repeated dishes across the days of a multi-day meal plan.
+
+Each day is requested separately, so two days can come back with the same
+dish. Dishes are compared on the fields the plan already returns: the meal
+slot and its ``main_ingredient`` (falling back to the description when the
+model leaves the field out).
+"""
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Extra rounds of requests for days that repeat a dish: one redo, plus one
+# more for redone days that clash with each other. No round runs unless a
+# repeat is found.
+REPLAN_ROUNDS = 2
+
+
+def _normalise(text) -> str:
+    return " ".join(str(text or "").casefold().split())
+
+
+def dish_key(meal: dict) -> Tuple[str, str]:
+    """``(slot, main ingredient)`` of one meal of a day plan."""
+    main = _normalise(meal.get("main_ingredient"))
+    return _normalise(meal.get("meal")), main or _normalise(meal.get("description"))
+
+
+def describe_dish(meal: dict) -> str:
+    """``"Dinner: Paneer tikka (paneer)"``, as listed in a redo prompt."""
+    text = f"{meal.get('meal', '')}: {meal.get('description', '')}"
+    main = str(meal.get("main_ingredient") or "").strip()
+    return f"{text} ({main})" if main else text
+
+
+def main_dishes(day_plan: dict) -> Dict[Tuple[str, str], str]:
+    """Dish key -> description for a day's meals; snacks may repeat."""
+    dishes = {}
+    for meal in day_plan.get("meals", []):
+        key = dish_key(meal)
+        if "snack" in key[0] or not key[1]:
+            continue
+        dishes[key] = describe_dish(meal)
+    return dishes
+
+
+def repeated_days(day_plans: Sequence[dict]):
+    """Indexes of days repeating a dish of an earlier day, and the dishes of
+    the days that are kept."""
+    seen: Dict[Tuple[str, str], str] = {}
+    repeats = []
+    for i, day_plan in enumerate(day_plans):
+        dishes = main_dishes(day_plan)
+        if seen.keys() & dishes.keys():
+            repeats.append(i)
+        else:
+            seen.update(dishes)
+    return repeats, seen
+
+
+def plan_days(
+    plan_day: Callable, days: int, pool, rounds: int = REPLAN_ROUNDS
+) -> List[tuple]:
+    """``plan_day(day, avoid)`` for days 1..N on ``pool``, redoing repeats.
+
+    ``plan_day`` returns ``(day_plan, grocery_list)``. Days that repeat a
+    dish of a kept day are requested again with the kept dishes in
+    ``avoid``, and redone days are checked again, for at most ``rounds``
+    rounds.
+    """
+    results = list(pool.map(lambda day: plan_day(day, ()), range(1, days + 1)))
+    for _ in range(rounds):
+        repeats, seen = repeated_days([day_plan for day_plan, _ in results])
+        if not repeats:
+            break
+        avoid = tuple(seen.values())
+        redone = pool.map(lambda i: plan_day(i + 1, avoid), repeats)
+        for i, result in zip(repeats, redone):
+            results[i] = result
+    return results
@@ -0,0 +1,158 @@
+# utils/nutrition.py
+"""Energy and macro targets, for one profile or a whole cohort.
+
+The scalar functions back the diet planner form. ``cohort_targets`` takes
+columnar arrays and computes the same numbers for every row in a single
+vectorised NumPy pass, for population analytics.
+
+Categorical columns (gender, activity, goal) may be arrays of labels, as
+in the form, or integer codes into ``GENDERS`` / ``ACTIVITY_LEVELS`` /
+``GOALS``, which skips the label lookup. Labels that the scalar functions
+do not recognise get the same fallback as they do there.
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+
+GENDERS = ("Male", "Female", "Other")
+ACTIVITY_LEVELS = ("Sedentary", "Light", "Moderate", "Active", "Very Active")
+GOALS = ("Lose Weight", "Maintain Weight", "Gain Weight", "Build Strength / Muscle")
+
+ACTIVITY_MULTIPLIERS = {
+    "Sedentary": 1.2,
+    "Light": 1.375,
+    "Moderate": 1.55,
+    "Active": 1.725,
+    "Very Active": 1.9,
+}
+DEFAULT_ACTIVITY_MULTIPLIER = 1.2
+GOAL_ADJUSTMENTS = {
+    "Lose Weight": -500,
+    "Gain Weight": 500,
+    "Build Strength / Muscle": 250,
+}
+# (protein, carbs, fats) shares of target calories, following the goal
+# guidelines given to the planner; carbs take whatever protein and fats
+# leave.
+MACRO_SPLITS = {
+    "Lose Weight": (0.30, 0.40, 0.30),
+    "Maintain Weight": (0.25, 0.50, 0.25),
+    "Gain Weight": (0.20, 0.50, 0.30),
+    "Build Strength / Muscle": (0.30, 0.45, 0.25),
+}
+DEFAULT_MACRO_SPLIT = MACRO_SPLITS["Maintain Weight"]
+# Goals whose protein target is set by bodyweight instead of calories.
+PROTEIN_G_PER_KG = {"Build Strength / Muscle": 1.8}
+KCAL_PER_G = {"protein": 4, "carbs": 4, "fats": 9}
+
+
+# ---- One profile ----
+def calculate_bmr(age, gender, height, weight):
+    if gender.lower() == "male":
+        return 10 * weight + 6.25 * height - 5 * age + 5
+    else:
+        return 10 * weight + 6.25 * height - 5 * age - 161
+
+
+def calculate_tdee(bmr, activity_level):
+    return bmr * ACTIVITY_MULTIPLIERS.get(activity_level, DEFAULT_ACTIVITY_MULTIPLIER)
+
+
+def adjust_calories_for_goal(tdee, goal):
+    return tdee + GOAL_ADJUSTMENTS.get(goal, 0)
+
+
+def calculate_macro_targets(target_calories, goal, weight):
+    """Daily grams of protein, carbs and fats for ``target_calories``."""
+    protein_share, _, fats_share = MACRO_SPLITS.get(goal, DEFAULT_MACRO_SPLIT)
+    if goal in PROTEIN_G_PER_KG:
+        protein_g = weight * PROTEIN_G_PER_KG[goal]
+    else:
+        protein_g = target_calories * protein_share / KCAL_PER_G["protein"]
+    fats_g = target_calories * fats_share / KCAL_PER_G["fats"]
+    remaining = (
+        target_calories
+        - protein_g * KCAL_PER_G["protein"]
+        - fats_g * KCAL_PER_G["fats"]
+    )
+    carbs_g = max(0.0, remaining) / KCAL_PER_G["carbs"]
+    return {"protein_g": protein_g, "carbs_g": carbs_g, "fats_g": fats_g}
+
+
+# ---- Cohorts ----
+def encode(values, labels: Sequence[str], casefold: bool = False) -> np.ndarray:
+    """Integer codes of ``values`` in ``labels``; -1 for anything else.
+
+    Integer arrays are taken as codes already. Labels are matched with one
+    array comparison per label; with ``casefold``, only values that did not
+    match exactly go through the slower case-insensitive lookup.
+    """
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        codes = values.astype(np.intp)
+        return np.where((codes >= 0) & (codes < len(labels)), codes, -1)
+    codes = np.full(values.shape, -1, dtype=np.intp)
+    for i, label in enumerate(labels):
+        codes[values == label] = i
+    if casefold:
+        rest = codes < 0
+        if rest.any():
+            index = {label.lower(): i for i, label in enumerate(labels)}
+            uniques, inverse = np.unique(values[rest], return_inverse=True)
+            mapped = [index.get(str(u).lower(), -1) for u in uniques]
+            codes[rest] = np.asarray(mapped, dtype=np.intp)[inverse]
+    return codes
+
+
+def _lookup(codes: np.ndarray, table: Dict[str, float], labels, default):
+    # The extra last slot holds the fallback, so code -1 indexes it.
+    values = [table.get(label, default) for label in labels] + [default]
+    return np.asarray(values, dtype=np.float64)[codes]
+
+
+def cohort_targets(
+    age, gender, height, weight, activity, goal
+) -> Dict[str, np.ndarray]:
+    """BMR, TDEE, target calories and macro grams for every row.
+
+    Matches the scalar functions above row by row; returns float64 arrays
+    keyed ``bmr``, ``tdee``, ``target_calories``, ``protein_g``,
+    ``carbs_g`` and ``fats_g``.
+    """
+    age = np.asarray(age, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+    weight = np.asarray(weight, dtype=np.float64)
+    male = encode(gender, GENDERS, casefold=True) == 0
+    activity_codes = encode(activity, ACTIVITY_LEVELS)
+    goal_codes = encode(goal, GOALS)
+
+    bmr = 10 * weight + 6.25 * height - 5 * age + np.where(male, 5.0, -161.0)
+    multiplier = _lookup(
+        activity_codes,
+        ACTIVITY_MULTIPLIERS,
+        ACTIVITY_LEVELS,
+        DEFAULT_ACTIVITY_MULTIPLIER,
+    )
+    tdee = bmr * multiplier
+    target = tdee + _lookup(goal_codes, GOAL_ADJUSTMENTS, GOALS, 0.0)
+
+    splits = [MACRO_SPLITS.get(g, DEFAULT_MACRO_SPLIT) for g in GOALS]
+    splits.append(DEFAULT_MACRO_SPLIT)
+    protein_share, _, fats_share = np.asarray(splits, dtype=np.float64)[goal_codes].T
+    per_kg = _lookup(goal_codes, PROTEIN_G_PER_KG, GOALS, np.nan)
+    protein_g = np.where(
+        np.isnan(per_kg),
+        target * protein_share / KCAL_PER_G["protein"],
+        weight * per_kg,
+    )
+    fats_g = target * fats_share / KCAL_PER_G["fats"]
+    remaining = target - protein_g * KCAL_PER_G["protein"] - fats_g * KCAL_PER_G["fats"]
+    carbs_g = np.maximum(remaining, 0.0) / KCAL_PER_G["carbs"]
+    return {
+        "bmr": bmr,
+        "tdee": tdee,
+        "target_calories": target,
+        "protein_g": protein_g,
+        "carbs_g": carbs_g,
+        "fats_g": fats_g,
+    }
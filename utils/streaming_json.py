@@ -0,0 +1,215 @@
+# utils/streaming_json.py
+import json
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+PathKey = Union[str, int]
+Path = Tuple[PathKey, ...]
+Event = Tuple[Path, Any]
+
+WHITESPACE = " \t\r\n"
+
+
+class StreamingJSONError(ValueError):
+    pass
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "start", "key", "index", "expect_key", "empty")
+
+    def __init__(self, kind: str, path: Path, start: int):
+        self.kind = kind  # "{" or "["
+        self.path = path
+        self.start = start
+        self.key: Optional[str] = None
+        self.index = 0
+        self.expect_key = kind == "{"
+        self.empty = True
+
+
+def path_matches(path: Path, pattern: Sequence[PathKey]) -> bool:
+    """``"*"`` in a pattern matches any single key or index."""
+    if len(path) != len(pattern):
+        return False
+    return all(p == "*" or p == k for k, p in zip(path, pattern))
+
+
+class StreamingJSONParser:
+    """Incremental JSON parser for LLM output arriving in chunks.
+
+    Call ``feed`` with each chunk; it returns ``(path, value)`` events for
+    every value whose path matches one of ``patterns`` as soon as that value
+    is complete (objects/arrays when they close, scalars when they end).
+    Paths are tuples of keys and list indices, e.g. ``("daily_plan", 0,
+    "meals", 2)``. Any text before the first ``{``/``[`` (markdown fences,
+    preambles) and after the root value closes is ignored.
+
+    Structural errors raise ``StreamingJSONError`` as soon as they are seen;
+    ``close`` raises it if the stream ended before the root value closed.
+    """
+
+    def __init__(self, patterns: Iterable[Sequence[PathKey]] = ()):
+        self.patterns = [tuple(p) for p in patterns]
+        self.result: Any = None
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._scalar_start = -1
+
+    # ---- Public API ----
+    def feed(self, chunk: str) -> List[Event]:
+        events: List[Event] = []
+        if self.done or not chunk:
+            return events
+        base = self._pos
+        self._text += chunk
+        text = self._text
+        for offset, ch in enumerate(chunk):
+            pos = base + offset
+            if self.done:
+                break
+            self._step(ch, pos, text, events)
+        self._pos = base + len(chunk)
+        return events
+
+    def close(self) -> Any:
+        if not self.done:
+            if not self._stack:
+                raise StreamingJSONError("stream contained no JSON value")
+            raise StreamingJSONError(
+                f"stream truncated inside {self._describe(self._stack[-1].path)}"
+            )
+        return self.result
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    # ---- Scanner ----
+    def _step(self, ch: str, pos: int, text: str, events: List[Event]):
+        stack = self._stack
+        if not stack:
+            if ch in "{[":
+                stack.append(_Frame(ch, (), pos))
+            return
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                self._end_string(text, pos, events)
+            return
+
+        frame = stack[-1]
+        if ch in WHITESPACE:
+            self._end_scalar(text, pos, events)
+        elif ch == '"':
+            if not (frame.kind == "{" and frame.expect_key and frame.key is None):
+                self._value_starting(frame, pos)
+            self._in_string = True
+            self._string_start = pos
+        elif ch in "{[":
+            self._value_starting(frame, pos)
+            stack.append(_Frame(ch, self._child_path(frame), pos))
+        elif ch in "}]":
+            self._end_scalar(text, pos, events)
+            expected = "}" if frame.kind == "{" else "]"
+            if ch != expected:
+                self._fail(pos, f"expected '{expected}' but found '{ch}'")
+            stack.pop()
+            # json.loads validates the finished container as a whole
+            # (missing values, trailing commas, ...).
+            value = self._load(text[frame.start : pos + 1], pos)
+            self._emit(frame.path, value, events)
+            if stack:
+                stack[-1].empty = False
+            else:
+                self.result = value
+                self.done = True
+        elif ch == ",":
+            self._end_scalar(text, pos, events)
+            if frame.empty:
+                self._fail(pos, "unexpected ','")
+            if frame.kind == "{":
+                frame.expect_key = True
+                frame.key = None
+            else:
+                frame.index += 1
+            frame.empty = True
+        elif ch == ":":
+            if frame.kind != "{" or frame.key is None or not frame.expect_key:
+                self._fail(pos, "unexpected ':'")
+            frame.expect_key = False
+        elif self._scalar_start < 0:
+            self._value_starting(frame, pos)
+            self._scalar_start = pos
+
+    def _value_starting(self, frame: _Frame, pos: int):
+        if frame.kind == "{" and frame.expect_key:
+            self._fail(pos, "expected object key")
+        if not frame.empty:
+            self._fail(pos, "missing ','")
+
+    def _end_string(self, text: str, pos: int, events: List[Event]):
+        frame = self._stack[-1]
+        value = self._load(text[self._string_start : pos + 1], pos)
+        if frame.kind == "{" and frame.expect_key:
+            frame.key = value
+            return
+        self._emit(self._child_path(frame), value, events)
+        frame.empty = False
+
+    def _end_scalar(self, text: str, pos: int, events: List[Event]):
+        if self._scalar_start < 0:
+            return
+        frame = self._stack[-1]
+        raw = text[self._scalar_start : pos]
+        self._scalar_start = -1
+        value = self._load(raw, pos)
+        self._emit(self._child_path(frame), value, events)
+        frame.empty = False
+
+    # ---- Helpers ----
+    @staticmethod
+    def _child_path(frame: _Frame) -> Path:
+        if frame.kind == "{":
+            return frame.path + (frame.key,)
+        return frame.path + (frame.index,)
+
+    def _emit(self, path: Path, value: Any, events: List[Event]):
+        for pattern in self.patterns:
+            if path_matches(path, pattern):
+                events.append((path, value))
+                return
+
+    def _load(self, raw: str, pos: int) -> Any:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise StreamingJSONError(f"invalid JSON near offset {pos}: {e.msg}") from None
+
+    def _fail(self, pos: int, message: str):
+        raise StreamingJSONError(f"{message} at offset {pos}")
+
+    @staticmethod
+    def _describe(path: Path) -> str:
+        return "$" + "".join(
+            f"[{k}]" if isinstance(k, int) else f".{k}" for k in path
+        )
+
+
+def iter_json_events(chunks: Iterable[str], patterns: Iterable[Sequence[PathKey]]):
+    """Yield ``(path, value)`` events from a stream of text chunks.
+
+    Raises ``StreamingJSONError`` if the stream is malformed or truncated.
+    """
+    parser = StreamingJSONParser(patterns)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
@@ -0,0 +1,254 @@
+# utils/structured_output.py
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from llms.cache import cached_invoke, store_response
+
+# ========================
+# Schemas
+# ========================
+# A schema is a python type (str, bool), NUMBER, a one-item list describing
+# the items of an array, or a dict describing an object. Object keys ending
+# in "?" are optional.
+NUMBER = (int, float)
+
+ANALYSIS_SCHEMA = {
+    "diagnosis": str,
+    "specialist": str,
+    "treatments?": [str],
+    "self_care": [str],
+    "visit_clinic?": bool,
+    "advice?": str,
+}
+
+MEAL_PLAN_SCHEMA = {
+    "daily_plan": [
+        {
+            "day": str,
+            "meals": [
+                {
+                    "meal": str,
+                    "description": str,
+                    "calories": NUMBER,
+                    "main_ingredient?": str,
+                }
+            ],
+            "total_calories": NUMBER,
+            "macros": {
+                "protein_g": NUMBER,
+                "carbs_g": NUMBER,
+                "fats_g": NUMBER,
+            },
+        }
+    ],
+    "grocery_list": [str],
+}
+
+
+class StructuredOutputError(ValueError):
+    def __init__(self, message: str, raw: str = "", errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.raw = raw
+        self.errors = errors or []
+
+
+def _type_name(spec) -> str:
+    if spec is NUMBER:
+        return "number"
+    if isinstance(spec, list):
+        return "array"
+    if isinstance(spec, dict):
+        return "object"
+    return {str: "string", bool: "boolean"}.get(spec, getattr(spec, "__name__", str(spec)))
+
+
+def validate(data: Any, schema: Any, path: str = "$") -> List[str]:
+    """Return a list of human-readable schema violations (empty if valid)."""
+    if isinstance(schema, dict):
+        if not isinstance(data, dict):
+            return [f"{path}: expected object"]
+        errors = []
+        for raw_key, spec in schema.items():
+            optional = raw_key.endswith("?")
+            key = raw_key[:-1] if optional else raw_key
+            if key not in data or data[key] is None:
+                if not optional:
+                    errors.append(f"{path}.{key}: missing")
+                continue
+            errors.extend(validate(data[key], spec, f"{path}.{key}"))
+        return errors
+    if isinstance(schema, list):
+        if not isinstance(data, list):
+            return [f"{path}: expected array"]
+        errors = []
+        for i, item in enumerate(data):
+            errors.extend(validate(item, schema[0], f"{path}[{i}]"))
+        return errors
+    if isinstance(data, bool) and schema is not bool:
+        return [f"{path}: expected {_type_name(schema)}, got boolean"]
+    if not isinstance(data, schema):
+        return [f"{path}: expected {_type_name(schema)}, got {type(data).__name__}"]
+    return []
+
+
+# ========================
+# Extraction
+# ========================
+# Only these characters can change the scanner state; everything else is
+# skipped by the regex engine rather than the Python loop.
+_STRUCTURAL = re.compile(r'[{}"\\]')
+MAX_RESTARTS = 8
+
+
+def iter_json_candidates(text: str, pos: int = 0):
+    """Yield ``(start, end)`` spans of balanced top-level ``{...}`` blocks.
+
+    Single linear pass: string literals (and escapes inside them) are
+    skipped, so braces in values such as ``"a } b"`` do not unbalance the
+    scan. Quotes outside any object (prose) are ignored.
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    search = _STRUCTURAL.search
+    while True:
+        m = search(text, pos)
+        if m is None:
+            return
+        i = m.start()
+        ch = text[i]
+        pos = i + 1
+        if in_string:
+            if ch == "\\":
+                pos = i + 2
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            if depth:
+                in_string = True
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield start, i + 1
+
+
+_decoder = json.JSONDecoder()
+
+
+def extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """Return the first balanced JSON object in ``text`` that parses, or None.
+
+    The common case (one object, possibly wrapped in prose or fences) is
+    decoded directly from the first ``{`` at C speed. Otherwise the brace scanner
+    proposes balanced spans; if a span does not parse (e.g. a stray ``{``
+    in prose threw the scan off), scanning restarts just after its opening
+    brace, at most ``MAX_RESTARTS`` times.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    data = _decode_at(text, start)
+    if data is not None:
+        return data
+
+    restarts = 0
+    pos = start
+    while restarts <= MAX_RESTARTS:
+        for span_start, span_end in iter_json_candidates(text, pos):
+            try:
+                return json.loads(text[span_start:span_end])
+            except json.JSONDecodeError:
+                pass
+            # A broken draft is often followed by the real object.
+            data = _decode_at(text, text.find("{", span_end))
+            if data is not None:
+                return data
+            pos = span_start + 1
+            break
+        else:
+            return None
+        restarts += 1
+    return None
+
+
+def _decode_at(text: str, start: int) -> Optional[Dict[str, Any]]:
+    if start < 0:
+        return None
+    try:
+        data, _ = _decoder.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def parse_structured(text: str, schema: Any) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    data = extract_json(text)
+    if data is None:
+        return None, ["no valid JSON object found"]
+    return data, validate(data, schema)
+
+
+# ========================
+# Generation with repair
+# ========================
+def build_repair_prompt(prompt: str, raw: str, errors: List[str]) -> str:
+    problems = "\n".join(f"- {e}" for e in errors[:20])
+    return f"""{prompt}
+
+Your previous reply could not be used:
+{problems}
+
+Previous reply:
+{raw}
+
+Return ONLY the corrected JSON, with no commentary or markdown.
+"""
+
+
+def generate_structured(
+    llm,
+    prompt: str,
+    schema: Any,
+    agent: Optional[str] = None,
+    max_repairs: int = 1,
+    raw: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Call the LLM and return JSON that validates against ``schema``.
+
+    Invalid replies get up to ``max_repairs`` repair prompts, so a bad
+    parse no longer costs the user a full resubmit. Pass ``raw`` to start
+    from a reply that was already received (e.g. streamed). Raises
+    ``StructuredOutputError`` when every attempt fails.
+
+    Only valid output is cached: a reply that needed repair is stored, as
+    the repaired JSON, under the original prompt's key.
+    """
+
+    def valid(text: str) -> bool:
+        return not parse_structured(text, schema)[1]
+
+    fresh = raw is not None
+    if raw is None:
+        raw = cached_invoke(llm, prompt, agent=agent, accept=valid)
+    data, errors = parse_structured(raw, schema)
+    attempts = 0
+    while errors and attempts < max_repairs:
+        attempts += 1
+        # The repair prompt embeds the bad reply, so it is never cached.
+        raw = cached_invoke(llm, build_repair_prompt(prompt, raw, errors))
+        data, errors = parse_structured(raw, schema)
+        fresh = True
+    if errors:
+        raise StructuredOutputError(
+            f"invalid structured output after {attempts} repair(s): {errors[0]}",
+            raw=raw,
+            errors=errors,
+        )
+    if fresh:
+        store_response(llm, prompt, json.dumps(data), agent=agent)
+    return data